@@ -0,0 +1,255 @@
+import math
+from dataclasses import replace
+from typing import NamedTuple, Optional, TYPE_CHECKING
+
+from loguru import logger
+
+from realsense_cli.pointcloud import ray_table
+from realsense_cli.types import (
+    Extrinsics,
+    Frame,
+    FrameSet,
+    Intrinsics,
+    Profile,
+    Resolution,
+    Stream,
+)
+from realsense_cli.utils import depth_units
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from realsense_cli.driver.base import DriverProtocol
+
+
+def transform(extrinsics: Extrinsics, points: "np.ndarray") -> "np.ndarray":
+    """
+    Planar (3, N) POINTS in the target coordinates of EXTRINSICS,
+    following rs2_transform_point_to_point
+    """
+    import numpy as np
+
+    rotation = np.array(extrinsics.rotation, dtype=np.float64).reshape(3, 3)
+    translation = np.array(extrinsics.translation, dtype=np.float64).reshape(3, 1)
+    # rotation is column-major
+    return rotation.T @ points + translation
+
+
+def project(intrinsics: Intrinsics, points: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    Pixel coordinates of planar (3, N) POINTS, following rs2_project_point_to_pixel
+    """
+    import numpy as np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = points[0] / points[2]
+        y = points[1] / points[2]
+    c = intrinsics.coeffs
+    match intrinsics.model:
+        case "none":
+            pass
+        case "modified_brown_conrady" | "inverse_brown_conrady":
+            r2 = x * x + y * y
+            f = 1 + c[0] * r2 + c[1] * r2 * r2 + c[4] * r2 * r2 * r2
+            x, y = x * f, y * f
+            x, y = (
+                x + 2 * c[2] * x * y + c[3] * (r2 + 2 * x * x),
+                y + 2 * c[3] * x * y + c[2] * (r2 + 2 * y * y),
+            )
+        case "brown_conrady":
+            r2 = x * x + y * y
+            f = 1 + c[0] * r2 + c[1] * r2 * r2 + c[4] * r2 * r2 * r2
+            x, y = (
+                x * f + 2 * c[2] * x * y + c[3] * (r2 + 2 * x * x),
+                y * f + 2 * c[3] * x * y + c[2] * (r2 + 2 * y * y),
+            )
+        case model:
+            raise ValueError(f"Unsupported distortion model for projection: {model}")
+    return x * intrinsics.fx + intrinsics.ppx, y * intrinsics.fy + intrinsics.ppy
+
+
+def mapping_table(
+    depth: Intrinsics, target: Intrinsics, extrinsics: Extrinsics, distance: float
+) -> "np.ndarray":
+    """
+    Flat index of the TARGET pixel every DEPTH pixel lands on when it is DISTANCE meters
+    away, the number of target pixels when it lands outside of the target image
+    """
+    import numpy as np
+
+    points = transform(extrinsics, ray_table(depth, 1.0).astype(np.float64) * distance)
+    u, v = project(target, points)
+    with np.errstate(invalid="ignore"):
+        u = np.floor(u + 0.5)
+        v = np.floor(v + 0.5)
+        inside = (
+            (points[2] > 0) & (u >= 0) & (u < target.width) & (v >= 0) & (v < target.height)
+        )
+    table = np.full(depth.width * depth.height, target.width * target.height, dtype=np.int32)
+    table[inside] = v[inside].astype(np.int32) * target.width + u[inside].astype(np.int32)
+    return table
+
+
+class _Mapping(NamedTuple):
+    # flat (buckets + 1, depth pixels) tables, the last one for pixels without depth
+    tables: "np.ndarray"
+    # start of the table of each depth value
+    offsets: "np.ndarray"
+    pixels: "np.ndarray"
+    # nearest depth minus 1 of every target pixel, followed by a slot for pixels that land
+    # outside of the target image, so that empty pixels wrap around to 0 when adding 1 back
+    zbuffer: "np.ndarray"
+    target: Intrinsics
+    # target pixels covered by a depth pixel along each axis
+    footprint: int
+
+
+class DepthAligner:
+    """
+    Align depth frames to the viewpoint and resolution of the TARGET stream.
+    Where a depth pixel lands depends on its distance, so the mapping is computed once per
+    (depth profile, target profile, extrinsics) for BUCKETS distance ranges, uniform in
+    inverse depth from MIN_DEPTH meters to infinity. Aligning a frame then costs a gather
+    through the tables and a scatter keeping the nearest depth of every target pixel.
+    Using the bucket center instead of the exact distance shifts a pixel by at most
+    fx * baseline / (2 * BUCKETS * MIN_DEPTH) target pixels, about 1.5 pixels for the color
+    camera of a D435 at 1280x720 with the defaults (nearer than MIN_DEPTH shifts further).
+    With FILL_HOLES every depth pixel covers a square of target pixels as wide as a depth
+    pixel is in the target image, like the footprint rs.align fills, so upsampling to a
+    higher target resolution doesn't leave gaps
+    """
+
+    def __init__(
+        self,
+        driver: "DriverProtocol",
+        target: Stream = Stream.COLOR,
+        buckets: int = 16,
+        min_depth: float = 0.3,
+        depth_units: Optional[float] = None,
+        fill_holes: bool = True,
+    ):
+        if buckets < 1:
+            raise ValueError(f"Depth buckets must be positive, got {buckets}")
+        if min_depth <= 0:
+            raise ValueError(f"Minimum depth must be positive, got {min_depth}")
+        self._driver = driver
+        self.target = target
+        self.buckets = buckets
+        self.min_depth = min_depth
+        self.fill_holes = fill_holes
+        self._depth_units = depth_units
+        self._extrinsics: dict[tuple[Profile, Profile], Extrinsics] = {}
+        self._mappings: dict[tuple[Profile, Profile, Extrinsics], _Mapping] = {}
+        self._buckets: Optional["np.ndarray"] = None
+
+    @property
+    def depth_units(self) -> float:
+        if self._depth_units is None:
+            self._depth_units = depth_units(self._driver)
+        return self._depth_units
+
+    @property
+    def distances(self) -> "np.ndarray":
+        """
+        Distance in meters the mapping of each bucket is computed at, nearest first
+        """
+        import numpy as np
+
+        centers = (np.arange(self.buckets) + 0.5) / self.buckets
+        return self.min_depth / (1 - centers)
+
+    def _depth_buckets(self) -> "np.ndarray":
+        """
+        Bucket of every depth value, `buckets` for 0 (no depth)
+        """
+        import numpy as np
+
+        if self._buckets is None:
+            values = np.arange(1 << 16, dtype=np.float64)
+            with np.errstate(divide="ignore"):
+                inverse = self.min_depth / (values * self.depth_units)
+            buckets = np.clip(np.floor((1 - inverse) * self.buckets), 0, self.buckets - 1)
+            buckets[0] = self.buckets
+            self._buckets = buckets.astype(np.intp)
+        return self._buckets
+
+    def mapping(self, depth: Profile, target: Profile) -> _Mapping:
+        import numpy as np
+
+        extrinsics = self._extrinsics.get((depth, target))
+        if extrinsics is None:
+            extrinsics = self._driver.get_extrinsics(depth, target)
+            self._extrinsics[(depth, target)] = extrinsics
+        key = (depth, target, extrinsics)
+        mapping = self._mappings.get(key)
+        if mapping is None:
+            logger.debug("computing {} mapping tables of {} to {}", self.buckets, depth, target)
+            depth_intrinsics = self._driver.get_intrinsics(depth)
+            target_intrinsics = projected = self._driver.get_intrinsics(target)
+            footprint = 1
+            if self.fill_holes:
+                scale = max(
+                    target_intrinsics.fx / depth_intrinsics.fx,
+                    target_intrinsics.fy / depth_intrinsics.fy,
+                )
+                # rounded neighbours land up to floor(scale) + 1 target pixels apart
+                footprint = math.floor(scale) + 1
+                # land on the top left pixel of the footprint centered on the projection
+                projected = replace(
+                    target_intrinsics,
+                    ppx=target_intrinsics.ppx - (footprint - 1) / 2,
+                    ppy=target_intrinsics.ppy - (footprint - 1) / 2,
+                )
+            pixels = depth_intrinsics.width * depth_intrinsics.height
+            outside = target_intrinsics.width * target_intrinsics.height
+            tables = np.full((self.buckets + 1, pixels), outside, dtype=np.int32)
+            for bucket, distance in enumerate(self.distances):
+                tables[bucket] = mapping_table(
+                    depth_intrinsics, projected, extrinsics, distance
+                )
+            mapping = self._mappings[key] = _Mapping(
+                tables=tables.reshape(-1),
+                offsets=self._depth_buckets() * pixels,
+                pixels=np.arange(pixels, dtype=np.intp),
+                zbuffer=np.empty(outside + 1, dtype=np.uint16),
+                target=target_intrinsics,
+                footprint=footprint,
+            )
+        return mapping
+
+    def align(self, depth: Frame, target: Profile) -> Frame:
+        """
+        DEPTH frame as seen from TARGET profile, at its resolution
+        """
+        import numpy as np
+
+        mapping = self.mapping(depth.profile, target)
+        data = depth.data
+        if data is None or data.size != mapping.pixels.size:
+            raise ValueError(f"Frame doesn't match the depth profile {depth.profile}")
+        data = data.reshape(-1)
+        dest = np.take(mapping.tables, mapping.offsets[data] + mapping.pixels)
+        zbuffer = mapping.zbuffer
+        zbuffer.fill(0xFFFF)
+        np.minimum.at(zbuffer, dest, data - np.uint16(1))
+        width, height = mapping.target.width, mapping.target.height
+        image = zbuffer[:-1].reshape(height, width)
+        for _ in range(mapping.footprint - 1):
+            np.minimum(image[:, 1:], image[:, :-1], out=image[:, 1:])
+            np.minimum(image[1:], image[:-1], out=image[1:])
+        return replace(
+            depth,
+            profile=replace(depth.profile, resolution=Resolution(width, height)),
+            payload=np.add(image, np.uint16(1)),
+        )
+
+    def process(self, frameset: FrameSet) -> FrameSet:
+        """
+        FRAMESET with its depth frame aligned to the target frame, unchanged when either
+        of them is missing
+        """
+        depth = frameset.get(Stream.DEPTH)
+        target = frameset.get(self.target)
+        if depth is None or target is None:
+            return frameset
+        return {**frameset, Stream.DEPTH: self.align(depth, target.profile)}
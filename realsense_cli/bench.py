@@ -0,0 +1,111 @@
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional, TYPE_CHECKING
+
+from loguru import logger
+
+from realsense_cli.stats import LatencyHistogram, StreamStats, TimingSummary
+from realsense_cli.types import Profile, Stream
+
+if TYPE_CHECKING:
+    from realsense_cli.driver.base import DriverProtocol
+
+
+@dataclass
+class StreamBench:
+    stream: str
+    profile: str
+    frames: int
+    fps: float
+    dropped: int
+    drop_rate: float
+    timing: TimingSummary
+
+
+@dataclass
+class BenchResult:
+    driver: str
+    machine: str
+    python: str
+    duration: float
+    framesets: int
+    timeouts: int
+    # thread CPU time of a wait_for_frameset call in ms, blocking on the queue is excluded
+    cpu_per_frameset: dict[str, float]
+    streams: list[StreamBench] = field(default_factory=list)
+    # frames paired, orphaned and late in the sensor API synchronizer, None without it
+    sync: Optional[dict[str, int]] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def run_bench(
+    driver: "DriverProtocol",
+    profiles: Optional[list[Profile]],
+    duration: float,
+    timeout: float = 1.0,
+    **play_args: Any,
+) -> BenchResult:
+    """
+    Drain frames of PROFILES from DRIVER for DURATION seconds without any UI
+    """
+    stats: dict[Stream, StreamStats] = {}
+    last: dict[Stream, int] = {}
+    played: dict[Stream, Profile] = {}
+    cpu = LatencyHistogram()
+    framesets = timeouts = 0
+
+    driver.play(profiles, **play_args)
+    start = time.monotonic()
+    try:
+        while (elapsed := time.monotonic() - start) < duration:
+            cpu_start = time.thread_time()
+            frameset = driver.wait_for_frameset(min(timeout, max(duration - elapsed, 0.01)))
+            cpu.record((time.thread_time() - cpu_start) * 1000)
+            if frameset is None:
+                timeouts += 1
+                continue
+            framesets += 1
+            for stream, frame in frameset.items():
+                if last.get(stream) == frame.index:
+                    # pipeline repeats the latest frame of slower streams
+                    continue
+                last[stream] = frame.index
+                played[stream] = frame.profile
+                stats.setdefault(stream, StreamStats()).update(frame.timestamp)
+        elapsed = time.monotonic() - start
+        dropped = driver.dropped_frames
+        sync = driver.sync_stats
+    finally:
+        driver.stop()
+    logger.info("bench done: {} framesets in {:.2f}s", framesets, elapsed)
+
+    result = BenchResult(
+        driver=os.environ.get("RSCLI_DRIVER", "realsense"),
+        machine=f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+        python=platform.python_version(),
+        duration=elapsed,
+        framesets=framesets,
+        timeouts=timeouts,
+        cpu_per_frameset={
+            k: v for k, v in cpu.summary().items() if k in ("mean", "p50", "p99", "max")
+        },
+        sync=asdict(sync) if sync is not None else None,
+    )
+    for stream, stream_stats in stats.items():
+        lost = dropped.get(stream, 0)
+        result.streams.append(
+            StreamBench(
+                stream=stream.value,
+                profile=str(played[stream]),
+                frames=stream_stats.frames,
+                fps=stream_stats.frames / elapsed if elapsed else 0.0,
+                dropped=lost,
+                drop_rate=lost / (stream_stats.frames + lost),
+                timing=stream_stats.summary(),
+            )
+        )
+    return result
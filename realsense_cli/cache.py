@@ -0,0 +1,58 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from loguru import logger
+
+
+def cache_dir() -> Optional[Path]:
+    """
+    Directory of on-disk caches, None when caching is disabled with RSCLI_NO_CACHE
+    """
+    if os.environ.get("RSCLI_NO_CACHE"):
+        return None
+    if path := os.environ.get("RSCLI_CACHE_DIR"):
+        return Path(path)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "realsense-cli"
+
+
+def load_cache(name: str) -> dict[str, Any]:
+    """
+    Load cache NAME, empty when missing, unreadable or caching is disabled
+    """
+    directory = cache_dir()
+    if directory is None:
+        return {}
+    path = directory / f"{name}.json"
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("ignoring unreadable cache {}: {}", path, e)
+        return {}
+    logger.debug("loaded cache {}", path)
+    return data if isinstance(data, dict) else {}
+
+
+def store_cache(name: str, data: dict[str, Any]) -> None:
+    """
+    Atomically replace cache NAME with DATA, failures are logged and ignored
+    """
+    directory = cache_dir()
+    if directory is None:
+        return
+    path = directory / f"{name}.json"
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("failed to write cache {}: {}", path, e)
+        return
+    logger.debug("stored cache {}", path)
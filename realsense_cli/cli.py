@@ -1,5 +1,5 @@
 import sys
-from typing import Annotated
+from typing import Annotated, Optional
 
 from loguru import logger
 import typer
@@ -8,7 +8,6 @@ from realsense_cli.commands.bag import bag_app
 from realsense_cli.commands.config import config_app
 from realsense_cli.commands.stream import stream_app
 from realsense_cli.driver import get_driver
-from realsense_cli.printer import list_devices
 
 app = typer.Typer(
     no_args_is_help=True, context_settings={"help_option_names": ["-h", "--help"]}
@@ -20,6 +19,8 @@ def rs_list() -> None:
     """
     List connected devices with basic info
     """
+    from realsense_cli.printer import list_devices
+
     driver = get_driver()
     devices = driver.query_devices()
     list_devices(devices)
@@ -47,9 +48,17 @@ def rs_reset() -> None:
 def callback(
     ctx: typer.Context,
     verbose: Annotated[int, typer.Option("--verbose", "-v", count=True)] = 0,
-    serial: Annotated[
-        str, typer.Option("-s", "--serial", help="Act on device with this serial number")
-    ] = "",
+    serials: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "-s",
+            "--serial",
+            help="Act on device with this serial number, can be repeated to stream several devices",
+        ),
+    ] = None,
+    all_devices: Annotated[
+        bool, typer.Option("--all-devices", help="Stream all connected devices")
+    ] = False,
 ):
     logger.remove()
     if verbose == 1:
@@ -59,22 +68,34 @@ def callback(
 
     logger.info("Logger verbosity: {}", verbose)
 
+    if ctx.invoked_subcommand == "bag" or not {"-h", "--help"}.isdisjoint(sys.argv):
+        # no device involved, don't load pyrealsense2 to enumerate them
+        ctx.obj = {"serials": serials or []}
+        return
+
     driver = get_driver()
-    logger.debug(f"setting '{serial}' as active device")
-    try:
-        driver.active_device = serial
-    except ValueError:
-        print(f"Serial {serial} does not match any connected device:")
-        raise typer.Abort()
-
-    if ctx.invoked_subcommand not in ("list", "bag") and {"-h", "--help"}.isdisjoint(sys.argv):
+    if all_devices:
+        serials = driver.serials
+    if not serials:
+        serials = []
+    # first serial is left as the active device
+    for serial in reversed(serials):
+        logger.debug(f"setting '{serial}' as active device")
+        try:
+            driver.active_device = serial
+        except ValueError:
+            print(f"Serial {serial} does not match any connected device:")
+            raise typer.Abort()
+    ctx.obj = {"serials": serials}
+
+    if ctx.invoked_subcommand != "list":
         logger.debug("checking device exist for subcommand '{}'", ctx.invoked_subcommand)
-        dev_n = len(driver.query_devices())
+        dev_n = len(driver.serials)
         if dev_n == 0:
             logger.error("no devices found - exiting")
             print("No devices are connected")
             raise typer.Exit(1)
-        if dev_n > 1 and not serial:
+        if dev_n > 1 and not serials:
             logger.warning("Multiple devices without serial!")
             print(
                 f"Multiple devices are connected but no serial provided, using device: '{driver.active_device}'"
@@ -1,10 +1,9 @@
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Optional
 
 import typer
 
-from realsense_cli.printer import list_bag_data
-from realsense_cli.rs_bag_parser import RosParser
+from realsense_cli.types import ImageFormat
 
 bag_app = typer.Typer(help="Rosbag options", no_args_is_help=True)
 
@@ -15,10 +14,56 @@ def bag_info(
         Path,
         typer.Argument(exists=True, file_okay=True),
     ],
+    reindex: Annotated[
+        bool, typer.Option(help="Ignore the cached bag index and rebuild it")
+    ] = False,
 ):
-    with RosParser(bag.absolute()) as parser:
+    from realsense_cli.printer import list_bag_data
+    from realsense_cli.rs_bag_parser import RosParser
+
+    with RosParser(bag.absolute(), reindex=reindex) as parser:
         list_bag_data(
             parser.path,
             parser.duration,
             sorted(list(parser.topics.values()), key=lambda t: (t.total_messages, t.name)),
+            chunks=len(parser.chunks),
         )
+
+
+@bag_app.command(
+    name="extract", help="Extract images and IMU samples from realsense rosbag file"
+)
+def bag_extract(
+    bag: Annotated[
+        Path,
+        typer.Argument(exists=True, file_okay=True),
+    ],
+    out: Annotated[Path, typer.Option("--out", "-o", file_okay=False, help="Output directory")],
+    topics: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--topic",
+            help="Topic to extract, can be repeated (default: all image and IMU topics)",
+            show_default=False,
+        ),
+    ] = None,
+    fmt: Annotated[
+        ImageFormat, typer.Option("--format", help="Image file format")
+    ] = ImageFormat.NPY,
+):
+    from realsense_cli.export import extract_bag
+    from realsense_cli.printer import list_extracted
+    from realsense_cli.rs_bag_parser import RosParser
+
+    with RosParser(bag.absolute()) as parser:
+        if topics:
+            unknown = [topic for topic in topics if topic not in parser.topics]
+            if unknown:
+                print(f"Topics not found in bag: {', '.join(unknown)}")
+                raise typer.Exit(1)
+        try:
+            counts = extract_bag(parser, out, topics, fmt)
+        except ValueError as e:
+            print(str(e))
+            raise typer.Exit(1)
+    list_extracted(out, counts)
@@ -1,10 +1,10 @@
+from pathlib import Path
 from typing import Annotated, Optional
 
 import typer
 
 from realsense_cli.driver import get_driver
 from realsense_cli.types import CliSensor
-from realsense_cli.printer import list_options, list_options_values
 
 config_app = typer.Typer(help="Configure controls", no_args_is_help=True)
 
@@ -18,6 +18,8 @@ def config_list(
         CliSensor, typer.Argument(help="The sensor to configure", show_default=False)
     ],
 ) -> None:
+    from realsense_cli.printer import list_options
+
     driver = get_driver()
     controls = driver.list_controls(sensor.rs_enum)
     list_options(controls)
@@ -35,6 +37,8 @@ def config_get(
         bool, typer.Option("--all/", help="Query all supported controls")
     ] = False,
 ):
+    from realsense_cli.printer import list_options_values
+
     driver = get_driver()
     if not controls and not all_controls:
         typer.echo("Specify control names or use --all to query all controls.", err=True)
@@ -66,5 +70,43 @@ def config_set(
         except ValueError:
             print(f"Failed to parse control value pair: {ctrl_val}")
             raise typer.Abort()
-    driver.set_control_values(sensor.rs_enum, controls)
-    config_get(sensor, list(controls.keys()))
+    from realsense_cli.printer import list_options_values
+
+    try:
+        changes = driver.apply_controls(sensor.rs_enum, controls)
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1)
+    list_options_values({control: change.value for control, change in changes.items()})
+
+
+@config_app.command(
+    name="apply",
+    help="Apply a preset FILE (JSON or YAML) of control values per sensor, "
+    "only controls that differ from the current values are written",
+)
+def config_apply(
+    file: Annotated[
+        Path,
+        typer.Argument(
+            help="Preset mapping sensors (depth, color, motion) to CONTROL: VALUE pairs",
+            exists=True,
+            dir_okay=False,
+            show_default=False,
+        ),
+    ],
+):
+    from realsense_cli.printer import control_changes
+    from realsense_cli.utils import load_controls_preset
+
+    driver = get_driver()
+    try:
+        preset = load_controls_preset(file)
+        # a bad control of any sensor must not leave the sensors before it already changed
+        for sensor, controls in preset.items():
+            driver.check_controls(sensor, controls)
+        for sensor, controls in preset.items():
+            control_changes(sensor, driver.apply_controls(sensor, controls))
+    except (ValueError, RuntimeError) as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(1)
@@ -1,13 +1,26 @@
-from typing import Annotated, Optional
+import time
+from pathlib import Path
+from typing import Annotated, Optional, TYPE_CHECKING
 
 import typer
 from loguru import logger
-from rich.live import Live
 
-from realsense_cli.driver import get_driver
-from realsense_cli.stream_view import StreamView
-from realsense_cli.types import CliSensor, CliStream, Profile, Resolution
-from realsense_cli.printer import list_profiles
+from realsense_cli.driver import get_driver, get_device_drivers
+from realsense_cli.utils import DEFAULT_DEPTH_UNITS, depth_units, parse_duration
+from realsense_cli.types import (
+    CliSensor,
+    CliStream,
+    CloudFormat,
+    FrameSet,
+    Profile,
+    QueuePolicy,
+    Resolution,
+    Stream,
+)
+
+if TYPE_CHECKING:
+    from realsense_cli.imu import ImuBatch
+    from realsense_cli.stats import LatencyTracker
 
 stream_app = typer.Typer(help="Stream options", no_args_is_help=True)
 
@@ -19,6 +32,8 @@ def stream_list(
         typer.Argument(help="Sensor to query for streams", show_default=False),
     ] = None,
 ) -> None:
+    from realsense_cli.printer import list_profiles
+
     driver = get_driver()
     if sensors:
         rs_sensors = [sensor.rs_enum for sensor in sensors]
@@ -51,6 +66,7 @@ def stream_list(
                     """,
 )
 def stream_play(
+    ctx: typer.Context,
     profiles: Annotated[
         Optional[list[Profile]],
         typer.Argument(help="Profiles to play", show_default=False, parser=Profile.from_string),
@@ -63,15 +79,99 @@ def stream_play(
         ),
     ] = True,
     metadata: Annotated[bool, typer.Option("--md/--no-md", help="Show stream metadata")] = True,
+    md_fields: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            "--md-field",
+            help="Metadata field to extract, can be repeated (default: all available)",
+            show_default=False,
+        ),
+    ] = None,
+    queue_size: Annotated[
+        Optional[int],
+        typer.Option(
+            "--queue-size",
+            min=1,
+            help="Frames held while the view is busy (default: 1 for latest, 32 for all)",
+            show_default=False,
+        ),
+    ] = None,
+    queue_policy: Annotated[
+        QueuePolicy,
+        typer.Option(
+            "--queue-policy",
+            help="Keep only the latest frames (live view) or all frames that fit (recording)",
+        ),
+    ] = QueuePolicy.LATEST,
+    latency: Annotated[
+        bool,
+        typer.Option(
+            "--latency",
+            help="Measure sensor to arrival and arrival to python latency from frame metadata",
+        ),
+    ] = False,
+    latency_out: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--latency-out",
+            help="Write latency histogram summaries as JSON on exit (implies --latency)",
+            dir_okay=False,
+            show_default=False,
+        ),
+    ] = None,
+    depth_stats: Annotated[
+        bool,
+        typer.Option(
+            "--depth-stats/--no-depth-stats",
+            help="Show fill rate, range and histogram of rendered depth frames",
+        ),
+    ] = True,
+    depth_decimation: Annotated[
+        int,
+        typer.Option(
+            "--depth-decimation", min=1, help="Sample every Nth pixel for depth statistics"
+        ),
+    ] = 4,
 ):
+    from rich.console import Group
+    from rich.live import Live
+
+    from realsense_cli.stats import LatencyTracker
+    from realsense_cli.stream_view import LatencyView, StreamView
+
     driver = get_driver()
     logger.debug(f"stream {profiles}")
     if not profiles:
         profiles = []
+    if not metadata:
+        md_fields = []
+    tracker = LatencyTracker() if latency or latency_out else None
+    if tracker and md_fields is not None:
+        md_fields += [f for f in (tracker.ARRIVAL, tracker.BACKEND) if f not in md_fields]
+    play_args = dict(
+        pipeline=api,
+        metadata=md_fields,
+        queue_capacity=queue_size,
+        queue_policy=queue_policy,
+    )
+    view_args = dict(metadata=metadata, depth=depth_stats, decimation=depth_decimation)
+    serials = ctx.obj["serials"] if ctx.obj else []
+    if len(serials) > 1:
+        try:
+            _play_devices(serials, profiles, play_args, view_args, tracker)
+        finally:
+            if tracker:
+                _report_latency(tracker, latency_out)
+        return
 
-    view = StreamView([profile.stream for profile in profiles], metadata=metadata)
+    if depth_stats:
+        view_args["depth_units"] = depth_units(driver)
+    view = StreamView([profile.stream for profile in profiles], **view_args)
     try:
-        driver.play(profiles, pipeline=api)
+        driver.play(profiles, **play_args)
+    except ValueError as e:
+        print(str(e))
+        raise typer.Exit(1)
     except RuntimeError as e:
         print(str(e))
         print("Requested profiles:")
@@ -79,14 +179,396 @@ def stream_play(
             print(f"\t{profile}")
         raise typer.Exit(1)
 
+    renderable = Group(view, LatencyView(tracker)) if tracker else view
     try:
-        with Live(view, refresh_per_second=30) as live:
+        with Live(renderable, refresh_per_second=30) as live:
             while True:
                 frameset = driver.wait_for_frameset()
                 if frameset is None:
                     logger.warning("Frames didn't arrive until timeout")
                     continue
-                view.update(frameset)
+                view.update(frameset, driver.dropped_frames)
+                if tracker:
+                    tracker.update(frameset)
     finally:
         print("Stopping all streams")
         driver.stop()
+        if tracker:
+            _report_latency(tracker, latency_out)
+
+
+def _report_latency(tracker: "LatencyTracker", out: Optional[Path]) -> None:
+    """
+    Print the latency histograms collected during the run, and write them as JSON to OUT
+    """
+    import json
+
+    from realsense_cli.printer import latency_summary
+
+    latency_summary(tracker.histograms)
+    if out:
+        out.write_text(json.dumps(tracker.summary(), indent=2, ensure_ascii=False))
+        print(f"Latency summary written to {out}")
+
+
+def _play_devices(
+    serials: list[str],
+    profiles: list[Profile],
+    play_args: dict,
+    view_args: dict,
+    tracker: Optional["LatencyTracker"] = None,
+) -> None:
+    from rich.console import Group
+    from rich.live import Live
+
+    from realsense_cli.multi_stream import MultiStreamer
+    from realsense_cli.stream_view import LatencyView, StreamView
+
+    drivers = get_device_drivers(serials)
+    streamer = MultiStreamer(drivers)
+    views = {}
+    for serial, driver in drivers.items():
+        units = depth_units(driver) if view_args["depth"] else DEFAULT_DEPTH_UNITS
+        views[serial] = StreamView(
+            [profile.stream for profile in profiles],
+            title=serial,
+            depth_units=units,
+            **view_args,
+        )
+    try:
+        streamer.play(profiles, **play_args)
+    except ValueError as e:
+        print(str(e))
+        raise typer.Exit(1)
+    except RuntimeError as e:
+        print(str(e))
+        print(f"Requested profiles on devices {', '.join(serials)}:")
+        for profile in profiles:
+            print(f"\t{profile}")
+        raise typer.Exit(1)
+
+    try:
+        renderables = [*views.values(), *([LatencyView(tracker)] if tracker else [])]
+        with Live(Group(*renderables), refresh_per_second=30):
+            while True:
+                frames = streamer.wait_for_frames()
+                if frames is None:
+                    logger.warning("Frames didn't arrive until timeout")
+                    continue
+                if tracker:
+                    tracker.update(frames)
+                framesets: dict[str, FrameSet] = {serial: {} for serial in serials}
+                for (serial, stream), frame in frames.items():
+                    framesets[serial][stream] = frame
+                stats = streamer.stats()
+                for serial, frameset in framesets.items():
+                    device = stats[serial]
+                    views[serial].update(frameset, streamer.dropped_frames(serial))
+                    views[serial].subtitle = (
+                        f"{device.fps:.2f} fps, {device.dropped} dropped frames"
+                    )
+    finally:
+        print("Stopping all streams")
+        streamer.stop()
+
+
+@stream_app.command(
+    name="bench",
+    short_help="Measure streaming throughput without UI",
+    help="""
+                    Drain frames for a given duration without rendering and report delivered
+                    FPS and drop rate per stream and CPU time spent per frameset\n
+                    Profiles use the same syntax as 'rs stream play'\n
+                    """,
+)
+def stream_bench(
+    profiles: Annotated[
+        Optional[list[Profile]],
+        typer.Argument(help="Profiles to play", show_default=False, parser=Profile.from_string),
+    ] = None,
+    duration: Annotated[
+        float,
+        typer.Option(help="How long to stream, e.g. 30, 30s, 2m", parser=parse_duration),
+    ] = 10.0,
+    api: Annotated[
+        bool,
+        typer.Option(
+            "--pipe/--sensor",
+            help="Stream method, high-level pipeline API or low-level sensor API",
+        ),
+    ] = True,
+    metadata: Annotated[bool, typer.Option("--md/--no-md", help="Read frame metadata")] = True,
+    sync: Annotated[
+        bool,
+        typer.Option(help="Pair frames of different sensors by timestamp, with the sensor API"),
+    ] = True,
+    json_out: Annotated[bool, typer.Option("--json", help="Print the summary as JSON")] = False,
+):
+    import json
+
+    from realsense_cli.bench import run_bench
+
+    driver = get_driver()
+    try:
+        result = run_bench(
+            driver,
+            profiles or [],
+            duration,
+            pipeline=api,
+            metadata=None if metadata else [],
+            sync=sync,
+        )
+    except (ValueError, RuntimeError) as e:
+        print(str(e))
+        raise typer.Exit(1)
+
+    if json_out:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        from realsense_cli.printer import bench_summary
+
+        bench_summary(result)
+
+
+@stream_app.command(
+    name="record",
+    short_help="Record streams to a bag file",
+    help="""
+                    Record streams into a rosbag file readable by 'rs bag' and realsense tools\n
+                    Profiles use the same syntax as 'rs stream play'\n
+                    \n
+                    Frames are written by a background thread, when it falls behind
+                    the writer queue fills up and frames are dropped\n
+                    With --imu-out, gyro and accel samples are batched into arrays and
+                    written to a .csv or .npz file instead of the bag\n
+                    """,
+)
+def stream_record(
+    profiles: Annotated[
+        Optional[list[Profile]],
+        typer.Argument(
+            help="Profiles to record", show_default=False, parser=Profile.from_string
+        ),
+    ] = None,
+    out: Annotated[
+        Path,
+        typer.Option("--out", "-o", help="Bag file to write", dir_okay=False),
+    ] = Path("recording.bag"),
+    duration: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Stop after this long, e.g. 30, 30s, 2m (default: until interrupted)",
+            parser=parse_duration,
+        ),
+    ] = None,
+    api: Annotated[
+        bool,
+        typer.Option(
+            "--pipe/--sensor",
+            help="Stream method, high-level pipeline API or low-level sensor API",
+        ),
+    ] = True,
+    writer_queue: Annotated[
+        int,
+        typer.Option("--writer-queue", min=1, help="Frames waiting for the writer"),
+    ] = 64,
+    imu_out: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--imu-out", help="Write motion samples to this .csv or .npz file", dir_okay=False
+        ),
+    ] = None,
+    imu_batch: Annotated[
+        int,
+        typer.Option("--imu-batch", min=1, help="Motion samples collected per batch"),
+    ] = 200,
+):
+    from rich.live import Live
+
+    from realsense_cli.imu import ImuBatch, ImuBatcher
+    from realsense_cli.printer import recording_status
+    from realsense_cli.rs_bag_writer import BagWriter
+
+    driver = get_driver()
+    if not profiles:
+        profiles = []
+    if imu_out and imu_out.suffix.lower() not in (".csv", ".npz"):
+        print(f"IMU samples can be saved as .csv or .npz, not '{imu_out.suffix}'")
+        raise typer.Exit(1)
+    imu = ImuBatcher(size=imu_batch) if imu_out else None
+    imu_batches: list[ImuBatch] = []
+    try:
+        writer = BagWriter(out, capacity=writer_queue)
+    except ValueError as e:
+        print(str(e))
+        raise typer.Exit(1)
+
+    try:
+        # hold every frame until it's copied for the writer, drops belong to the writer queue
+        driver.play(profiles, pipeline=api, queue_policy=QueuePolicy.ALL, imu=imu)
+    except (ValueError, RuntimeError) as e:
+        writer.close()
+        out.unlink(missing_ok=True)
+        print(str(e))
+        raise typer.Exit(1)
+
+    writer.start()
+    start = time.monotonic()
+    try:
+        with Live(recording_status(out, writer.stats(), {}), refresh_per_second=4) as live:
+            while duration is None or time.monotonic() - start < duration:
+                frameset = driver.wait_for_frameset()
+                # recording only motion streams, samples arrive while framesets time out
+                if imu:
+                    imu_batches.extend(imu.pop())
+                if frameset is None:
+                    logger.warning("Frames didn't arrive until timeout")
+                    continue
+                for frame in frameset.values():
+                    writer.put(frame, copy=True)
+                live.update(recording_status(out, writer.stats(), driver.dropped_frames))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("Stopping all streams")
+        driver.stop()
+        try:
+            writer.close()
+        except RuntimeError as e:
+            print(str(e))
+            raise typer.Exit(1)
+    stats = writer.stats()
+    print(
+        f"Recorded {stats.written} frames ({stats.bytes_written / 1e6:.1f} MB) to {out}, "
+        f"{stats.dropped} dropped by the writer"
+    )
+    if imu and imu_out:
+        _save_imu(imu_out, imu_batches + imu.flush())
+
+
+def _save_imu(out: Path, batches: list["ImuBatch"]) -> None:
+    import numpy as np
+
+    from realsense_cli.imu import save_imu
+    from realsense_cli.stats import imu_stats
+
+    save_imu(out, batches)
+    print(f"Wrote {sum(len(batch) for batch in batches)} motion samples to {out}")
+    profiles = {batch.stream: batch.profile for batch in batches}
+    for stream, profile in profiles.items():
+        timestamps = np.concatenate([b.timestamps for b in batches if b.stream == stream])
+        stats = imu_stats(timestamps, profile.fps)
+        print(
+            f"{stream.name.lower()}: {stats.samples} samples at {stats.rate:.1f} Hz, "
+            f"{stats.gaps} gaps ({stats.missing} samples missing), "
+            f"longest interval {stats.max_interval:.2f}ms"
+        )
+
+
+@stream_app.command(
+    name="pointcloud",
+    short_help="Compute XYZ point clouds from depth",
+    help="""
+                    Deproject depth frames into XYZ point clouds in meters and report
+                    throughput, optionally writing every cloud to a directory\n
+                    The profile uses the same syntax as 'rs stream play'\n
+                    """,
+)
+def stream_pointcloud(
+    profile: Annotated[
+        Profile,
+        typer.Argument(help="Depth profile to play", parser=Profile.from_string),
+    ] = "depth",
+    out: Annotated[
+        Optional[Path],
+        typer.Option("--out", "-o", help="Directory to write clouds to (default: don't write)"),
+    ] = None,
+    fmt: Annotated[CloudFormat, typer.Option("--format", help="Cloud file format")] = (
+        CloudFormat.NPY.value
+    ),
+    keep_invalid: Annotated[
+        bool, typer.Option("--keep-invalid", help="Write points without depth too")
+    ] = False,
+    duration: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Stop after this long, e.g. 30, 30s, 2m (default: until interrupted)",
+            parser=parse_duration,
+        ),
+    ] = None,
+    api: Annotated[
+        bool,
+        typer.Option(
+            "--pipe/--sensor",
+            help="Stream method, high-level pipeline API or low-level sensor API",
+        ),
+    ] = True,
+    writer_queue: Annotated[
+        int,
+        typer.Option("--writer-queue", min=1, help="Clouds waiting for the writer"),
+    ] = 16,
+):
+    from rich.live import Live
+
+    from realsense_cli.pointcloud import CloudThroughput, CloudWriter, PointCloud
+    from realsense_cli.printer import pointcloud_status
+
+    if profile.stream != Stream.DEPTH:
+        print(f"Point clouds need a depth profile, got {profile}")
+        raise typer.Exit(1)
+    driver = get_driver()
+    cloud = PointCloud(driver)
+    writer = CloudWriter(out, fmt, writer_queue, keep_invalid) if out else None
+    throughput = CloudThroughput()
+    played = profile
+    try:
+        if writer:
+            writer.start()
+        frames = driver.stream(
+            [profile], duration=duration, streams=[Stream.DEPTH], pipeline=api, metadata=[]
+        )
+        with frames, Live(pointcloud_status(throughput, 0, None, {})) as live:
+            last_update = 0.0
+            for frameset in frames:
+                frame = frameset[Stream.DEPTH]
+                played = frame.profile
+                start = time.perf_counter()
+                points = cloud.points(frame)
+                throughput.record(len(points), time.perf_counter() - start)
+                if writer:
+                    writer.put((frame.index, points))
+                if (now := time.monotonic()) - last_update > 0.25:
+                    last_update = now
+                    live.update(
+                        pointcloud_status(
+                            throughput,
+                            played.fps,
+                            writer.stats() if writer else None,
+                            frames.dropped,
+                        )
+                    )
+    except KeyboardInterrupt:
+        pass
+    except (ValueError, RuntimeError) as e:
+        print(str(e))
+        raise typer.Exit(1)
+    finally:
+        if writer:
+            try:
+                writer.close()
+            except RuntimeError as e:
+                print(str(e))
+                raise typer.Exit(1)
+
+    compute = throughput.compute.summary()
+    print(
+        f"Computed {throughput.clouds} clouds of {played} at {throughput.fps:.1f} fps, "
+        f"compute p50 {compute['p50']:.2f}ms p99 {compute['p99']:.2f}ms"
+    )
+    if played.fps and compute["p99"]:
+        budget = 1000 / played.fps
+        verdict = "keeps up with" if compute["p99"] < budget else "can't keep up with"
+        print(f"Deprojection {verdict} {played.fps} fps ({budget:.1f}ms per frame)")
+    if writer:
+        stats = writer.stats()
+        print(f"Wrote {stats.written} clouds to {out}, {stats.dropped} dropped by the writer")
@@ -1,4 +1,5 @@
 import os
+import sys
 from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -7,22 +8,44 @@ if TYPE_CHECKING:
 _driver: Optional["DriverProtocol"] = None
 
 
+def _new_driver() -> "DriverProtocol":
+    # import only the selected driver, the realsense one loads pyrealsense2
+    match os.environ.get("RSCLI_DRIVER", "realsense"):
+        case "realsense":
+            from realsense_cli.driver.realsense import Realsense
+
+            return Realsense()
+        case "mock":
+            from realsense_cli.driver.mock import MockDriver
+
+            return MockDriver()
+        case t:
+            raise ValueError(f"Unknown driver: {t}")
+
+
 def get_driver() -> "DriverProtocol":
     global _driver
     if _driver is None:
-        from realsense_cli.driver.mock import MockDriver
-        from realsense_cli.driver.realsense import Realsense
-
-        match os.environ.get("RSCLI_DRIVER", "realsense"):
-            case "realsense":
-                _driver = Realsense()
-            case "mock":
-                _driver = MockDriver()
-            case t:
-                raise ValueError(f"Unknown driver: {t}")
+        _driver = _new_driver()
     return _driver
 
 
+def get_device_drivers(serials: list[str]) -> dict[str, "DriverProtocol"]:
+    """
+    Separate driver instance for each device in SERIALS, so devices can stream concurrently
+    """
+    drivers = {}
+    for serial in serials:
+        driver = _new_driver()
+        driver.active_device = serial
+        drivers[serial] = driver
+    return drivers
+
+
 def reset_driver() -> None:
     global _driver
     _driver = None
+    # device inventory is only loaded with the realsense driver
+    inventory = sys.modules.get("realsense_cli.driver.inventory")
+    if inventory is not None:
+        inventory.reset_inventory()
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Union
+
+from loguru import logger
+
+from realsense_cli.types import FrameSet, QueuePolicy
+
+if TYPE_CHECKING:
+    from realsense_cli.driver.base import DriverProtocol
+
+
+class _Acquisition:
+    """
+    Acquisition thread draining a driver into a bounded buffer read by an event loop.
+    The loop is only woken when the buffer turns non-empty, so a fast driver can't flood it
+    with callbacks
+    """
+
+    def __init__(
+        self,
+        driver: "DriverProtocol",
+        capacity: int,
+        policy: QueuePolicy,
+        timeout: float,
+        loop: asyncio.AbstractEventLoop,
+    ):
+        self._driver = driver
+        self._capacity = capacity
+        self._policy = policy
+        self._timeout = timeout
+        self._loop = loop
+        self._buffer: deque[Union[FrameSet, BaseException]] = deque()
+        self._cond = threading.Condition()
+        self._ready = asyncio.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rs-aframes", daemon=True)
+        self.dropped = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    async def join(self) -> None:
+        await asyncio.to_thread(self._thread.join)
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                frameset = self._driver.wait_for_frameset(self._timeout)
+                if frameset is None:
+                    logger.debug("aframes: frames didn't arrive until timeout")
+                    continue
+                if not frameset:
+                    continue
+                self._push(frameset)
+        except Exception as e:
+            logger.error("aframes acquisition failed: {}", e)
+            self._push(e)
+
+    def _push(self, item: Union[FrameSet, BaseException]) -> None:
+        with self._cond:
+            if isinstance(item, BaseException):
+                pass
+            elif self._policy == QueuePolicy.ALL:
+                # hold on to every frameset, frames wait in the driver queue meanwhile
+                self._cond.wait_for(
+                    lambda: len(self._buffer) < self._capacity or self._stop_event.is_set()
+                )
+                if self._stop_event.is_set():
+                    return
+            elif len(self._buffer) >= self._capacity:
+                self._buffer.popleft()
+                self.dropped += 1
+            was_empty = not self._buffer
+            self._buffer.append(item)
+        if was_empty:
+            try:
+                self._loop.call_soon_threadsafe(self._ready.set)
+            except RuntimeError:
+                # event loop is closed, nobody is listening anymore
+                self._stop_event.set()
+
+    async def get(self) -> FrameSet:
+        while True:
+            with self._cond:
+                if self._buffer:
+                    item = self._buffer.popleft()
+                    self._cond.notify_all()
+                    break
+                self._ready.clear()
+            await self._ready.wait()
+        if isinstance(item, BaseException):
+            raise RuntimeError(f"Frame acquisition failed: {item}") from item
+        return item
+
+
+async def aframes(
+    driver: "DriverProtocol",
+    capacity: int = 8,
+    policy: QueuePolicy = QueuePolicy.LATEST,
+    timeout: float = 1.0,
+) -> AsyncIterator[FrameSet]:
+    """
+    Framesets of a playing DRIVER for asyncio consumers.
+    A dedicated thread waits on the driver and hands framesets to the event loop through a
+    queue of CAPACITY framesets. When the consumer falls behind, LATEST drops the oldest
+    queued framesets, ALL holds the acquisition thread until there's room.
+    Iteration goes on until the consumer stops it, acquisition errors are raised
+    as RuntimeError
+    """
+    if capacity < 1:
+        raise ValueError(f"Queue capacity must be positive, got {capacity}")
+    acquisition = _Acquisition(driver, capacity, policy, timeout, asyncio.get_running_loop())
+    acquisition.start()
+    try:
+        while True:
+            yield await acquisition.get()
+    finally:
+        acquisition.stop()
+        await acquisition.join()
+        if acquisition.dropped:
+            logger.info("aframes: {} framesets dropped", acquisition.dropped)
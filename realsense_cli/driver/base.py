@@ -1,12 +1,32 @@
-from typing import Optional, Protocol
+from collections.abc import AsyncIterator, Iterable
+from typing import TYPE_CHECKING, Any, Optional, Protocol
 
-from realsense_cli.types import DeviceInfo, Sensor, Option, Profile, FrameSet
+from realsense_cli.types import (
+    DeviceInfo,
+    Sensor,
+    Option,
+    Profile,
+    FrameSet,
+    QueuePolicy,
+    Stream,
+    ControlChange,
+    Intrinsics,
+    Extrinsics,
+)
+
+if TYPE_CHECKING:
+    from realsense_cli.driver.frame_stream import FrameStream
+    from realsense_cli.driver.sync import SyncStats
+    from realsense_cli.imu import ImuBatcher
 
 
 class DriverProtocol(Protocol):
     @property
     def sensors(self) -> list[Sensor]: ...
 
+    @property
+    def serials(self) -> list[str]: ...
+
     @property
     def active_device(self) -> str: ...
 
@@ -21,12 +41,57 @@ class DriverProtocol(Protocol):
 
     def set_control_values(self, sensor: Sensor, control_values: dict[str, float]) -> None: ...
 
+    def check_controls(self, sensor: Sensor, controls: Iterable[str]) -> None: ...
+
+    def apply_controls(
+        self, sensor: Sensor, control_values: dict[str, float]
+    ) -> dict[str, ControlChange]: ...
+
     def list_streams(self, sensor: Sensor) -> list[Profile]: ...
 
-    def play(self, profiles: Optional[list[Profile]] = None, pipeline: bool = True) -> None: ...
+    def play(
+        self,
+        profiles: Optional[list[Profile]] = None,
+        pipeline: bool = True,
+        metadata: Optional[list[str]] = None,
+        queue_capacity: Optional[int] = None,
+        queue_policy: QueuePolicy = QueuePolicy.LATEST,
+        imu: Optional["ImuBatcher"] = None,
+        sync: bool = True,
+        sync_tolerance: Optional[float] = None,
+    ) -> None: ...
 
     def stop(self) -> None: ...
 
+    def get_intrinsics(self, profile: Profile) -> Intrinsics: ...
+
+    def get_extrinsics(self, source: Profile, target: Profile) -> Extrinsics: ...
+
     def wait_for_frameset(self, timeout: float = 3.0) -> Optional[FrameSet]: ...
 
+    def stream(
+        self,
+        profiles: Optional[list[Profile]] = None,
+        count: Optional[int] = None,
+        duration: Optional[float] = None,
+        streams: Optional[Iterable[Stream]] = None,
+        stride: int = 1,
+        timeout: float = 3.0,
+        align_to: Optional[Stream] = None,
+        **play_args: Any,
+    ) -> "FrameStream": ...
+
+    def aframes(
+        self,
+        capacity: int = 8,
+        policy: QueuePolicy = QueuePolicy.LATEST,
+        timeout: float = 1.0,
+    ) -> AsyncIterator[FrameSet]: ...
+
+    @property
+    def dropped_frames(self) -> dict[Stream, int]: ...
+
+    @property
+    def sync_stats(self) -> Optional["SyncStats"]: ...
+
     def reset(self) -> None: ...
@@ -0,0 +1,108 @@
+import time
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any, Optional
+
+from loguru import logger
+
+from realsense_cli.types import FrameSet, Profile, QueuePolicy, Stream
+
+if TYPE_CHECKING:
+    from realsense_cli.align import DepthAligner
+    from realsense_cli.driver.base import DriverProtocol
+
+
+class FrameStream:
+    """
+    Framesets of a driver as a context managed iterator, streams are played on enter and
+    stopped on exit.
+    Iteration ends after COUNT framesets or DURATION seconds (default: never), keeps only
+    STREAMS (default: all) and yields every STRIDE-th frameset.
+    Frames wait in an ALL policy queue by default, so acquisition is paced by the consumer
+    and frames are only dropped when it falls behind by more than the queue capacity,
+    those drops are logged and reported by `dropped`.
+    With ALIGN_TO, depth frames are aligned to the frames of that stream, see DepthAligner
+    """
+
+    def __init__(
+        self,
+        driver: "DriverProtocol",
+        profiles: Optional[list[Profile]] = None,
+        count: Optional[int] = None,
+        duration: Optional[float] = None,
+        streams: Optional[Iterable[Stream]] = None,
+        stride: int = 1,
+        timeout: float = 3.0,
+        align_to: Optional[Stream] = None,
+        **play_args: Any,
+    ):
+        if count is not None and count < 1:
+            raise ValueError(f"Frameset count must be positive, got {count}")
+        if duration is not None and duration <= 0:
+            raise ValueError(f"Duration must be positive, got {duration}")
+        if stride < 1:
+            raise ValueError(f"Stride must be positive, got {stride}")
+        self._driver = driver
+        self._profiles = profiles
+        self._count = count
+        self._duration = duration
+        self._streams = set(streams) if streams is not None else None
+        self._stride = stride
+        self._timeout = timeout
+        self._play_args = {"queue_policy": QueuePolicy.ALL, **play_args}
+        self._aligner: Optional["DepthAligner"] = None
+        if align_to is not None:
+            from realsense_cli.align import DepthAligner
+
+            self._aligner = DepthAligner(driver, align_to)
+        self._start: Optional[float] = None
+        self.delivered = 0
+
+    def __enter__(self) -> "FrameStream":
+        self._driver.play(self._profiles, **self._play_args)
+        self._start = time.monotonic()
+        self.delivered = 0
+        return self
+
+    def __exit__(self, *_) -> None:
+        self._start = None
+        self._driver.stop()
+
+    @property
+    def dropped(self) -> dict[Stream, int]:
+        return self._driver.dropped_frames
+
+    def __iter__(self) -> Iterator[FrameSet]:
+        if self._start is None:
+            raise RuntimeError("Frames can only be iterated while the stream is entered")
+        received = 0
+        dropped = 0
+        while self._count is None or self.delivered < self._count:
+            timeout = self._timeout
+            if self._duration is not None:
+                remaining = self._duration - (time.monotonic() - self._start)
+                if remaining <= 0:
+                    return
+                timeout = min(timeout, remaining)
+            frameset = self._driver.wait_for_frameset(timeout)
+            full = frameset
+            if frameset is None:
+                # a shorter wait just ran into the end of the duration
+                if timeout == self._timeout:
+                    logger.warning("Frames didn't arrive until timeout")
+                continue
+            if self._streams is not None:
+                frameset = {s: f for s, f in frameset.items() if s in self._streams}
+            if not frameset:
+                # only motion samples, collected by an IMU batcher
+                continue
+            if not dropped:
+                dropped = sum(self.dropped.values())
+                if dropped:
+                    logger.warning("consumer fell behind, frames are being dropped")
+            received += 1
+            if (received - 1) % self._stride:
+                continue
+            if self._aligner is not None and Stream.DEPTH in frameset:
+                frameset[Stream.DEPTH] = self._aligner.process(full)[Stream.DEPTH]
+            self.delivered += 1
+            yield frameset
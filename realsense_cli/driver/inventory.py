@@ -0,0 +1,187 @@
+from dataclasses import asdict
+from typing import Any, Optional
+
+from loguru import logger
+
+import pyrealsense2 as rs  # type: ignore
+
+from realsense_cli.cache import load_cache, store_cache
+from realsense_cli.types import DeviceInfo, Sensor
+
+_CACHE_NAME = "devices"
+
+
+class DeviceInventory:
+    """
+    Connected devices, enumerated once per process.
+    Only serial numbers are queried up front, sensors and device info are queried on first
+    use of a device. Device info and the options each sensor supports are also cached on
+    disk, keyed by the USB port, serial number and firmware version of the device (cheap
+    reads of what librealsense already knows), so a known device isn't queried for them
+    again while one plugged into another port or flashed with new firmware is
+    """
+
+    def __init__(self, ctx: rs.context):
+        self.ctx = ctx
+        self._devices: Optional[dict[str, rs.device]] = None
+        self._sensors: dict[str, dict[Sensor, rs.sensor]] = {}
+        self._info: dict[str, DeviceInfo] = {}
+        self._keys: dict[str, str] = {}
+        self._cache: Optional[dict[str, Any]] = None
+
+    def _enumerate(self) -> dict[str, rs.device]:
+        if self._devices is None:
+            self._devices = {}
+            for dev in self.ctx.devices:
+                serial = dev.get_info(rs.camera_info.serial_number)
+                logger.debug("Adding device: {}", serial)
+                self._devices[serial] = dev
+            logger.info("Found {} devices", len(self._devices))
+        return self._devices
+
+    @property
+    def serials(self) -> list[str]:
+        """
+        Serial numbers of connected devices, sorted to be deterministic every run
+        """
+        return sorted(self._enumerate())
+
+    def device(self, serial: str) -> rs.device:
+        devices = self._enumerate()
+        if serial not in devices:
+            raise ValueError(f"No device with serial {serial} is connected")
+        return devices[serial]
+
+    def sensors(self, serial: str) -> dict[Sensor, rs.sensor]:
+        if serial not in self._sensors:
+            dev = self.device(serial)
+            sensors = {}
+            rs_sensor: rs.sensor
+            for rs_sensor in dev.sensors:
+                logger.debug("Adding sensor {} for device {}", rs_sensor, serial)
+                sensors[Sensor(rs_sensor.name)] = rs_sensor
+            self._sensors[serial] = sensors
+        return self._sensors[serial]
+
+    def _entries(self) -> dict[str, Any]:
+        """
+        On-disk cache entries by device key, loaded on first use
+        """
+        if self._cache is None:
+            self._cache = load_cache(_CACHE_NAME)
+        return self._cache
+
+    def cache_key(self, serial: str) -> str:
+        """
+        Key of device SERIAL in the on-disk cache: USB port, serial number and firmware version
+        """
+        if serial not in self._keys:
+            dev = self.device(serial)
+            port = _safe_get_info(dev, rs.camera_info.physical_port)
+            fw = _safe_get_info(dev, rs.camera_info.firmware_version)
+            self._keys[serial] = f"{port}|{serial}|{fw}"
+        return self._keys[serial]
+
+    def _entry(self, serial: str) -> dict[str, Any]:
+        """
+        On-disk cache entry of device SERIAL, created empty for a new device
+        """
+        entries = self._entries()
+        key = self.cache_key(serial)
+        entry = entries.get(key)
+        if not isinstance(entry, dict):
+            # whatever is cached for the device on another port or firmware is stale
+            self._drop_entries(serial)
+            entry = entries[key] = {}
+        return entry
+
+    def _drop_entries(self, serial: str) -> bool:
+        entries = self._entries()
+        stale = [key for key in entries if key.split("|")[1:2] == [serial]]
+        for key in stale:
+            del entries[key]
+        return bool(stale)
+
+    def info(self, serial: str) -> DeviceInfo:
+        if serial in self._info:
+            return self._info[serial]
+        entry = self._entry(serial)
+        if "info" in entry:
+            logger.debug("device info for {} loaded from cache", serial)
+            info = DeviceInfo(**entry["info"])
+        else:
+            dev = self.device(serial)
+            info = DeviceInfo(
+                name=dev.get_info(rs.camera_info.name),
+                serial=serial,
+                fw=_safe_get_info(dev, rs.camera_info.firmware_version),
+                connection=_safe_get_info(dev, rs.camera_info.usb_type_descriptor),
+                sensors=[
+                    s.get_info(rs.camera_info.name) for s in self.sensors(serial).values()
+                ],
+            )
+            entry["info"] = asdict(info)
+            store_cache(_CACHE_NAME, self._entries())
+        logger.debug("device info: {}", info)
+        self._info[serial] = info
+        return info
+
+    def supported_options(self, serial: str, sensor: Sensor) -> set[str]:
+        """
+        Names of the options SENSOR of device SERIAL supports
+        """
+        options = self._entry(serial).setdefault("options", {})
+        if sensor.value in options:
+            logger.debug("options of {} {} loaded from cache", serial, sensor)
+            return set(options[sensor.value])
+        rs_sensor = self.sensors(serial)[sensor]
+        names = sorted(option.name for option in rs_sensor.get_supported_options())
+        options[sensor.value] = names
+        store_cache(_CACHE_NAME, self._entries())
+        return set(names)
+
+    def forget(self, serial: str) -> None:
+        """
+        Drop what is cached about device SERIAL, e.g. before a reset that may come back with
+        new firmware
+        """
+        self._info.pop(serial, None)
+        self._sensors.pop(serial, None)
+        self._keys.pop(serial, None)
+        if self._drop_entries(serial):
+            store_cache(_CACHE_NAME, self._entries())
+
+    def model_key(self, serial: str) -> str:
+        """
+        Key shared by devices of the same model and firmware, whose sensors have the same
+        controls. Read from the device, not the cached info, so new firmware gets a new key
+        """
+        dev = self.device(serial)
+        product = _safe_get_info(dev, rs.camera_info.product_id)
+        return f"{product}|{_safe_get_info(dev, rs.camera_info.firmware_version)}"
+
+
+def _safe_get_info(device: rs.device, info: rs.camera_info) -> str:
+    if not device.supports(info):
+        logger.debug("device does not provide {}", info)
+        return "N/A"
+    try:
+        return device.get_info(info)
+    except Exception as e:
+        logger.error(e)
+    return "N/A"
+
+
+_inventory: Optional[DeviceInventory] = None
+
+
+def get_inventory() -> DeviceInventory:
+    global _inventory
+    if _inventory is None:
+        _inventory = DeviceInventory(rs.context())
+    return _inventory
+
+
+def reset_inventory() -> None:
+    global _inventory
+    _inventory = None
@@ -1,7 +1,9 @@
+import math
 import time
 from collections import defaultdict
+from collections.abc import AsyncIterator, Iterable
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 from realsense_cli.types import (
     DeviceInfo,
@@ -12,7 +14,21 @@ from realsense_cli.types import (
     Resolution,
     FrameSet,
     Frame,
+    frame_layout,
+    QueuePolicy,
+    ControlChange,
+    Intrinsics,
+    Extrinsics,
 )
+from realsense_cli.driver.aio import aframes
+from realsense_cli.driver.frame_stream import FrameStream
+from realsense_cli.driver.sync import SyncStats
+from realsense_cli.imu import MOTION_STREAMS, ImuBatcher
+from realsense_cli.stats import DropCounter
+from realsense_cli.utils import ProfileIndex, control_matches
+
+# x offset of each stream origin from the depth camera, in meters
+_MOCK_ORIGIN: dict[Stream, float] = {Stream.COLOR: -0.015}
 
 _default_config = {
     "devices": [
@@ -83,6 +99,13 @@ _default_config = {
             ],
         },
     },
+    "metadata": [
+        "frame_counter",
+        "frame_timestamp",
+        "sensor_timestamp",
+        "time_of_arrival",
+        "backend_timestamp",
+    ],
 }
 
 
@@ -95,6 +118,10 @@ class MockDriver:
         self._playing: list[Profile] = []
         self._counters: dict[Stream, int] = defaultdict(int)
         self._active_serial: str = config["devices"][0].serial
+        self._md_selected: list[str] = []
+        self._payloads: dict[Profile, Any] = {}
+        self._drops: DropCounter[Stream] = DropCounter()
+        self._imu: Optional[ImuBatcher] = None
 
     def query_devices(self) -> list[DeviceInfo]:
         return self._config["devices"]
@@ -114,32 +141,137 @@ class MockDriver:
     def set_control_values(self, sensor: Sensor, control_values: dict[str, float]) -> None:
         pass
 
+    def check_controls(self, sensor: Sensor, controls: Iterable[str]) -> None:
+        supported = {opt.name for opt in self._config["sensors"][sensor]["options"]}
+        for control in controls:
+            if control not in supported:
+                raise ValueError(
+                    f"control '{control}' is not supported for sensor '{sensor.value}'"
+                )
+
+    def apply_controls(
+        self, sensor: Sensor, control_values: dict[str, float]
+    ) -> dict[str, ControlChange]:
+        # writes are ignored, like set_control_values
+        self.check_controls(sensor, control_values)
+        current = self.get_control_values(sensor, list(control_values))
+        res = {}
+        for control, value in control_values.items():
+            written = not control_matches(current[control], value)
+            res[control] = ControlChange(current[control], current[control], written)
+        return res
+
     def list_streams(self, sensor: Sensor) -> list[Profile]:
         return self._config["sensors"][sensor]["profiles"]
 
-    def play(self, profiles: Optional[list[Profile]] = None, pipeline: bool = True) -> None:
-        self._playing = profiles if profiles is not None else self._all_profiles()
+    def play(
+        self,
+        profiles: Optional[list[Profile]] = None,
+        pipeline: bool = True,
+        metadata: Optional[list[str]] = None,
+        queue_capacity: Optional[int] = None,
+        queue_policy: QueuePolicy = QueuePolicy.LATEST,
+        imu: Optional[ImuBatcher] = None,
+        sync: bool = True,
+        sync_tolerance: Optional[float] = None,
+    ) -> None:
+        available = self._config.get("metadata", [])
+        if metadata is None:
+            metadata = available
+        unknown = [name for name in metadata if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown metadata fields: {', '.join(unknown)}")
+        self._md_selected = list(metadata)
+        if profiles is None:
+            self._playing = self._all_profiles()
+        else:
+            # resolve wildcards like the device does, unknown profiles play as requested
+            index = ProfileIndex((profile, profile) for profile in self._all_profiles())
+            self._playing = [index.find(profile) or profile for profile in profiles]
         self._counters = defaultdict(int)
+        self._drops.reset()
+        self._payloads = {profile: self._gen_payload(profile) for profile in self._playing}
+        self._imu = imu
 
     def stop(self) -> None:
         self._playing = []
+        self._imu = None
+
+    def get_intrinsics(self, profile: Profile) -> Intrinsics:
+        width, height = profile.resolution
+        if not width or not height:
+            raise ValueError(f"No intrinsics for profile {profile}")
+        # D435 like 87 degrees horizontal field of view, square pixels
+        focal = width / 2 / math.tan(math.radians(87 / 2))
+        return Intrinsics(width, height, focal, focal, width / 2, height / 2)
+
+    def get_extrinsics(self, source: Profile, target: Profile) -> Extrinsics:
+        # D435 like color camera 15mm beside the depth camera, all other streams at its origin
+        x = _MOCK_ORIGIN.get(source.stream, 0.0) - _MOCK_ORIGIN.get(target.stream, 0.0)
+        return Extrinsics(translation=(x, 0.0, 0.0))
 
     def wait_for_frameset(self, timeout: float = 3.0) -> Optional[FrameSet]:
         if not self._playing:
             return None
-        now = time.monotonic() * 1000
+        # host clock like librealsense global timestamps, so latencies line up
+        now = time.time() * 1000
         result: FrameSet = {}
         for profile in self._playing:
             idx = self._counters[profile.stream]
             self._counters[profile.stream] += 1
+            if self._imu is not None and profile.stream in MOTION_STREAMS:
+                self._imu.add(profile, now - 1, 0.0, 0.0, 0.0)
+                continue
             result[profile.stream] = Frame(
                 profile=profile,
-                timestamp=now,
+                # captured a moment before it reached the host
+                timestamp=now - 1,
                 index=idx,
-                metadata={},
+                metadata=self._gen_metadata(idx, now),
+                payload=self._payloads[profile],
+                received=now,
             )
+            self._drops.update(profile.stream, idx)
         return result
 
+    def stream(
+        self,
+        profiles: Optional[list[Profile]] = None,
+        count: Optional[int] = None,
+        duration: Optional[float] = None,
+        streams: Optional[Iterable[Stream]] = None,
+        stride: int = 1,
+        timeout: float = 3.0,
+        align_to: Optional[Stream] = None,
+        **play_args: Any,
+    ) -> FrameStream:
+        """
+        Play PROFILES within a with block iterating their framesets, see FrameStream
+        """
+        return FrameStream(
+            self, profiles, count, duration, streams, stride, timeout, align_to, **play_args
+        )
+
+    def aframes(
+        self,
+        capacity: int = 8,
+        policy: QueuePolicy = QueuePolicy.LATEST,
+        timeout: float = 1.0,
+    ) -> AsyncIterator[FrameSet]:
+        """
+        Asynchronously iterate framesets of the playing streams, see driver.aio.aframes
+        """
+        return aframes(self, capacity, policy, timeout)
+
+    @property
+    def dropped_frames(self) -> dict[Stream, int]:
+        return self._drops.dropped
+
+    @property
+    def sync_stats(self) -> Optional[SyncStats]:
+        # mock framesets are generated complete, there's nothing to synchronize
+        return None
+
     def reset(self) -> None:
         pass
 
@@ -147,6 +279,10 @@ class MockDriver:
     def sensors(self) -> list[Sensor]:
         return list(self._config["sensors"].keys())
 
+    @property
+    def serials(self) -> list[str]:
+        return sorted(dev.serial for dev in self._config["devices"])
+
     @property
     def active_device(self) -> str:
         return self._active_serial
@@ -156,5 +292,26 @@ class MockDriver:
         if serial:
             self._active_serial = serial
 
+    def _gen_payload(self, profile: Profile) -> Any:
+        import numpy as np
+
+        dtype, shape = frame_layout(profile)
+        if shape == (-1,):
+            shape = (0,)
+        # single buffer per profile, shared by all of its frames like a driver buffer pool
+        payload = np.zeros(shape, dtype=dtype)
+        payload.flags.writeable = False
+        return payload
+
+    def _gen_metadata(self, idx: int, now: float) -> dict[str, int]:
+        values = {
+            "frame_counter": idx,
+            "frame_timestamp": int(now * 1000),
+            "sensor_timestamp": int(now * 1000),
+            "time_of_arrival": int(now),
+            "backend_timestamp": int(now),
+        }
+        return {name: values[name] for name in self._md_selected}
+
     def _all_profiles(self) -> list[Profile]:
         return [p for s in self._config["sensors"].values() for p in s["profiles"]]
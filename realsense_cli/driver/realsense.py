@@ -1,6 +1,8 @@
 import time
 from collections import defaultdict
-from typing import Optional
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import asdict
+from typing import Any, Optional
 
 from loguru import logger
 
@@ -13,11 +15,34 @@ from realsense_cli.types import (
     Resolution,
     FrameSet,
     Frame,
+    QueuePolicy,
+    ControlChange,
+    Intrinsics,
+    Extrinsics,
 )
 
 import pyrealsense2 as rs  # type: ignore
 
-from realsense_cli.utils import find_origin_sensor
+from realsense_cli.cache import load_cache, store_cache
+from realsense_cli.driver.inventory import DeviceInventory, get_inventory
+from realsense_cli.driver.aio import aframes
+from realsense_cli.driver.frame_stream import FrameStream
+from realsense_cli.driver.sync import SyncStats, TimestampSyncer
+from realsense_cli.imu import MOTION_STREAMS, ImuBatcher
+from realsense_cli.stats import DropCounter
+from realsense_cli.utils import (
+    ProfileIndex,
+    control_matches,
+    find_origin_sensor,
+    order_controls,
+)
+
+_CONTROLS_CACHE = "controls"
+
+_default_queue_capacity: dict[QueuePolicy, int] = {
+    QueuePolicy.LATEST: 1,
+    QueuePolicy.ALL: 32,
+}
 
 
 class Realsense:
@@ -27,9 +52,8 @@ class Realsense:
 
     def __init__(self):
         logger.info("Instancing Realsense driver")
-        self._ctx: rs.context = rs.context()
-        self._devices: list[rs.device] = []
-        self._sensors: dict[rs.device, dict[Sensor, rs.sensor]] = {}
+        self._inventory: DeviceInventory = get_inventory()
+        self._ctx: rs.context = self._inventory.ctx
         self._streams_map: dict[Stream, rs.stream] = {
             Stream.DEPTH: rs.stream.depth,
             Stream.INFRARED: rs.stream.infrared,
@@ -39,39 +63,37 @@ class Realsense:
             Stream.ACCEL: rs.stream.accel,
         }
         self._metadata: list[rs.frame_metadata_value] = []
+        self._options: dict[str, rs.option] = {}
+        self._md_selected: list[rs.frame_metadata_value] = []
+        # metadata fields present per stream profile
+        self._md_plans: dict[Profile, list[tuple[str, rs.frame_metadata_value]]] = {}
+        # converted profiles of the streams being played, keyed on profile unique id
+        self._profiles: dict[int, Profile] = {}
+        # pyrealsense2 profiles of the streams being played
+        self._rs_profiles: dict[Profile, rs.stream_profile] = {}
+        self._intrinsics: dict[tuple[str, Profile], Intrinsics] = {}
+        self._profile_indexes: dict[tuple[str, Sensor], ProfileIndex[rs.stream_profile]] = {}
         self._stream_method: str = "pipe"
+        # batches motion samples while playing, instead of returning them as frames
+        self._imu: Optional[ImuBatcher] = None
+        # pairs frames of several sensors when streaming with the sensor API
+        self._syncer: Optional[TimestampSyncer[rs.frame]] = None
+        self._sync_stats: Optional[SyncStats] = None
+        self._keep_frames = False
 
-        self._setup()
-        if self._devices:
-            logger.debug(f"setting first device as active one")
-            # sorting to be deterministic every run
-            self._active_device = sorted(
-                [(d.get_info(rs.camera_info.serial_number), d) for d in self._devices]
-            )[0][1]
-        else:
-            self._active_device = None
-        logger.info("active device: {}", self._active_device)
+        self._prep_valid_md_attrs()
+        self._prep_options()
+        serials = self._inventory.serials
+        self._active_serial: Optional[str] = None
+        if serials:
+            logger.debug("setting first device as active one")
+            self._active_serial = serials[0]
+        logger.info("active device: {}", self._active_serial)
         self._streaming = False
         self._pipeline: rs.pipeline = rs.pipeline(self._ctx)
         self._pipe_profile: Optional[rs.pipeline_profile] = None
         self._frame_queue: rs.frame_queue = rs.frame_queue(capacity=1)
-
-    def _setup(self) -> None:
-        self._query()
-        self._prep_valid_md_attrs()
-
-    def _query(self):
-        for dev in self._ctx.devices:
-            logger.debug("Adding device: {}", dev)
-            self._devices.append(dev)
-            self._sensors[dev] = {}
-
-            rs_sensor: rs.sensor
-            for rs_sensor in dev.sensors:
-                logger.debug("Adding sensor {} for device {}", rs_sensor, dev)
-                self._sensors[dev][Sensor(rs_sensor.name)] = rs_sensor
-
-        logger.info("Found {} devices", len(self._devices))
+        self._drops: DropCounter[Stream] = DropCounter()
 
     def _prep_valid_md_attrs(self):
         for name in dir(rs.frame_metadata_value):
@@ -79,41 +101,51 @@ class Realsense:
             if isinstance(attr, rs.frame_metadata_value):
                 self._metadata.append(attr)
 
+    def _prep_options(self):
+        for name in dir(rs.option):
+            attr = getattr(rs.option, name)
+            if isinstance(attr, rs.option):
+                self._options[attr.name] = attr
+
+    def _resolve_controls(
+        self, sensor: Sensor, controls: Iterable[str]
+    ) -> tuple[rs.sensor, dict[str, rs.option]]:
+        """
+        SENSOR and the option of each of CONTROLS, raise ValueError for unsupported ones
+        """
+        rs_sensor = self._get_sensor(sensor)
+        supported = self._inventory.supported_options(self._active_serial, sensor)
+        res = {}
+        for control in controls:
+            option = self._options.get(control)
+            if option is None or control not in supported:
+                logger.debug("no such option or not supported by sensor")
+                raise ValueError(
+                    f"control '{control}' is not supported for sensor '{sensor.value}'"
+                )
+            res[control] = option
+        return rs_sensor, res
+
     def query_devices(self) -> list[DeviceInfo]:
         """
         Query connected devices
         """
-        devices = []
-        rsdev: rs.device
-        for device, sensors in self._sensors.items():
-            rs_sensors = [s for s in sensors.values()]
-            logger.debug("adding device info for device {}", device)
-
-            def _safe_get_info(info: rs.camera_info):
-                try:
-                    return device.get_info(info)
-                except Exception as e:
-                    logger.error(e)
-                return "N/A"
-
-            info = DeviceInfo(
-                name=device.get_info(rs.camera_info.name),
-                serial=device.get_info(rs.camera_info.serial_number),
-                fw=_safe_get_info(rs.camera_info.firmware_version),
-                connection=_safe_get_info(rs.camera_info.usb_type_descriptor),
-                sensors=[s.get_info(rs.camera_info.name) for s in rs_sensors],
-            )
-            logger.debug("adding device info: {}", info)
-            devices.append(info)
-        return devices
+        return [self._inventory.info(serial) for serial in self._inventory.serials]
 
     def list_controls(self, sensor: Sensor) -> list[Option]:
         """
-        List controls supported by SENSOR
+        List controls supported by SENSOR.
+        Ranges and descriptions are fixed per device model and firmware, they are cached on
+        disk so only the first listing queries the device
         """
         rs_sensor = self._get_sensor(sensor)
-        logger.info("listing controls for sensor {}", rs_sensor)
+        key = f"{self._inventory.model_key(self._active_serial)}|{sensor.value}"
+        cache = load_cache(_CONTROLS_CACHE)
+        if key in cache:
+            logger.debug("controls of {} loaded from cache", key)
+            return [_option_from_cache(option) for option in cache[key]]
 
+        logger.info("listing controls for sensor {}", rs_sensor)
         options = rs_sensor.get_supported_options()
         res = []
         for option in options:
@@ -136,20 +168,18 @@ class Realsense:
             )
             logger.debug("adding Option: {}", opt)
             res.append(opt)
+        cache[key] = [_option_to_cache(option) for option in res]
+        store_cache(_CONTROLS_CACHE, cache)
         return res
 
     def get_control_values(self, sensor: Sensor, controls: list[str]) -> dict[str, float]:
         """
         Get values for CONTROLS from SENSOR
         """
-        res = {}
-        rs_sensor: rs.sensor = self._get_sensor(sensor)
+        rs_sensor, options = self._resolve_controls(sensor, controls)
         logger.info("querying controls {} for sensor {}", controls, rs_sensor)
-        for control in controls:
-            option = getattr(rs.option, control, None)
-            logger.debug('getting value for option: "{}"', option)
-            if not option or not rs_sensor.supports(option):
-                raise ValueError(f"control '{control}' is not supported for sensor '{sensor}'")
+        res = {}
+        for control, option in options.items():
             res[control] = rs_sensor.get_option(option)
             logger.debug('"{}" value: {}', option, res[control])
         return res
@@ -158,62 +188,204 @@ class Realsense:
         """
         Set CONTROL_VALUES on SENSOR
         """
-        rs_sensor = self._get_sensor(sensor)
+        self.apply_controls(sensor, control_values)
 
-        logger.info("setting controls {} for sensor {}", control_values, rs_sensor)
-        for control, value in control_values.items():
-            option = getattr(rs.option, control, None)
-            logger.debug('setting "{}" with value {}', option, value)
-            if not option or not rs_sensor.supports(option):
-                logger.debug("no such option or not supported by sensor")
-                raise ValueError(
-                    f"control '{control}' is not supported for sensor '{sensor.value}'"
-                )
-            rs_sensor.set_option(option, value)
+    def check_controls(self, sensor: Sensor, controls: Iterable[str]) -> None:
+        """
+        Raise ValueError if SENSOR doesn't support any of CONTROLS, without touching the device
+        """
+        self._resolve_controls(sensor, controls)
+
+    def apply_controls(
+        self, sensor: Sensor, control_values: dict[str, float]
+    ) -> dict[str, ControlChange]:
+        """
+        Apply CONTROL_VALUES on SENSOR as one batch: controls already at the requested value
+        are not written, mode switches (e.g. auto exposure) are written before the controls
+        they affect, and only written controls are read back, once all writes are done
+        """
+        rs_sensor, options = self._resolve_controls(sensor, control_values)
+        logger.info("applying controls {} for sensor {}", control_values, rs_sensor)
+        previous: dict[str, float] = {}
+        written = []
+        for control in order_controls(control_values):
+            option = options[control]
+            previous[control] = rs_sensor.get_option(option)
+            if control_matches(previous[control], control_values[control]):
+                logger.debug('"{}" already set to {}', option, previous[control])
+                continue
+            logger.debug('setting "{}" with value {}', option, control_values[control])
+            rs_sensor.set_option(option, control_values[control])
+            written.append(control)
+
+        res = {}
+        for control in control_values:
+            if control in written:
+                value = rs_sensor.get_option(options[control])
+                res[control] = ControlChange(previous[control], value, True)
+            else:
+                res[control] = ControlChange(previous[control], previous[control], False)
+        return res
 
     def list_streams(self, sensor: Sensor) -> list[Profile]:
         """
         List supported streams for SENSOR
         """
+        return self._profile_index(sensor).profiles
+
+    def _profile_index(self, sensor: Sensor) -> ProfileIndex[rs.stream_profile]:
+        """
+        Index of SENSOR stream profiles, built once per sensor
+        """
+        key = (self._active_serial, sensor)
+        if key in self._profile_indexes:
+            return self._profile_indexes[key]
+
         rs_sensor = self._get_sensor(sensor)
-        logger.info("listing streams for sensor {}", rs_sensor)
-        profiles: list[rs.stream_profile] = rs_sensor.get_stream_profiles()
-        res = []
-        for profile in profiles:
-            logger.debug("found profile: {}", profile)
-            if profile.is_video_stream_profile():
-                vsp: rs.video_stream_profile = profile.as_video_stream_profile()
-                width, height = vsp.width(), vsp.height()
+        logger.info("indexing streams for sensor {}", rs_sensor)
+        entries = []
+        rs_profile: rs.stream_profile
+        for rs_profile in rs_sensor.get_stream_profiles():
+            if rs_profile.is_video_stream_profile():
+                rs_profile = rs_profile.as_video_stream_profile()
+                width, height = rs_profile.width(), rs_profile.height()
             else:
                 width, height = 0, 0
 
-            res.append(
-                Profile(
-                    stream=Stream(profile.stream_name()),
-                    resolution=Resolution(width, height),
-                    fps=profile.fps(),
-                    format=profile.format().name.upper(),
-                    index=profile.stream_index(),
-                )
+            profile = Profile(
+                stream=Stream(rs_profile.stream_name()),
+                resolution=Resolution(width, height),
+                fps=rs_profile.fps(),
+                format=rs_profile.format().name.upper(),
+                index=rs_profile.stream_index(),
             )
-            logger.debug("adding profile {}", res[-1])
-        return res
-
-    def play(self, profiles: Optional[list[Profile]] = None, pipeline: bool = True) -> None:
+            logger.debug("adding profile {}", profile)
+            entries.append((profile, rs_profile))
+        index = self._profile_indexes[key] = ProfileIndex(entries)
+        return index
+
+    def play(
+        self,
+        profiles: Optional[list[Profile]] = None,
+        pipeline: bool = True,
+        metadata: Optional[list[str]] = None,
+        queue_capacity: Optional[int] = None,
+        queue_policy: QueuePolicy = QueuePolicy.LATEST,
+        imu: Optional[ImuBatcher] = None,
+        sync: bool = True,
+        sync_tolerance: Optional[float] = None,
+    ) -> None:
         """
         Start streaming selected profiles
+
+        METADATA selects the frame metadata fields to extract, None for all and an empty
+        list for none.
+        QUEUE_CAPACITY and QUEUE_POLICY control the frames held while the consumer is busy.
+        With IMU, gyro and accel samples are collected into its batches instead of being
+        returned as frames. With the sensor API they bypass the frame queue altogether, so
+        they neither wait for the consumer nor push other frames out of the queue.
+        With the sensor API and SYNC, frames of several video streams are paired into
+        framesets by timestamp within SYNC_TOLERANCE ms (default: half the frame interval
+        of the fastest stream), see TimestampSyncer
         """
         logger.info("Playing profiles: {}", profiles)
+        self._select_metadata(metadata)
+        self._imu = imu
+        if queue_capacity is None:
+            queue_capacity = _default_queue_capacity[queue_policy]
+        logger.debug("frame queue capacity: {}, policy: {}", queue_capacity, queue_policy)
+        self._frame_queue = rs.frame_queue(
+            capacity=queue_capacity, keep_frames=queue_policy == QueuePolicy.ALL
+        )
+        self._drops.reset()
+        self._sync_stats = None
         if pipeline:
             self._stream_pipe(profiles)
         else:
-            self._stream_sensor(profiles)
+            self._stream_sensor(
+                profiles,
+                sync_tolerance,
+                sync,
+                queue_capacity,
+                queue_policy == QueuePolicy.ALL,
+            )
         self._streaming = True
 
-    def _stream_sensor(self, profiles: list[Profile]):
+    def get_intrinsics(self, profile: Profile) -> Intrinsics:
+        """
+        Intrinsics of video stream PROFILE, either being played or supported by the device
+        """
+        key = (self._active_serial, profile)
+        if key in self._intrinsics:
+            return self._intrinsics[key]
+        rs_profile = self._find_rs_profile(profile)
+        if rs_profile is None or not rs_profile.is_video_stream_profile():
+            raise ValueError(f"No intrinsics for profile {profile}")
+        intrinsics = Intrinsics.from_rs(rs_profile.as_video_stream_profile().get_intrinsics())
+        logger.debug("intrinsics of {}: {}", profile, intrinsics)
+        self._intrinsics[key] = intrinsics
+        return intrinsics
+
+    def get_extrinsics(self, source: Profile, target: Profile) -> Extrinsics:
+        """
+        Transform from the coordinates of SOURCE profile to those of TARGET profile
+        """
+        rs_source = self._find_rs_profile(source)
+        rs_target = self._find_rs_profile(target)
+        if rs_source is None or rs_target is None:
+            raise ValueError(f"No extrinsics from {source} to {target}")
+        try:
+            extrinsics = Extrinsics.from_rs(rs_source.get_extrinsics_to(rs_target))
+        except RuntimeError as e:
+            raise ValueError(f"No extrinsics from {source} to {target}: {e}") from e
+        logger.debug("extrinsics from {} to {}: {}", source, target, extrinsics)
+        return extrinsics
+
+    def _find_rs_profile(self, profile: Profile) -> Optional[rs.stream_profile]:
+        """
+        pyrealsense2 profile of PROFILE, either being played or supported by the device
+        """
+        rs_profile = self._rs_profiles.get(profile)
+        if rs_profile is None:
+            sensor_profiles = {sensor: self.list_streams(sensor) for sensor in self.sensors}
+            sensor = find_origin_sensor(sensor_profiles).get(profile.stream)
+            if sensor is not None:
+                rs_profile = self._profile_index(sensor).find(profile)
+        return rs_profile
+
+    def _select_metadata(self, fields: Optional[list[str]]) -> None:
+        if fields is None:
+            self._md_selected = list(self._metadata)
+        else:
+            by_name = {md.name: md for md in self._metadata}
+            unknown = [name for name in fields if name not in by_name]
+            if unknown:
+                raise ValueError(f"Unknown metadata fields: {', '.join(unknown)}")
+            self._md_selected = [by_name[name] for name in fields]
+        logger.debug("selected metadata fields: {}", self._md_selected)
+        self._md_plans = {}
+
+    def _plan_metadata(self, rs_frame: rs.frame) -> list[tuple[str, rs.frame_metadata_value]]:
+        """
+        Probe which of the selected metadata fields the frame's stream provides
+        """
+        plan = [
+            (md.name, md) for md in self._md_selected if rs_frame.supports_frame_metadata(md)
+        ]
+        logger.debug("metadata plan for {}: {}", rs_frame.get_profile(), [n for n, _ in plan])
+        return plan
+
+    def _stream_sensor(
+        self,
+        profiles: list[Profile],
+        sync_tolerance: Optional[float] = None,
+        sync: bool = False,
+        queue_capacity: int = 1,
+        keep_frames: bool = False,
+    ):
         self._stream_method = "sensor"
         sensor_profiles = {}
-        for sensor in self._sensors[self._active_device]:
+        for sensor in self._active_sensors():
             sensor_profiles[sensor] = self.list_streams(sensor)
         origin_streams: dict[Stream, Sensor] = find_origin_sensor(sensor_profiles)
 
@@ -223,58 +395,78 @@ class Realsense:
 
         rs_stream_profiles: dict[Sensor, list[rs.stream_profile]] = defaultdict(list)
         for sensor, sprofiles in stream_profiles.items():
-            rs_sensor: rs.sensor = self._get_sensor(sensor)
-            rs_profiles = rs_sensor.get_stream_profiles()
-
+            index = self._profile_index(sensor)
             for profile in sprofiles:
-                logger.debug(f"Looking a match for {profile}")
-
-                skip_index = profile.index == -1
-                skip_fps = profile.fps == 0
-                skip_width = profile.resolution.width == 0
-                skip_height = profile.resolution.height == 0
-                skip_format = profile.format == "any"
-                fmt = getattr(rs.format, profile.format.lower())
-
-                logger.debug(
-                    f"{skip_index=}, {skip_fps=}, {skip_format=}, {skip_height=}, {skip_width=}"
-                )
-
-                for rs_profile in rs_profiles:
-                    if rs_profile.is_video_stream_profile():
-                        sp: rs.video_stream_profile = rs_profile.as_video_stream_profile()
-                        width, height = sp.width(), sp.height()
-                    else:
-                        sp = rs_profile
-                        width, height = 0, 0
-
-                    logger.debug(f"checking {rs_profile}...")
-                    if (
-                        sp.stream_type() == self._streams_map[profile.stream]
-                        and (skip_index or (sp.stream_index() == profile.index))
-                        and (skip_format or (sp.format() == fmt))
-                        and (skip_fps or (sp.fps() == profile.fps))
-                        and (skip_width or (width == profile.resolution.width))
-                        and (skip_height or (height == profile.resolution.height))
-                    ):
-                        logger.debug(f"Found match: {sp}")
-                        rs_stream_profiles[sensor].append(sp)
-                        break
-                else:
+                rs_profile = index.find(profile)
+                if rs_profile is None:
                     raise RuntimeError(
                         f"Failed to find streaming profile: '{profile}' for {sensor}"
                     )
+                logger.debug("Found match for {}: {}", profile, rs_profile)
+                rs_stream_profiles[sensor].append(rs_profile)
+
+        video = [
+            Profile.from_rs(rs_profile)
+            for rs_profiles in rs_stream_profiles.values()
+            for rs_profile in rs_profiles
+            if not rs_profile.is_motion_stream_profile()
+        ]
+        self._syncer = None
+        if sync and len(video) > 1:
+            if sync_tolerance is None:
+                sync_tolerance = 500 / max(profile.fps for profile in video)
+            logger.info("synchronizing {} within {:.2f}ms", video, sync_tolerance)
+            self._syncer = TimestampSyncer(
+                [profile.stream for profile in video],
+                sync_tolerance,
+                queue_capacity=queue_capacity,
+            )
+            self._sync_stats = self._syncer.stats
+            self._keep_frames = keep_frames
 
         for sensor, rs_profiles in rs_stream_profiles.items():
-            logger.info(f"Starting stream for {sensor} with {rs_profiles}")
+            logger.info("Starting stream for {} with {}", sensor, rs_profiles)
             rs_sensor = self._get_sensor(sensor)
             rs_sensor.open(rs_profiles)
-            rs_sensor.start(self._frame_queue)
+            self._cache_profiles(rs_profiles)
+            if self._imu is not None and sensor == Sensor.MOTION_SENSOR:
+                rs_sensor.start(self._on_motion_frame)
+            elif self._syncer is not None:
+                rs_sensor.start(self._on_sensor_frame)
+            else:
+                rs_sensor.start(self._frame_queue)
+
+    def _frame_profile(self, rs_frame: rs.frame) -> Profile:
+        rs_profile: rs.stream_profile = rs_frame.get_profile()
+        uid = rs_profile.unique_id()
+        profile = self._profiles.get(uid)
+        if profile is None:
+            profile = self._profiles[uid] = Profile.from_rs(rs_profile)
+        return profile
+
+    def _on_motion_frame(self, rs_frame: rs.frame) -> None:
+        try:
+            self._add_motion(rs_frame, self._frame_profile(rs_frame))
+        except Exception as e:
+            logger.error("failed collecting motion sample: {}", e)
+
+    def _on_sensor_frame(self, rs_frame: rs.frame) -> None:
+        try:
+            if self._keep_frames:
+                rs_frame.keep()
+            stream = self._frame_profile(rs_frame).stream
+            self._syncer.push(stream, rs_frame.get_timestamp(), rs_frame)
+        except Exception as e:
+            logger.error("failed synchronizing frame: {}", e)
+
+    def _add_motion(self, rs_frame: rs.frame, profile: Profile) -> None:
+        motion = rs_frame.as_motion_frame().get_motion_data()
+        self._imu.add(profile, rs_frame.get_timestamp(), motion.x, motion.y, motion.z)
 
     def _stream_pipe(self, profiles):
         self._stream_method = "pipe"
         cfg = rs.config()
-        cfg.enable_device(self._active_device.get_info(rs.camera_info.serial_number))
+        cfg.enable_device(self._active_serial)
         if profiles:
             for profile in profiles:
                 rs_stream = self._streams_map[profile.stream]
@@ -291,6 +483,14 @@ class Realsense:
             cfg.enable_all_streams()
         logger.info("Starting stream")
         self._pipe_profile = self._pipeline.start(cfg, self._frame_queue)
+        self._cache_profiles(self._pipe_profile.get_streams())
+
+    def _cache_profiles(self, rs_profiles: list[rs.stream_profile]) -> None:
+        for rs_profile in rs_profiles:
+            profile = Profile.from_rs(rs_profile)
+            self._profiles[rs_profile.unique_id()] = profile
+            self._rs_profiles[profile] = rs_profile
+        logger.debug("cached profiles: {}", self._profiles)
 
     def stop(self) -> None:
         """
@@ -300,46 +500,67 @@ class Realsense:
         if self._stream_method == "pipe":
             self._pipeline.stop()
         else:
-            for rs_sensor in self._sensors[self._active_device].values():
+            for rs_sensor in self._active_sensors().values():
                 if rs_sensor.get_active_streams():
                     rs_sensor.stop()
                     rs_sensor.close()
+        self._profiles = {}
+        self._rs_profiles = {}
+        if self._syncer is not None:
+            logger.info("frame sync: {}", self._syncer.stats)
+        self._imu = None
+        self._syncer = None
         self._streaming = False
 
     def wait_for_frameset(self, timeout: float = 3.0) -> Optional[FrameSet]:
         """
         Get next frameset waiting in queue.
-        return None when no frameset arrive after timeout
+        return None when no frameset arrive after timeout, and an empty frameset when it only
+        held motion samples collected by the IMU batcher
         """
         result: FrameSet = {}
-        try:
-            rs_frame: rs.frame = self._frame_queue.wait_for_frame(int(timeout * 1000))
-        except RuntimeError as e:
-            if "Frame didn't arrive within" in str(e):
-                return None
-            raise
         frames: list[rs.frame]
-        if rs_frame.is_frameset():
-            frames = [f for f in rs_frame.as_frameset()]
+        if self._syncer is not None:
+            synced = self._syncer.pop(timeout)
+            if synced is None:
+                return None
+            frames = list(synced.values())
         else:
-            frames = [rs_frame]
+            arrived, rs_frame = self._frame_queue.try_wait_for_frame(int(timeout * 1000))
+            if not arrived:
+                return None
+            if rs_frame.is_frameset():
+                frames = [f for f in rs_frame.as_frameset()]
+            else:
+                frames = [rs_frame]
+        received = time.time() * 1000
         logger.debug("frameset received")
 
-        t0 = time.time()
         rs_frame: rs.frame
         for rs_frame in frames:
             t1 = time.time()
-            rs_profile: rs.stream_profile = rs_frame.get_profile()
-            profile = Profile.from_rs(rs_profile)
+            profile = self._frame_profile(rs_frame)
+            if self._imu is not None and profile.stream in MOTION_STREAMS:
+                self._add_motion(rs_frame, profile)
+                continue
+            md_plan = self._md_plans.get(profile)
+            if md_plan is None:
+                md_plan = self._md_plans[profile] = self._plan_metadata(rs_frame)
             metadata = {}
-            for md in self._metadata:
-                if rs_frame.supports_frame_metadata(md):
-                    metadata[md.name] = rs_frame.get_frame_metadata(md)
+            for name, md in md_plan:
+                try:
+                    metadata[name] = rs_frame.get_frame_metadata(md)
+                except RuntimeError:
+                    # field was present on the stream's first frame but not on this one
+                    continue
             frame = Frame(
                 profile=profile,
                 timestamp=rs_frame.get_timestamp(),
                 index=rs_frame.get_frame_number(),
                 metadata=metadata,
+                payload=rs_frame,
+                received=received,
+                timestamp_domain=rs_frame.get_frame_timestamp_domain().name,
             )
             logger.debug(
                 "{}\t#{} {:.2}ms - {}",
@@ -349,38 +570,97 @@ class Realsense:
                 frame,
             )
             result[profile.stream] = frame
-        logger.debug(f"Total callback time: {(time.time() - t0) * 1000:.2}ms")
+            self._drops.update(profile.stream, frame.index)
+        logger.debug(f"Total callback time: {time.time() * 1000 - received:.2}ms")
 
         return result
 
+    def stream(
+        self,
+        profiles: Optional[list[Profile]] = None,
+        count: Optional[int] = None,
+        duration: Optional[float] = None,
+        streams: Optional[Iterable[Stream]] = None,
+        stride: int = 1,
+        timeout: float = 3.0,
+        align_to: Optional[Stream] = None,
+        **play_args: Any,
+    ) -> FrameStream:
+        """
+        Play PROFILES within a with block iterating their framesets, see FrameStream
+        """
+        return FrameStream(
+            self, profiles, count, duration, streams, stride, timeout, align_to, **play_args
+        )
+
+    def aframes(
+        self,
+        capacity: int = 8,
+        policy: QueuePolicy = QueuePolicy.LATEST,
+        timeout: float = 1.0,
+    ) -> AsyncIterator[FrameSet]:
+        """
+        Asynchronously iterate framesets of the playing streams, see driver.aio.aframes
+        """
+        return aframes(self, capacity, policy, timeout)
+
+    @property
+    def sync_stats(self) -> Optional[SyncStats]:
+        """
+        Counters of the frame synchronizer of the last sensor API stream, None when its
+        frames weren't synchronized
+        """
+        return self._sync_stats
+
+    @property
+    def dropped_frames(self) -> dict[Stream, int]:
+        """
+        Frames lost per stream since streaming started, from gaps in frame numbers
+        """
+        return self._drops.dropped
+
     def reset(self):
         """
         Send hardware reset to device
         """
-        self._active_device.hardware_reset()
+        self._inventory.device(self._active_serial).hardware_reset()
+        self._inventory.forget(self._active_serial)
+
+    def _active_sensors(self) -> dict[Sensor, rs.sensor]:
+        return self._inventory.sensors(self._active_serial)
 
     def _get_sensor(self, sensor: Sensor) -> rs.sensor:
-        if sensor not in self._sensors[self._active_device]:
+        sensors = self._active_sensors()
+        if sensor not in sensors:
             raise RuntimeError(
-                f'Sensor "{sensor.value}" is not supported on device: {self._active_device.get_info(rs.camera_info.serial_number)}'
+                f'Sensor "{sensor.value}" is not supported on device: {self._active_serial}'
             )
-        return self._sensors[self._active_device][sensor]
+        return sensors[sensor]
 
     @property
     def sensors(self) -> list[Sensor]:
-        return list(self._sensors[self._active_device].keys())
+        return list(self._active_sensors().keys())
+
+    @property
+    def serials(self) -> list[str]:
+        return self._inventory.serials
 
     @property
     def active_device(self) -> str:
-        return self._active_device.get_info(rs.camera_info.serial_number)
+        return self._active_serial
 
     @active_device.setter
     def active_device(self, serial: Optional[str] = None):
         if not serial:
             return
-        for dev in self._devices:
-            if dev.get_info(rs.camera_info.serial_number) == serial:
-                self._active_device = dev
-                break
-        else:
+        if serial not in self._inventory.serials:
             raise ValueError(f"No device with serial {serial} is connected")
+        self._active_serial = serial
+
+
+def _option_to_cache(option: Option) -> dict[str, Any]:
+    return {**asdict(option), "vtype": option.vtype.__name__}
+
+
+def _option_from_cache(data: dict[str, Any]) -> Option:
+    return Option(**{**data, "vtype": int if data["vtype"] == "int" else float})
@@ -0,0 +1,113 @@
+import threading
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Generic, Optional, TypeVar
+
+from realsense_cli.types import Stream
+
+T = TypeVar("T")
+
+
+@dataclass
+class SyncStats:
+    matched: int = 0  # framesets emitted
+    orphaned: int = 0  # frames discarded without a partner within tolerance
+    late: int = 0  # frames arriving after framesets newer than them were emitted
+    dropped: int = 0  # matched framesets the consumer didn't take before the queue overflowed
+
+
+class TimestampSyncer(Generic[T]):
+    """
+    Pair frames of STREAMS coming from independent sensors into framesets by timestamp.
+    Every stream buffers up to CAPACITY frames. Once all streams have a frame, the newest of
+    their oldest frames anchors a frameset, each stream contributes its frame nearest to the
+    anchor within TOLERANCE ms and older frames, which can't be paired anymore, are
+    orphaned. Framesets wait for the consumer in a queue of QUEUE_CAPACITY, the oldest is
+    dropped when it's full.
+    Frames of other streams (e.g. motion) pass through as single frame framesets, in a queue
+    of their own so a fast gyro can't evict matched framesets. Matched framesets are popped
+    first
+    """
+
+    def __init__(
+        self,
+        streams: Iterable[Stream],
+        tolerance: float,
+        capacity: int = 4,
+        queue_capacity: int = 1,
+    ):
+        if tolerance < 0:
+            raise ValueError(f"Sync tolerance must not be negative, got {tolerance}")
+        if capacity < 1:
+            raise ValueError(f"Sync buffer capacity must be positive, got {capacity}")
+        self.tolerance = tolerance
+        self._capacity = capacity
+        self._queue_capacity = queue_capacity
+        self._buffers: dict[Stream, deque[tuple[float, T]]] = {s: deque() for s in streams}
+        # anchor timestamp of the last emitted frameset
+        self._horizon: Optional[float] = None
+        self._ready: deque[dict[Stream, T]] = deque()
+        # frames of unsynchronized streams, drops show up in their frame numbers
+        self._passed: deque[dict[Stream, T]] = deque(maxlen=queue_capacity)
+        self._cond = threading.Condition()
+        self.stats = SyncStats()
+
+    @property
+    def streams(self) -> list[Stream]:
+        return list(self._buffers)
+
+    def push(self, stream: Stream, timestamp: float, frame: T) -> None:
+        with self._cond:
+            buffer = self._buffers.get(stream)
+            if buffer is None:
+                self._passed.append({stream: frame})
+                self._cond.notify()
+                return
+            if self._horizon is not None and timestamp < self._horizon - self.tolerance:
+                self.stats.late += 1
+                return
+            buffer.append((timestamp, frame))
+            if len(buffer) > self._capacity:
+                buffer.popleft()
+                self.stats.orphaned += 1
+            self._match()
+
+    def _match(self) -> None:
+        while all(self._buffers.values()):
+            anchor = max(buffer[0][0] for buffer in self._buffers.values())
+            stale = False
+            for buffer in self._buffers.values():
+                while buffer and buffer[0][0] < anchor - self.tolerance:
+                    buffer.popleft()
+                    self.stats.orphaned += 1
+                    stale = True
+            if stale:
+                # heads changed, the anchor may have too
+                continue
+            frameset = {}
+            for stream, buffer in self._buffers.items():
+                nearest = min(range(len(buffer)), key=lambda i: abs(buffer[i][0] - anchor))
+                for _ in range(nearest):
+                    buffer.popleft()
+                    self.stats.orphaned += 1
+                frameset[stream] = buffer.popleft()[1]
+            self._horizon = anchor
+            self.stats.matched += 1
+            self._emit(frameset)
+
+    def _emit(self, frameset: dict[Stream, T]) -> None:
+        if len(self._ready) >= self._queue_capacity:
+            self._ready.popleft()
+            self.stats.dropped += 1
+        self._ready.append(frameset)
+        self._cond.notify()
+
+    def pop(self, timeout: float) -> Optional[dict[Stream, T]]:
+        """
+        Next frameset, None when none is ready within TIMEOUT seconds
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._ready or self._passed, timeout):
+                return None
+            return (self._ready or self._passed).popleft()
@@ -0,0 +1,134 @@
+import csv
+import struct
+import zlib
+from pathlib import Path
+from typing import IO, Optional, TYPE_CHECKING
+
+from loguru import logger
+
+from realsense_cli.types import ImageFormat
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from realsense_cli.rs_bag_parser import RosParser
+
+# PNG color type per number of channels
+_PNG_COLOR_TYPES = {1: 0, 3: 2, 4: 6}
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + tag
+        + data
+        + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+    )
+
+
+def write_png(path: Path, image: "np.ndarray") -> None:
+    """
+    Write 8/16-bit grayscale, RGB or RGBA IMAGE as PNG
+    """
+    import numpy as np
+
+    if image.ndim not in (2, 3):
+        # e.g. the raw bytes of an encoding decode_image doesn't know
+        raise ValueError(f"Can't write PNG, unsupported image shape {image.shape}")
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    if channels not in _PNG_COLOR_TYPES or image.dtype not in (np.uint8, np.uint16):
+        raise ValueError(f"Can't write {image.dtype} image with {channels} channels as PNG")
+    height, width = image.shape[:2]
+    # PNG samples are big endian, each row is prefixed with its filter type (0 - none)
+    samples = image.astype(image.dtype.newbyteorder(">"), copy=False).reshape(height, -1)
+    rows = np.zeros((height, 1 + samples.nbytes // height), dtype=np.uint8)
+    rows[:, 1:] = samples.view(np.uint8)
+
+    header = struct.pack(
+        ">IIBBBBB", width, height, image.dtype.itemsize * 8, _PNG_COLOR_TYPES[channels], 0, 0, 0
+    )
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", header))
+        f.write(_png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 1)))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def write_image(path: Path, image: "np.ndarray", fmt: ImageFormat) -> Path:
+    """
+    Write IMAGE to PATH with FMT suffix, return the written file
+    """
+    import numpy as np
+
+    path = path.with_suffix(f".{fmt.value}")
+    match fmt:
+        case ImageFormat.NPY:
+            np.save(path, image)
+        case ImageFormat.PNG:
+            write_png(path, image)
+    return path
+
+
+def _topic_dir(topic: str) -> str:
+    return topic.strip("/").replace("/", "_")
+
+
+def extract_bag(
+    parser: "RosParser", out: Path, topics: Optional[list[str]], fmt: ImageFormat
+) -> dict[str, int]:
+    """
+    Stream image and IMU messages of TOPICS (all of them when None) from PARSER into OUT.
+    Images are written one file per message, IMU samples to a CSV per topic.
+    return number of messages extracted per topic
+    """
+    from realsense_cli.rs_bag_parser import IMAGE_MSGTYPE, IMU_MSGTYPE, decode_image
+
+    if topics is None:
+        topics = [
+            t.name for t in parser.topics.values() if t.msg_type in (IMAGE_MSGTYPE, IMU_MSGTYPE)
+        ]
+    logger.info("extracting topics {} to {}", topics, out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    counts: dict[str, int] = {}
+    imu_files: dict[str, IO[str]] = {}
+    imu_writers = {}
+    try:
+        for topic, timestamp, rawdata in parser.messages(topics):
+            count = counts.get(topic.name, 0)
+            if topic.msg_type == IMAGE_MSGTYPE:
+                image = decode_image(rawdata)
+                data = image.data
+                if fmt == ImageFormat.PNG and image.encoding.startswith("bgr"):
+                    data = data[..., [2, 1, 0, 3][: data.shape[2]]]
+                directory = out / _topic_dir(topic.name)
+                directory.mkdir(exist_ok=True)
+                write_image(directory / f"{count:06d}_{image.timestamp}", data, fmt)
+            elif topic.msg_type == IMU_MSGTYPE:
+                if topic.name not in imu_writers:
+                    f = imu_files[topic.name] = open(out / f"{_topic_dir(topic.name)}.csv", "w")
+                    imu_writers[topic.name] = csv.writer(f)
+                    imu_writers[topic.name].writerow(
+                        [
+                            "seq",
+                            "timestamp",
+                            "gyro_x",
+                            "gyro_y",
+                            "gyro_z",
+                            "accel_x",
+                            "accel_y",
+                            "accel_z",
+                        ]
+                    )
+                imu = parser.decode_imu(rawdata)
+                imu_writers[topic.name].writerow(
+                    [imu.seq, imu.timestamp, *imu.angular_velocity, *imu.linear_acceleration]
+                )
+            else:
+                logger.debug("skipping {} message on {}", topic.msg_type, topic.name)
+                continue
+            counts[topic.name] = count + 1
+    finally:
+        for f in imu_files.values():
+            f.close()
+    return counts
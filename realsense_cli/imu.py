@@ -0,0 +1,208 @@
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+from loguru import logger
+
+from realsense_cli.stats import ImuStats, imu_stats
+from realsense_cli.types import Frame, Profile, Stream
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MOTION_STREAMS = (Stream.GYRO, Stream.ACCEL)
+# samples a time window buffer has room for, relative to the nominal rate of the stream
+_WINDOW_HEADROOM = 2
+
+
+@dataclass
+class ImuBatch:
+    """
+    Consecutive samples of a motion stream, TIMESTAMPS in ms and (x, y, z) SAMPLES in
+    rad/s for gyro, m/s^2 for accel
+    """
+
+    profile: Profile
+    timestamps: "np.ndarray" = field(repr=False)
+    samples: "np.ndarray" = field(repr=False)
+    # timestamp of the sample before this batch, nan for the first batch of a stream
+    previous: float = math.nan
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def stream(self) -> Stream:
+        return self.profile.stream
+
+    def stats(self) -> ImuStats:
+        return imu_stats(self.timestamps, self.profile.fps, self.previous)
+
+
+class _Buffer:
+    """
+    Preallocated arrays a batch is collected into
+    """
+
+    def __init__(self, profile: Profile, capacity: int, previous: float):
+        import numpy as np
+
+        self.profile = profile
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.samples = np.empty((capacity, 3), dtype=np.float32)
+        self.count = 0
+        self.previous = previous
+
+    def batch(self) -> ImuBatch:
+        return ImuBatch(
+            self.profile,
+            self.timestamps[: self.count],
+            self.samples[: self.count],
+            self.previous,
+        )
+
+
+class ImuBatcher:
+    """
+    Collect motion samples into preallocated arrays per stream, handed over as batches of
+    SIZE samples or spanning WINDOW ms, whichever fills first.
+    Adding a sample only writes into the current arrays, which are replaced once per batch,
+    so high rate gyro and accel streams don't cost a Frame and metadata per sample.
+    Completed batches wait in a queue of CAPACITY batches, the oldest are dropped when the
+    consumer doesn't `pop` them in time
+    """
+
+    def __init__(
+        self, size: Optional[int] = 200, window: Optional[float] = None, capacity: int = 64
+    ):
+        if size is None and window is None:
+            raise ValueError("Either a batch size or a time window is needed")
+        if size is not None and size < 1:
+            raise ValueError(f"Batch size must be positive, got {size}")
+        if window is not None and window <= 0:
+            raise ValueError(f"Time window must be positive, got {window}")
+        self.size = size
+        self.window = window
+        self._buffers: dict[Stream, _Buffer] = {}
+        self._ready: deque[ImuBatch] = deque(maxlen=capacity)
+        self.samples = 0
+        self.dropped = 0
+
+    def _capacity(self, profile: Profile) -> int:
+        if self.window is None:
+            return self.size
+        # room for a window at twice the nominal rate, a faster stream closes batches early
+        capacity = math.ceil(self.window * (profile.fps or 1000) / 1000 * _WINDOW_HEADROOM)
+        return max(min(capacity, self.size or capacity), 1)
+
+    def add(self, profile: Profile, timestamp: float, x: float, y: float, z: float) -> None:
+        """
+        Add a sample of motion stream PROFILE
+        """
+        buffer = self._buffers.get(profile.stream)
+        if buffer is None:
+            buffer = self._buffers[profile.stream] = _Buffer(
+                profile, self._capacity(profile), math.nan
+            )
+        elif self.window is not None and buffer.count:
+            if timestamp - buffer.timestamps[0] >= self.window:
+                buffer = self._complete(buffer)
+        buffer.timestamps[buffer.count] = timestamp
+        buffer.samples[buffer.count] = (x, y, z)
+        buffer.count += 1
+        self.samples += 1
+        if buffer.count == len(buffer.timestamps):
+            self._complete(buffer)
+
+    def add_frame(self, frame: Frame) -> None:
+        x, y, z = frame.data[:3]
+        self.add(frame.profile, frame.timestamp, float(x), float(y), float(z))
+
+    def _complete(self, buffer: _Buffer) -> _Buffer:
+        if len(self._ready) == self._ready.maxlen:
+            if not self.dropped:
+                logger.warning("IMU batches aren't consumed in time, dropping the oldest")
+            self.dropped += 1
+        self._ready.append(buffer.batch())
+        previous = buffer.timestamps[buffer.count - 1]
+        buffer = self._buffers[buffer.profile.stream] = _Buffer(
+            buffer.profile, self._capacity(buffer.profile), previous
+        )
+        return buffer
+
+    def pop(self) -> list[ImuBatch]:
+        """
+        Completed batches, oldest first
+        """
+        batches = []
+        while self._ready:
+            batches.append(self._ready.popleft())
+        return batches
+
+    def flush(self) -> list[ImuBatch]:
+        """
+        Completed batches followed by the partial batch of every stream
+        """
+        for buffer in list(self._buffers.values()):
+            if buffer.count:
+                self._complete(buffer)
+        return self.pop()
+
+
+def _by_stream(batches: list[ImuBatch]) -> dict[Stream, tuple["np.ndarray", "np.ndarray"]]:
+    """
+    Timestamps and samples of each stream's BATCHES, concatenated
+    """
+    import numpy as np
+
+    streams: dict[Stream, list[ImuBatch]] = {}
+    for batch in batches:
+        streams.setdefault(batch.stream, []).append(batch)
+    return {
+        stream: (
+            np.concatenate([b.timestamps for b in stream_batches]),
+            np.concatenate([b.samples for b in stream_batches]),
+        )
+        for stream, stream_batches in streams.items()
+    }
+
+
+def write_imu_csv(path: Path, batches: list[ImuBatch]) -> None:
+    """
+    Write BATCHES as stream,timestamp,x,y,z rows, timestamps in ms
+    """
+    import numpy as np
+
+    with open(path, "w") as f:
+        f.write("stream,timestamp,x,y,z\n")
+        for stream, (timestamps, samples) in _by_stream(batches).items():
+            rows = np.column_stack((timestamps, samples))
+            np.savetxt(f, rows, fmt=f"{stream.name.lower()},%.6f,%.9g,%.9g,%.9g")
+
+
+def write_imu_npz(path: Path, batches: list[ImuBatch]) -> None:
+    """
+    Write BATCHES as <stream>_timestamps (ms) and <stream>_samples (N, 3) arrays
+    """
+    import numpy as np
+
+    arrays = {}
+    for stream, (timestamps, samples) in _by_stream(batches).items():
+        arrays[f"{stream.name.lower()}_timestamps"] = timestamps
+        arrays[f"{stream.name.lower()}_samples"] = samples
+    np.savez(path, **arrays)
+
+
+def save_imu(path: Path, batches: list[ImuBatch]) -> None:
+    """
+    Write BATCHES to a .csv or .npz file, after the suffix of PATH
+    """
+    match path.suffix.lower():
+        case ".csv":
+            write_imu_csv(path, batches)
+        case ".npz":
+            write_imu_npz(path, batches)
+        case suffix:
+            raise ValueError(f"IMU samples can be saved as .csv or .npz, not '{suffix}'")
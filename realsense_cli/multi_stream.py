@@ -0,0 +1,142 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, TYPE_CHECKING
+
+from loguru import logger
+
+from realsense_cli.types import Frame, Profile, Stream
+
+if TYPE_CHECKING:
+    from realsense_cli.driver.base import DriverProtocol
+
+MultiFrameSet = dict[tuple[str, Stream], Frame]
+
+
+@dataclass
+class DeviceStats:
+    serial: str
+    framesets: int
+    fps: float
+    dropped: int
+
+
+class MultiStreamer:
+    """
+    Stream several devices at once.
+    Every device is drained by its own worker thread into a merged set of the latest
+    frames, keyed by (serial, stream)
+    """
+
+    def __init__(self, drivers: dict[str, "DriverProtocol"], timeout: float = 0.5):
+        self._drivers = drivers
+        self._timeout = timeout
+        self._threads: list[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._cond = threading.Condition()
+        self._fresh: MultiFrameSet = {}
+        self._errors: dict[str, BaseException] = {}
+        self._counts: dict[str, int] = {}
+        # (time, count) at the start of the current fps window, per device
+        self._windows: dict[str, tuple[float, int]] = {}
+        self._fps: dict[str, float] = {}
+
+    @property
+    def serials(self) -> list[str]:
+        return list(self._drivers)
+
+    def play(self, profiles: Optional[list[Profile]] = None, **play_args: Any) -> None:
+        """
+        Start PROFILES on all devices and spawn a worker per device
+        """
+        started = []
+        try:
+            for serial, driver in self._drivers.items():
+                logger.info("starting device {}", serial)
+                driver.play(profiles, **play_args)
+                started.append(driver)
+        except Exception:
+            for driver in started:
+                driver.stop()
+            raise
+
+        self._stop_event.clear()
+        now = time.monotonic()
+        for serial in self._drivers:
+            self._counts[serial] = 0
+            self._windows[serial] = (now, 0)
+            self._fps[serial] = 0.0
+            thread = threading.Thread(
+                target=self._drain, args=(serial,), name=f"rs-{serial}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _drain(self, serial: str) -> None:
+        driver = self._drivers[serial]
+        try:
+            while not self._stop_event.is_set():
+                frameset = driver.wait_for_frameset(self._timeout)
+                if frameset is None:
+                    logger.warning("device {}: frames didn't arrive until timeout", serial)
+                    continue
+                self._count(serial)
+                with self._cond:
+                    for stream, frame in frameset.items():
+                        self._fresh[(serial, stream)] = frame
+                    self._cond.notify_all()
+        except Exception as e:
+            logger.error("device {} worker failed: {}", serial, e)
+            with self._cond:
+                self._errors[serial] = e
+                self._cond.notify_all()
+
+    def _count(self, serial: str) -> None:
+        count = self._counts[serial] = self._counts[serial] + 1
+        start, start_count = self._windows[serial]
+        now = time.monotonic()
+        if now - start >= 1:
+            self._fps[serial] = (count - start_count) / (now - start)
+            self._windows[serial] = (now, count)
+
+    def wait_for_frames(self, timeout: float = 3.0) -> Optional[MultiFrameSet]:
+        """
+        Latest frames that arrived since the previous call, from all devices.
+        return None when nothing arrived after timeout
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._fresh or self._errors, timeout)
+            if self._errors:
+                serial, error = next(iter(self._errors.items()))
+                raise RuntimeError(f"Streaming from device {serial} failed: {error}") from error
+            frames, self._fresh = self._fresh, {}
+        return frames or None
+
+    def dropped_frames(self, serial: str) -> dict[Stream, int]:
+        return self._drivers[serial].dropped_frames
+
+    def stats(self) -> dict[str, DeviceStats]:
+        """
+        Per-device framesets, fps over the last second and dropped frames
+        """
+        return {
+            serial: DeviceStats(
+                serial=serial,
+                framesets=self._counts.get(serial, 0),
+                fps=self._fps.get(serial, 0.0),
+                dropped=sum(driver.dropped_frames.values()),
+            )
+            for serial, driver in self._drivers.items()
+        }
+
+    def stop(self) -> None:
+        """
+        Stop workers and streaming on all devices
+        """
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for serial, driver in self._drivers.items():
+            logger.info("stopping device {}", serial)
+            driver.stop()
@@ -1,14 +1,21 @@
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, TYPE_CHECKING
 
 from rich import box
 from rich.console import Console
 from rich.table import Table
 
-from realsense_cli.rs_bag_parser import TopicInfo
-from realsense_cli.types import DeviceInfo, Option, Sensor, Profile
+from realsense_cli.types import ControlChange, DeviceInfo, Option, Sensor, Profile, Stream
+from realsense_cli.stats import key_name
 from realsense_cli.utils import group_profiles
 
+if TYPE_CHECKING:
+    from realsense_cli.rs_bag_parser import TopicInfo
+    from realsense_cli.stats import LatencyHistogram, LatencyStage
+    from realsense_cli.bench import BenchResult
+    from realsense_cli.writer import WriterStats
+    from realsense_cli.pointcloud import CloudThroughput
+
 _console = Console(width=120)
 
 
@@ -67,6 +74,23 @@ def list_options_values(options_values: dict[str, Any]):
     _console.print(table)
 
 
+def control_changes(sensor: Sensor, changes: dict[str, ControlChange]):
+    """
+    Print a table of applied controls, previous and read back values
+    """
+    table = Table(title=f"{sensor.value} controls", box=box.SIMPLE)
+    table.add_column("Name")
+    table.add_column("Previous")
+    table.add_column("Value")
+    table.add_column("Status")
+
+    for name, change in changes.items():
+        status = "set" if change.written else "unchanged"
+        table.add_row(name, str(change.previous), str(change.value), status)
+
+    _console.print(table)
+
+
 def list_profiles(profiles: list[Profile], title: str = "Streams"):
     table = Table(title=title, box=box.SIMPLE)
     table.add_column("Stream")
@@ -86,17 +110,145 @@ def list_profiles(profiles: list[Profile], title: str = "Streams"):
     _console.print(table)
 
 
-def list_bag_data(path: Path, duration: float, topics: list[TopicInfo]):
+def list_bag_data(path: Path, duration: float, topics: list["TopicInfo"], chunks: int = 0):
     info_table = Table(box=box.SIMPLE_HEAD)
     info_table.add_column()
     info_table.add_column()
     info_table.add_row("Bag", str(path))
     info_table.add_row("Duration", f"{duration} seconds")
+    info_table.add_row("Chunks", str(chunks))
+    start = min((t.first_timestamp for t in topics if t.total_messages), default=0)
     table = Table(title="Data", box=box.SIMPLE)
     table.add_column("Topic")
     table.add_column("Messages")
     table.add_column("Message Type")
+    table.add_column("First [s]")
+    table.add_column("Last [s]")
     for info in topics:
-        table.add_row(info.name, str(info.total_messages), info.msg_type)
+        first, last = "", ""
+        if info.total_messages:
+            first = f"{(info.first_timestamp - start) / 1e9:.3f}"
+            last = f"{(info.last_timestamp - start) / 1e9:.3f}"
+        table.add_row(info.name, str(info.total_messages), info.msg_type, first, last)
     _console.print(table)
     Console().print(info_table)
+
+
+def list_extracted(out: Path, counts: dict[str, int]):
+    table = Table(title=f"Extracted to {out}", box=box.SIMPLE)
+    table.add_column("Topic")
+    table.add_column("Messages")
+    for topic, count in counts.items():
+        table.add_row(topic, str(count))
+    _console.print(table)
+
+
+def recording_status(out: Path, stats: "WriterStats", dropped: dict[Stream, int]) -> Table:
+    table = Table(title=f"Recording to {out}", box=box.SIMPLE)
+    table.add_column("Written")
+    table.add_column("Queued")
+    table.add_column("MB/s")
+    table.add_column("Writer drops")
+    table.add_column("Device drops")
+    table.add_row(
+        str(stats.written),
+        str(stats.queued),
+        f"{stats.throughput:.1f}",
+        str(stats.dropped),
+        str(sum(dropped.values())),
+    )
+    return table
+
+
+def pointcloud_status(
+    throughput: "CloudThroughput",
+    target_fps: int,
+    stats: Optional["WriterStats"],
+    dropped: dict[Stream, int],
+) -> Table:
+    compute = throughput.compute.summary()
+    title = f"Point clouds, target {target_fps} fps" if target_fps else "Point clouds"
+    table = Table(title=title, box=box.SIMPLE)
+    for column in ("Clouds", "FPS", "Mpts/s", "p50 ms", "p99 ms"):
+        table.add_column(column, justify="right")
+    row = [
+        str(throughput.clouds),
+        f"{throughput.fps:.1f}",
+        f"{throughput.points / throughput.elapsed / 1e6:.1f}",
+        f"{compute['p50']:.2f}",
+        f"{compute['p99']:.2f}",
+    ]
+    if stats is not None:
+        for column in ("Queued", "MB/s", "Writer drops"):
+            table.add_column(column, justify="right")
+        row += [str(stats.queued), f"{stats.throughput:.1f}", str(stats.dropped)]
+    table.add_column("Device drops", justify="right")
+    row.append(str(sum(dropped.values())))
+    table.add_row(*row)
+    return table
+
+
+def latency_table(histograms: dict[tuple[Any, "LatencyStage"], "LatencyHistogram"]) -> Table:
+    table = Table(title="Latency (ms)", box=box.SIMPLE)
+    for column in ("Stream", "Stage", "Frames", "Min", "p50", "p90", "p99", "p99.9", "Max"):
+        table.add_column(column, justify="left" if column in ("Stream", "Stage") else "right")
+    for (key, stage), histogram in histograms.items():
+        summary = histogram.summary()
+        table.add_row(
+            key_name(key),
+            stage.value,
+            str(histogram.count),
+            *(f"{summary[col]:.2f}" for col in ("min", "p50", "p90", "p99", "p99.9", "max")),
+        )
+    return table
+
+
+def latency_summary(histograms: dict[tuple[Any, "LatencyStage"], "LatencyHistogram"]) -> None:
+    _console.print(latency_table(histograms))
+
+
+def bench_summary(result: "BenchResult") -> None:
+    info_table = Table(box=box.SIMPLE_HEAD)
+    info_table.add_column()
+    info_table.add_column()
+    info_table.add_row("Driver", result.driver)
+    info_table.add_row("Machine", result.machine)
+    info_table.add_row("Duration", f"{result.duration:.2f} seconds")
+    info_table.add_row("Framesets", str(result.framesets))
+    info_table.add_row("Timeouts", str(result.timeouts))
+    cpu = result.cpu_per_frameset
+    info_table.add_row(
+        "CPU per frameset",
+        f"mean {cpu['mean']:.3f}ms, p50 {cpu['p50']:.3f}ms, p99 {cpu['p99']:.3f}ms",
+    )
+    if result.sync is not None:
+        info_table.add_row(
+            "Sync",
+            ", ".join(f"{count} {name}" for name, count in result.sync.items()),
+        )
+    table = Table(title="Streams", box=box.SIMPLE)
+    for column in (
+        "Profile",
+        "Frames",
+        "FPS",
+        "Dropped",
+        "Drop rate",
+        "Interval",
+        "p99",
+        "Max",
+    ):
+        table.add_column(column, justify="left" if column == "Profile" else "right")
+    for stream in result.streams:
+        timing = stream.timing
+        table.add_row(
+            stream.profile,
+            str(stream.frames),
+            f"{stream.fps:.2f}",
+            str(stream.dropped),
+            f"{stream.drop_rate:.2%}",
+            f"{timing.interval_mean:.2f}±{timing.interval_std:.2f}ms",
+            f"{timing.interval_p99:.2f}ms",
+            f"{timing.max_gap:.2f}ms",
+        )
+    _console.print(info_table)
+    _console.print(table)
@@ -1,9 +1,26 @@
-from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+import struct
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import NamedTuple
+from typing import Any, NamedTuple, Optional, TYPE_CHECKING
 
-from rosbags.rosbag1 import Reader
-from rosbags.typesys import Stores, get_typestore, get_types_from_idl
+from loguru import logger
+
+from realsense_cli.cache import cache_dir, load_cache, store_cache
+
+if TYPE_CHECKING:
+    import numpy as np
+    from rosbags.rosbag1 import Reader
+    from rosbags.typesys.store import Typestore
+
+# rosbags (and numpy through it) are imported on first use, bag info answered from the
+# index cache doesn't need them
+
+IMAGE_MSGTYPE = "sensor_msgs/msg/Image"
+IMU_MSGTYPE = "sensor_msgs/msg/Imu"
 
 _rs_msgs_idl = """
 module realsense_msgs {
@@ -41,31 +58,275 @@ class TopicInfo(NamedTuple):
     name: str
     msg_type: str
     total_messages: int
+    first_timestamp: int = 0
+    last_timestamp: int = 0
+
+
+class ChunkInfo(NamedTuple):
+    pos: int
+    start_time: int
+    end_time: int
+
+
+class ImageMessage(NamedTuple):
+    seq: int
+    timestamp: int
+    encoding: str
+    data: "np.ndarray"
+
+
+class ImuMessage(NamedTuple):
+    seq: int
+    timestamp: int
+    angular_velocity: tuple[float, float, float]
+    linear_acceleration: tuple[float, float, float]
+
+
+# element type and channels per sensor_msgs/Image encoding
+_ENCODINGS: dict[str, tuple[str, int]] = {
+    "mono8": ("uint8", 1),
+    "8UC1": ("uint8", 1),
+    "mono16": ("uint16", 1),
+    "16UC1": ("uint16", 1),
+    "32FC1": ("float32", 1),
+    "rgb8": ("uint8", 3),
+    "bgr8": ("uint8", 3),
+    "rgba8": ("uint8", 4),
+    "bgra8": ("uint8", 4),
+    "yuv422": ("uint8", 2),
+    "yuyv": ("uint8", 2),
+    "uyvy": ("uint8", 2),
+}
+
+_UINT32 = struct.Struct("<I")
+_IMAGE_FIELDS = struct.Struct("<II")
+_IMAGE_LAYOUT = struct.Struct("<BII")
+
+
+def _read_string(buf: memoryview, offset: int) -> tuple[str, int]:
+    (size,) = _UINT32.unpack_from(buf, offset)
+    offset += _UINT32.size
+    return bytes(buf[offset : offset + size]).decode(), offset + size
+
+
+def decode_image(rawdata: bytes) -> ImageMessage:
+    """
+    Decode serialized ROS1 sensor_msgs/Image straight into an array viewing RAWDATA.
+    Bytes following the image data (realsense appends 4 unknown bytes) are ignored
+    """
+    import numpy as np
+
+    buf = memoryview(rawdata)
+    seq, sec, nsec = struct.unpack_from("<III", buf, 0)
+    _, offset = _read_string(buf, 12)  # frame_id
+    height, width = _IMAGE_FIELDS.unpack_from(buf, offset)
+    encoding, offset = _read_string(buf, offset + _IMAGE_FIELDS.size)
+    is_bigendian, step, size = _IMAGE_LAYOUT.unpack_from(buf, offset)
+    offset += _IMAGE_LAYOUT.size
+
+    dtype, channels = _ENCODINGS.get(encoding, ("uint8", 0))
+    data = np.frombuffer(buf, dtype=np.uint8, count=size, offset=offset)
+    if channels and height and width:
+        rows = data.reshape(height, step)
+        dt = np.dtype(dtype).newbyteorder(">" if is_bigendian else "<")
+        data = rows[:, : width * channels * dt.itemsize].view(dt)
+        if channels > 1:
+            data = data.reshape(height, width, channels)
+    return ImageMessage(seq, sec * 1_000_000_000 + nsec, encoding, data)
+
+
+_INDEX_VERSION = 1
+_INDEX_SUFFIX = ".idx.json"
+# rosbag v2 header record is padded to 4096 bytes, it holds the index position and counts
+_BAG_HEADER_SIZE = 4096
+
+
+@dataclass
+class BagIndex:
+    key: dict[str, Any]
+    start_time: int
+    end_time: int
+    topics: list[TopicInfo]
+    chunks: list[ChunkInfo]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BagIndex":
+        return cls(
+            key=data["key"],
+            start_time=data["start_time"],
+            end_time=data["end_time"],
+            topics=[TopicInfo(*t) for t in data["topics"]],
+            chunks=[ChunkInfo(*c) for c in data["chunks"]],
+        )
+
+
+def _index_key(path: Path) -> dict[str, Any]:
+    stat = path.stat()
+    with open(path, "rb") as f:
+        header = hashlib.sha1(f.read(_BAG_HEADER_SIZE)).hexdigest()
+    return {
+        "version": _INDEX_VERSION,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "header": header,
+    }
+
+
+def _cache_name(path: Path) -> str:
+    return "bag-" + hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+
+
+def load_bag_index(path: Path) -> Optional[BagIndex]:
+    """
+    Cached index of the bag at PATH, from the sidecar file next to it or from the cache
+    directory. None when missing or stale
+    """
+    if cache_dir() is None:
+        return None
+    sidecar = path.with_name(path.name + _INDEX_SUFFIX)
+    try:
+        with open(sidecar) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = load_cache(_cache_name(path))
+    except (OSError, ValueError) as e:
+        logger.warning("ignoring unreadable bag index {}: {}", sidecar, e)
+        data = {}
+    if not data:
+        return None
+    if data.get("key") != _index_key(path):
+        logger.info("bag index of {} is stale", path)
+        return None
+    try:
+        return BagIndex.from_dict(data)
+    except (KeyError, TypeError) as e:
+        logger.warning("ignoring malformed bag index of {}: {}", path, e)
+        return None
+
+
+def store_bag_index(path: Path, index: BagIndex) -> None:
+    """
+    Write INDEX to a sidecar file next to the bag, or to the cache directory when the bag's
+    directory is not writable
+    """
+    if cache_dir() is None:
+        return
+    data = asdict(index)
+    sidecar = path.with_name(path.name + _INDEX_SUFFIX)
+    tmp = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, sidecar)
+        logger.debug("stored bag index {}", sidecar)
+    except OSError as e:
+        logger.debug("can't write sidecar index {} ({}), using cache directory", sidecar, e)
+        store_cache(_cache_name(path), data)
 
 
 @dataclass
 class RosParser:
     path: Path
+    reindex: bool = False
     duration: float = field(init=False)
     topics: dict[str, TopicInfo] = field(init=False, default_factory=dict)
-    _reader: Reader = field(init=False)
+    chunks: list[ChunkInfo] = field(init=False, default_factory=list)
+    _reader: Optional["Reader"] = field(init=False, default=None)
+    _typestore: Optional["Typestore"] = field(init=False, default=None)
 
     def __post_init__(self):
-        typestore = get_typestore(Stores.ROS1_NOETIC)
-        typestore.register(get_types_from_idl(_rs_msgs_idl))
-        self._reader = Reader(self.path)
-        self._reader.open()
-        self.duration = self._reader.duration / 1e9
-        for conn in self._reader.connections:
-            self.topics[conn.topic] = TopicInfo(conn.topic, conn.msgtype, conn.msgcount)
+        index = None if self.reindex else load_bag_index(self.path)
+        if index is None:
+            index = self._build_index()
+            store_bag_index(self.path, index)
+        else:
+            logger.info("using cached index of {}", self.path)
+        self.duration = max(index.end_time - index.start_time, 0) / 1e9
+        self.topics = {topic.name: topic for topic in index.topics}
+        self.chunks = index.chunks
+
+    def _build_index(self) -> BagIndex:
+        key = _index_key(self.path)
+        reader = self._open()
+        topics: dict[str, TopicInfo] = {}
+        for conn in reader.connections:
+            entries = reader.indexes.get(conn.id, [])
+            first = min((e.time for e in entries), default=0)
+            last = max((e.time for e in entries), default=0)
+            if conn.topic in topics:
+                # several connections publishing on one topic
+                prev = topics[conn.topic]
+                first = min(prev.first_timestamp, first) if prev.total_messages else first
+                last = max(prev.last_timestamp, last)
+                msgcount = prev.total_messages + conn.msgcount
+            else:
+                msgcount = conn.msgcount
+            topics[conn.topic] = TopicInfo(conn.topic, conn.msgtype, msgcount, first, last)
+        chunks = [ChunkInfo(c.pos, c.start_time, c.end_time) for c in reader.chunk_infos]
+        return BagIndex(
+            key=key,
+            start_time=reader.start_time if chunks else 0,
+            end_time=reader.end_time,
+            topics=list(topics.values()),
+            chunks=chunks,
+        )
+
+    def _open(self) -> "Reader":
+        if self._reader is None:
+            from rosbags.rosbag1 import Reader
+
+            self._reader = Reader(self.path)
+            self._reader.open()
+        return self._reader
+
+    @property
+    def typestore(self) -> "Typestore":
+        if self._typestore is None:
+            from rosbags.typesys import Stores, get_typestore, get_types_from_idl
+
+            self._typestore = get_typestore(Stores.ROS1_NOETIC)
+            self._typestore.register(get_types_from_idl(_rs_msgs_idl))
+        return self._typestore
 
     def __enter__(self):
         return self
 
     def __exit__(self, *_):
-        self._reader.close()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def messages(
+        self, topics: Optional[list[str]] = None
+    ) -> Iterator[tuple[TopicInfo, int, bytes]]:
+        """
+        Lazily read raw messages of TOPICS (all topics when None) in time order,
+        one chunk of the bag is held in memory at a time
+        """
+        reader = self._open()
+        connections = [
+            conn for conn in reader.connections if topics is None or conn.topic in topics
+        ]
+        if not connections:
+            return
+        for conn, timestamp, rawdata in reader.messages(connections=connections):
+            yield self.topics[conn.topic], timestamp, rawdata
+
+    def deserialize(self, rawdata: bytes, msg_type: str) -> Any:
+        from rosbags.serde import SerdeError
+
+        try:
+            return self.typestore.deserialize_ros1(rawdata, msg_type)
+        except SerdeError:
+            # realsense appends 4 unknown bytes to some messages
+            return self.typestore.deserialize_ros1(rawdata[:-4], msg_type)
 
-            # if conn.msgtype == 'sensor_msgs/msg/Image':
-            #     # extra unknown 4 bytes at the end
-            #     rd = rd[:-4]
-            # msg = deserialize_ros1(rd, conn.msgtype)
+    def decode_imu(self, rawdata: bytes) -> ImuMessage:
+        msg = self.deserialize(rawdata, IMU_MSGTYPE)
+        av, la = msg.angular_velocity, msg.linear_acceleration
+        return ImuMessage(
+            seq=msg.header.seq,
+            timestamp=msg.header.stamp.sec * 1_000_000_000 + msg.header.stamp.nanosec,
+            angular_velocity=(av.x, av.y, av.z),
+            linear_acceleration=(la.x, la.y, la.z),
+        )
@@ -0,0 +1,159 @@
+from pathlib import Path
+from typing import Any, Optional
+
+from loguru import logger
+
+from realsense_cli.rs_bag_parser import IMAGE_MSGTYPE, IMU_MSGTYPE, _rs_msgs_idl
+from realsense_cli.types import Frame, Profile, Stream
+from realsense_cli.writer import ThreadedWriter
+
+# librealsense records bag format version 3
+FILE_VERSION = 3
+STREAM_INFO_MSGTYPE = "realsense_msgs/msg/StreamInfo"
+KEY_VALUE_MSGTYPE = "diagnostic_msgs/msg/KeyValue"
+
+# sensor numbering of librealsense recordings
+_SENSOR_INDEX = {
+    Stream.DEPTH: 0,
+    Stream.INFRARED: 0,
+    Stream.INFRARED2: 0,
+    Stream.COLOR: 1,
+    Stream.GYRO: 2,
+    Stream.ACCEL: 2,
+}
+
+# ROS image encoding per stream format
+_ROS_ENCODINGS = {
+    "z16": "mono16",
+    "y8": "mono8",
+    "y16": "mono16",
+    "raw16": "mono16",
+    "disparity32": "32FC1",
+    "distance": "32FC1",
+    "yuyv": "yuv422",
+    "uyvy": "uyvy",
+    "rgb8": "rgb8",
+    "bgr8": "bgr8",
+    "rgba8": "rgba8",
+    "bgra8": "bgra8",
+}
+
+
+def _ros_encoding(profile: Profile) -> str:
+    return _ROS_ENCODINGS.get(profile.format.lower(), profile.format.lower())
+
+
+def stream_topic(profile: Profile) -> str:
+    """
+    Topic prefix of PROFILE's stream, following librealsense recordings,
+    e.g. /device_0/sensor_0/Depth_0
+    """
+    name = profile.stream.value.split()[0]
+    return f"/device_0/sensor_{_SENSOR_INDEX[profile.stream]}/{name}_{max(profile.index, 0)}"
+
+
+class BagWriter(ThreadedWriter[Frame]):
+    """
+    Record frames into a rosbag1 file laid out like librealsense recordings.
+    Frames must own their data (see Frame.copy), they are serialized on the writer thread
+    """
+
+    def __init__(self, path: Path, capacity: int = 64):
+        from rosbags.rosbag1 import Writer, WriterError
+        from rosbags.typesys import Stores, get_types_from_idl, get_typestore
+
+        super().__init__(capacity, name="bag-writer")
+        self.path = path
+        self._typestore = get_typestore(Stores.ROS1_NOETIC)
+        self._typestore.register(get_types_from_idl(_rs_msgs_idl))
+        self._bag = Writer(path)
+        try:
+            self._bag.open()
+        except WriterError as e:
+            raise ValueError(f"Can't record to {path}: {e}") from e
+        self._connections: dict[str, Any] = {}
+        self._start: Optional[int] = None
+        version = self._typestore.types["std_msgs/msg/UInt32"](data=FILE_VERSION)
+        self._write_message("/file_version", "std_msgs/msg/UInt32", 0, version)
+
+    def _write(self, frame: Frame) -> int:
+        import numpy as np
+
+        types = self._typestore.types
+        stamp_ns = int(frame.timestamp * 1_000_000)  # ms to ns
+        if self._start is None:
+            self._start = stamp_ns
+        # bag time is relative to the first recorded frame, like librealsense recordings
+        timestamp = max(stamp_ns - self._start, 0)
+        stamp = types["builtin_interfaces/msg/Time"](
+            sec=stamp_ns // 1_000_000_000, nanosec=stamp_ns % 1_000_000_000
+        )
+        header = types["std_msgs/msg/Header"](seq=frame.index, stamp=stamp, frame_id="0")
+
+        topic = stream_topic(frame.profile)
+        if f"{topic}/info" not in self._connections:
+            self._write_stream_info(frame.profile)
+
+        data = frame.data
+        if data is None:
+            data = np.empty(0, dtype=np.uint8)
+        if frame.profile.stream in (Stream.GYRO, Stream.ACCEL):
+            topic = f"{topic}/imu"
+            vector = types["geometry_msgs/msg/Vector3"]
+            xyz = vector(*(float(v) for v in data.reshape(-1)[:3]))
+            zero = vector(x=0.0, y=0.0, z=0.0)
+            msg = types[IMU_MSGTYPE](
+                header=header,
+                orientation=types["geometry_msgs/msg/Quaternion"](x=0, y=0, z=0, w=1),
+                orientation_covariance=np.zeros(9),
+                angular_velocity=xyz if frame.profile.stream == Stream.GYRO else zero,
+                angular_velocity_covariance=np.zeros(9),
+                linear_acceleration=xyz if frame.profile.stream == Stream.ACCEL else zero,
+                linear_acceleration_covariance=np.zeros(9),
+            )
+            written = self._write_message(f"{topic}/data", IMU_MSGTYPE, timestamp, msg)
+        else:
+            topic = f"{topic}/image"
+            height, width = data.shape[:2] if data.ndim > 1 else (1, data.size)
+            raw = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+            msg = types[IMAGE_MSGTYPE](
+                header=header,
+                height=height,
+                width=width,
+                encoding=_ros_encoding(frame.profile),
+                is_bigendian=0,
+                step=raw.size // height if height else 0,
+                data=raw,
+            )
+            written = self._write_message(f"{topic}/data", IMAGE_MSGTYPE, timestamp, msg)
+
+        key_value = types[KEY_VALUE_MSGTYPE]
+        for key, value in frame.metadata.items():
+            md = key_value(key=key, value=str(value))
+            written += self._write_message(
+                f"{topic}/metadata", KEY_VALUE_MSGTYPE, timestamp, md
+            )
+        return written
+
+    def _write_stream_info(self, profile: Profile) -> None:
+        types = self._typestore.types
+        info = types[STREAM_INFO_MSGTYPE](
+            fps=profile.fps,
+            encoding=_ros_encoding(profile),
+            is_recommended=types["std_msgs/msg/Bool"](data=False),
+        )
+        topic = stream_topic(profile)
+        logger.debug("recording {} to {}", profile, topic)
+        self._write_message(f"{topic}/info", STREAM_INFO_MSGTYPE, 0, info)
+
+    def _write_message(self, topic: str, msgtype: str, timestamp: int, msg: Any) -> int:
+        conn = self._connections.get(topic)
+        if conn is None:
+            conn = self._bag.add_connection(topic, msgtype, typestore=self._typestore)
+            self._connections[topic] = conn
+        raw = self._typestore.serialize_ros1(msg, msgtype)
+        self._bag.write(conn, timestamp, raw)
+        return len(raw)
+
+    def _finish(self) -> None:
+        self._bag.close()
@@ -0,0 +1,384 @@
+import math
+from array import array
+from collections.abc import Hashable, Mapping
+from dataclasses import dataclass
+from enum import Enum
+from typing import Generic, Optional, TypeVar, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from realsense_cli.types import Frame
+
+K = TypeVar("K", bound=Hashable)
+
+
+class DropCounter(Generic[K]):
+    """
+    Count frames lost per stream from gaps in consecutive frame numbers
+    """
+
+    def __init__(self):
+        self._last: dict[K, int] = {}
+        self._dropped: dict[K, int] = {}
+
+    def update(self, key: K, index: int) -> int:
+        """
+        Register frame number INDEX for KEY and return how many frames were skipped before it
+        """
+        last = self._last.get(key)
+        self._last[key] = index
+        if last is None:
+            self._dropped[key] = 0
+            return 0
+        gap = index - last - 1
+        if gap <= 0:
+            # repeated frame or counter restarted
+            return 0
+        self._dropped[key] += gap
+        return gap
+
+    @property
+    def dropped(self) -> dict[K, int]:
+        return dict(self._dropped)
+
+    def reset(self) -> None:
+        self._last = {}
+        self._dropped = {}
+
+
+@dataclass
+class TimingSummary:
+    frames: int
+    fps: float
+    ewma_fps: float
+    interval_mean: float  # ms
+    interval_std: float  # ms
+    interval_p99: float  # ms
+    max_gap: float  # ms
+
+
+class StreamStats:
+    """
+    Frame timing of a single stream over a rolling window of the last WINDOW intervals.
+    Timestamps are in milliseconds, update is O(1): the window is a ring buffer with
+    running sums, only the percentile sorts the window when queried
+    """
+
+    def __init__(self, window: int = 128, alpha: float = 0.1):
+        if window < 1:
+            raise ValueError(f"Stats window must be positive, got {window}")
+        self._size = window
+        self._alpha = alpha
+        self._intervals = array("d", bytes(8 * window))
+        self.reset()
+
+    def reset(self) -> None:
+        self._pos = 0
+        self._filled = 0
+        self._sum = 0.0
+        self._sq_sum = 0.0
+        self._ewma = 0.0
+        self._last: Optional[float] = None
+        self.frames = 0
+        self.max_gap = 0.0
+
+    def update(self, timestamp: float) -> None:
+        self.frames += 1
+        last, self._last = self._last, timestamp
+        if last is None:
+            return
+        interval = timestamp - last
+        if self._filled == self._size:
+            old = self._intervals[self._pos]
+            self._sum -= old
+            self._sq_sum -= old * old
+        else:
+            self._filled += 1
+        self._intervals[self._pos] = interval
+        self._pos = (self._pos + 1) % self._size
+        self._sum += interval
+        self._sq_sum += interval * interval
+        if self._filled == 1:
+            self._ewma = interval
+        else:
+            self._ewma += self._alpha * (interval - self._ewma)
+        self.max_gap = max(self.max_gap, interval)
+
+    @property
+    def fps(self) -> float:
+        return 1000 * self._filled / self._sum if self._sum > 0 else 0.0
+
+    @property
+    def ewma_fps(self) -> float:
+        return 1000 / self._ewma if self._ewma > 0 else 0.0
+
+    @property
+    def interval_mean(self) -> float:
+        return self._sum / self._filled if self._filled else 0.0
+
+    @property
+    def interval_std(self) -> float:
+        if not self._filled:
+            return 0.0
+        mean = self._sum / self._filled
+        # running sums drift slightly below zero for constant intervals
+        return math.sqrt(max(self._sq_sum / self._filled - mean * mean, 0.0))
+
+    def percentile(self, q: float) -> float:
+        if not self._filled:
+            return 0.0
+        window = sorted(self._intervals[: self._filled])
+        rank = min(max(math.ceil(q / 100 * self._filled), 1), self._filled)
+        return window[rank - 1]
+
+    def summary(self) -> TimingSummary:
+        return TimingSummary(
+            frames=self.frames,
+            fps=self.fps,
+            ewma_fps=self.ewma_fps,
+            interval_mean=self.interval_mean,
+            interval_std=self.interval_std,
+            interval_p99=self.percentile(99),
+            max_gap=self.max_gap,
+        )
+
+
+@dataclass
+class DepthStats:
+    fill_rate: float  # fraction of pixels with depth
+    min: float  # m
+    median: float  # m
+    max: float  # m
+    # pixels with depth per equal width bin over [0, max_range), the last bin includes farther
+    histogram: list[int]
+    max_range: float  # m
+
+
+def depth_stats(
+    depth: "np.ndarray",
+    depth_units: float,
+    decimation: int = 4,
+    bins: int = 8,
+    max_range: float = 10.0,
+) -> DepthStats:
+    """
+    Fill rate, range and coarse histogram of a depth frame, sampling every DECIMATION-th
+    pixel of every DECIMATION-th row
+    """
+    import numpy as np
+
+    sample = depth[::decimation, ::decimation]
+    valid = sample[sample > 0]
+    if not valid.size:
+        return DepthStats(0.0, 0.0, 0.0, 0.0, [0] * bins, max_range)
+    edges = np.linspace(0, max_range / depth_units, bins + 1)
+    edges[-1] = np.inf
+    counts, _ = np.histogram(valid, bins=edges)
+    low, high = valid.min(), valid.max()
+    return DepthStats(
+        fill_rate=valid.size / sample.size,
+        min=float(low) * depth_units,
+        median=float(np.median(valid)) * depth_units,
+        max=float(high) * depth_units,
+        histogram=counts.tolist(),
+        max_range=max_range,
+    )
+
+
+@dataclass
+class ImuStats:
+    samples: int
+    rate: float  # Hz
+    max_interval: float  # ms
+    # intervals longer than 1.5 nominal intervals, and the samples estimated missing in them
+    gaps: int
+    missing: int
+
+
+def imu_stats(timestamps: "np.ndarray", fps: int = 0, previous: float = math.nan) -> ImuStats:
+    """
+    Rate and gaps of motion samples at TIMESTAMPS (ms), nominally FPS per second.
+    PREVIOUS is the timestamp of the sample before the first, so gaps between consecutive
+    batches count too. Without FPS the median interval is taken as nominal
+    """
+    import numpy as np
+
+    if not math.isnan(previous):
+        timestamps = np.concatenate(([previous], timestamps))
+    intervals = np.diff(timestamps)
+    if not intervals.size:
+        return ImuStats(len(timestamps), 0.0, 0.0, 0, 0)
+    nominal = 1000 / fps if fps else float(np.median(intervals))
+    span = timestamps[-1] - timestamps[0]
+    long = intervals[intervals > 1.5 * nominal] if nominal > 0 else intervals[:0]
+    return ImuStats(
+        samples=len(timestamps) - (not math.isnan(previous)),
+        rate=intervals.size * 1000 / span if span > 0 else 0.0,
+        max_interval=float(intervals.max()),
+        gaps=long.size,
+        missing=int(np.rint(long / nominal).sum()) - long.size if long.size else 0,
+    )
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of latencies in milliseconds.
+    Values are recorded in microseconds into log-linear buckets: exact below 64us, then
+    32 linear buckets per power of two, so percentiles are within ~3% at any magnitude
+    while recording stays O(1) with a fixed memory footprint
+    """
+
+    _SUB_BITS = 5
+    _SUB_COUNT = 1 << _SUB_BITS
+    # ~71 minutes, larger values land in the last bucket
+    _MAX_US = 1 << 32
+
+    def __init__(self):
+        self._counts = array("Q", bytes(8 * (self._index(self._MAX_US) + 1)))
+        self.count = 0
+        self.negative = 0
+        self._sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        if value < 2 * cls._SUB_COUNT:
+            return value
+        shift = value.bit_length() - cls._SUB_BITS - 1
+        return cls._SUB_COUNT * shift + (value >> shift)
+
+    @classmethod
+    def _value(cls, index: int) -> int:
+        """
+        Middle of the range of values in bucket INDEX, in microseconds
+        """
+        if index < 2 * cls._SUB_COUNT:
+            return index
+        shift = index // cls._SUB_COUNT - 1
+        low = (index - cls._SUB_COUNT * shift) << shift
+        return low + (1 << shift) // 2
+
+    def record(self, latency: float) -> None:
+        self.count += 1
+        self._sum += latency
+        self.min = min(self.min, latency)
+        self.max = max(self.max, latency)
+        if latency < 0:
+            # clocks not in sync, counted but kept out of the buckets
+            self.negative += 1
+            return
+        index = min(self._index(int(latency * 1000)), len(self._counts) - 1)
+        self._counts[index] += 1
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        total = self.count - self.negative
+        if not total:
+            return 0.0
+        rank = max(math.ceil(q / 100 * total), 1)
+        if rank >= total:
+            return self.max
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._value(index) / 1000, self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "negative": self.negative,
+            "min": self.min if self.count else 0.0,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p99.9": self.percentile(99.9),
+            "max": self.max if self.count else 0.0,
+        }
+
+
+def key_name(key: Hashable) -> str:
+    """
+    Readable name of a stats key, a Stream or a tuple like (serial, Stream)
+    """
+    keys = key if isinstance(key, tuple) else (key,)
+    return " ".join(str(k.value) if isinstance(k, Enum) else str(k) for k in keys)
+
+
+class LatencyStage(Enum):
+    SENSOR_TO_ARRIVAL = "sensor→arrival"
+    SENSOR_TO_BACKEND = "sensor→backend"
+    BACKEND_TO_ARRIVAL = "backend→arrival"
+    ARRIVAL_TO_PYTHON = "arrival→python"
+
+
+class LatencyTracker:
+    """
+    Per-stream latency histograms of the stages a frame goes through, from its metadata:
+    sensor timestamp -> backend_timestamp (USB transfer) -> time_of_arrival (librealsense
+    processing) -> handed to python (frame queue and consumer).
+    Sensor stages need the frame timestamp on the host clock (global time), frames
+    timestamped by the device clock only contribute the host stages
+    """
+
+    ARRIVAL = "time_of_arrival"
+    BACKEND = "backend_timestamp"
+
+    def __init__(self):
+        self._histograms: dict[tuple[Hashable, LatencyStage], LatencyHistogram] = {}
+
+    def _record(self, key: Hashable, stage: LatencyStage, latency: float) -> None:
+        histogram = self._histograms.get((key, stage))
+        if histogram is None:
+            histogram = self._histograms[(key, stage)] = LatencyHistogram()
+        histogram.record(latency)
+
+    def update(self, frames: Mapping[Hashable, "Frame"]) -> None:
+        """
+        Record latencies of FRAMES, keyed by stream (or by any key, e.g. (serial, stream))
+        """
+        for stream, frame in frames.items():
+            arrival = frame.metadata.get(self.ARRIVAL)
+            backend = frame.metadata.get(self.BACKEND)
+            if frame.timestamp_domain != "hardware_clock":
+                if arrival is not None:
+                    self._record(
+                        stream, LatencyStage.SENSOR_TO_ARRIVAL, arrival - frame.timestamp
+                    )
+                if backend is not None:
+                    self._record(
+                        stream, LatencyStage.SENSOR_TO_BACKEND, backend - frame.timestamp
+                    )
+            if backend is not None and arrival is not None:
+                self._record(stream, LatencyStage.BACKEND_TO_ARRIVAL, arrival - backend)
+            if arrival is not None and frame.received:
+                self._record(stream, LatencyStage.ARRIVAL_TO_PYTHON, frame.received - arrival)
+
+    @property
+    def histograms(self) -> dict[tuple[Hashable, LatencyStage], LatencyHistogram]:
+        stages = list(LatencyStage)
+        return dict(
+            sorted(
+                self._histograms.items(),
+                key=lambda item: (key_name(item[0][0]), stages.index(item[0][1])),
+            )
+        )
+
+    def summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """
+        Histogram summaries by key name and stage
+        """
+        result: dict[str, dict[str, dict[str, float]]] = {}
+        for (key, stage), histogram in self.histograms.items():
+            result.setdefault(key_name(key), {})[stage.value] = histogram.summary()
+        return result
+
+    def reset(self) -> None:
+        self._histograms = {}
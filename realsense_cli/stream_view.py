@@ -1,68 +1,148 @@
-from dataclasses import dataclass
-from typing import Optional, Any
+import math
+import threading
+from typing import Optional
 
 from loguru import logger
-from rich.box import SIMPLE, SIMPLE_HEAD
-from rich.console import RenderableType, Group, group
+from rich.box import SIMPLE_HEAD
+from rich.console import Console, ConsoleOptions, Group, RenderableType, RenderResult
 from rich.panel import Panel
 
+from realsense_cli.printer import latency_table
+from realsense_cli.stats import DepthStats, LatencyTracker, StreamStats, depth_stats
 from realsense_cli.types import Stream, FrameSet, Frame, Profile
+from realsense_cli.utils import DEFAULT_DEPTH_UNITS
+
+_SPARK = " ▁▂▃▄▅▆▇█"
 
 
 class StreamView(Panel):
-    def __init__(self, streams: Optional[list[Stream]] = None, metadata: bool = True):
+    """
+    Live view of streams, one panel per stream.
+    update only keeps the latest frame of every stream, panels are formatted when the
+    view is rendered, so the frame rate doesn't depend on the terminal refresh rate.
+    Depth statistics are computed the same way, only for frames that are rendered.
+    New streams may add panels while rich renders the view from its refresh thread, the
+    panels and their state change together under a lock
+    """
+
+    def __init__(
+        self,
+        streams: Optional[list[Stream]] = None,
+        metadata: bool = True,
+        title: Optional[str] = None,
+        depth: bool = True,
+        depth_units: float = DEFAULT_DEPTH_UNITS,
+        decimation: int = 4,
+    ):
         logger.info("StreamView created")
         self._metadata = metadata
+        self._depth = depth
+        self._depth_units = depth_units
+        self._decimation = decimation
+        self._depth_stats: Optional[DepthStats] = None
         self._dynamic = not streams
         self._panels: dict[Stream, Panel] = {}
         self._title_set: dict[Stream, bool] = {}
-        self._prev_frame: dict[Stream, Optional[Frame]] = {}
+        self._latest: dict[Stream, Frame] = {}
+        self._dropped: dict[Stream, int] = {}
+        self._stats: dict[Stream, StreamStats] = {}
+        # frame shown by the previous render
+        self._rendered: dict[Stream, Optional[Frame]] = {}
+        self._lock = threading.Lock()
         self._regroup(streams)
 
-        super().__init__(Group(*self._panels.values()), box=SIMPLE_HEAD, title_align="center")
+        super().__init__(
+            Group(*self._panels.values()), box=SIMPLE_HEAD, title=title, title_align="center"
+        )
 
-    def update(self, frames: Optional[FrameSet]):
-        if not frames:
-            frames = {}
-        logger.debug("updating view for frameset {}", frames.keys())
-        for stream, frame in frames.items():
+    def update(self, frames: Optional[FrameSet], dropped: Optional[dict[Stream, int]] = None):
+        for stream, frame in (frames or {}).items():
             if stream not in self._panels:
                 if not self._dynamic:
                     continue
-                else:
-                    logger.debug("new stream in dynamic mode, regrouping")
-                    self._regroup([stream])
-            profile = frame.profile
+                logger.debug("new stream in dynamic mode, regrouping")
+                self._regroup([stream])
+            prev = self._latest.get(stream)
+            if prev is None or prev.index != frame.index:
+                self._stats[stream].update(frame.timestamp)
+            self._latest[stream] = frame
+        if dropped is not None:
+            self._dropped = dropped
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        self._refresh()
+        yield from super().__rich_console__(console, options)
+
+    def _refresh(self) -> None:
+        with self._lock:
+            self._refresh_panels()
+
+    def _refresh_panels(self) -> None:
+        for stream, panel in list(self._panels.items()):
+            frame = self._latest.get(stream)
+            if frame is None or frame is self._rendered[stream]:
+                continue
+            self._rendered[stream] = frame
             if not self._title_set[stream]:
-                self._panels[stream].title = self._gen_panel_title(profile)
+                panel.title = self._gen_panel_title(frame.profile)
                 self._title_set[stream] = True
 
-            metrics = {"index": frame.index, "fps": self._calc_fps(frame)}
-            panel_str: list[str] = [f"Frame #{metrics['index']:<8} FPS: {metrics['fps']:<4.2f}"]
+            stats = self._stats[stream]
+            panel_str: list[str] = [
+                f"Frame #{frame.index:<8} FPS: {stats.fps:<6.2f} EWMA: {stats.ewma_fps:.2f}",
+                f"Interval {stats.interval_mean:.2f}±{stats.interval_std:.2f}ms "
+                f"p99 {stats.percentile(99):.2f}ms max {stats.max_gap:.2f}ms",
+                f"Dropped {self._dropped.get(stream, 0)}",
+            ]
+            if self._depth and stream == Stream.DEPTH and frame.data is not None:
+                panel_str += self._depth_lines(frame)
             if self._metadata and frame.metadata:
                 longest = max(len(m) for m in frame.metadata.keys())
                 for md, val in frame.metadata.items():
                     name = md.replace("_", " ").title()
                     panel_str.append(f"{name.ljust(longest + 1)}={str(val).rjust(15)}")
-            self._panels[stream].renderable = "\n".join(panel_str)
-            self._panels[stream].width = max(self._panels[stream].width, len(panel_str[-1]) + 4)
+            panel.renderable = "\n".join(panel_str)
+            panel.width = max(panel.width, max(len(line) for line in panel_str) + 4)
+
+    def _depth_lines(self, frame: Frame) -> list[str]:
+        stats = self._depth_stats = depth_stats(frame.data, self._depth_units, self._decimation)
+        top = max(stats.histogram) or 1
+        spark = "".join(
+            _SPARK[math.ceil(count / top * (len(_SPARK) - 1))] for count in stats.histogram
+        )
+        return [
+            f"Fill {stats.fill_rate:6.1%}  Range {stats.min:.2f}-{stats.max:.2f}m "
+            f"median {stats.median:.2f}m",
+            f"Depth 0-{stats.max_range:g}m |{spark}|",
+        ]
 
     def _regroup(self, streams: Optional[list[Stream]]):
         logger.info("Regroup for streams {}", streams)
         if not streams:
             streams = []
-        for stream in streams:
-            panel = Panel("...", title=stream.value, width=35)
-            self._panels[stream] = panel
-            self._title_set[stream] = False
-            self._prev_frame[stream] = None
-
-        self.renderable = Group(*self._panels.values())
+        with self._lock:
+            for stream in streams:
+                self._title_set[stream] = False
+                self._rendered[stream] = None
+                self._stats[stream] = StreamStats()
+                self._panels[stream] = Panel("...", title=stream.value, width=35)
+            self.renderable = Group(*self._panels.values())
 
     @property
     def panels(self):
         return self._panels
 
+    @property
+    def stats(self) -> dict[Stream, StreamStats]:
+        return self._stats
+
+    @property
+    def depth_stats(self) -> Optional[DepthStats]:
+        """
+        Statistics of the last rendered depth frame
+        """
+        return self._depth_stats
+
     def _gen_panel_title(self, profile: Profile) -> str:
         return "{stream} ({index}) {width}x{height} {fps}fps {format}".format(
             stream=profile.stream.value,
@@ -73,19 +153,14 @@ class StreamView(Panel):
             fps=profile.fps,
         )
 
-    def _calc_fps(self, frame: Frame) -> float:
-        stream = frame.profile.stream
-        prev_frame = self._prev_frame[stream]
-        if not prev_frame:
-            self._prev_frame[stream] = frame
-            return 0
-        num = frame.index - prev_frame.index
-        delta = frame.timestamp - prev_frame.timestamp
-        logger.debug(
-            "calc fps {} - num = {}, delta = {}", frame.profile.stream.name, num, delta
-        )
-        self._prev_frame[stream] = frame
-        if not delta:
-            return 0
 
-        return 1000 * (num / delta)
+class LatencyView:
+    """
+    Latency histograms of a LatencyTracker, summarized when rendered
+    """
+
+    def __init__(self, tracker: LatencyTracker):
+        self._tracker = tracker
+
+    def __rich__(self) -> RenderableType:
+        return latency_table(self._tracker.histograms)
@@ -1,10 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import TYPE_CHECKING, Any, NamedTuple
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
 
 from loguru import logger
 
 if TYPE_CHECKING:
+    import numpy as np
     import pyrealsense2 as rs  # type: ignore
 
 
@@ -34,6 +35,17 @@ class Option:
     vtype: type
 
 
+class ControlChange(NamedTuple):
+    """
+    Outcome of applying a control value: the value before, the value read back after,
+    and whether it was written at all (skipped when it already had the requested value)
+    """
+
+    previous: float
+    value: float
+    written: bool
+
+
 class Stream(Enum):
     DEPTH = "Depth"
     INFRARED = "Infrared 1"
@@ -88,6 +100,27 @@ class CliSensor(Enum):
                 raise RuntimeError(f"Unmatched sensor: {self}")
 
 
+class ImageFormat(Enum):
+    NPY = "npy"
+    PNG = "png"
+
+
+class CloudFormat(Enum):
+    NPY = "npy"
+    PLY = "ply"
+
+
+class QueuePolicy(Enum):
+    """
+    What happens to frames while the consumer is busy:
+    LATEST keeps only the newest ones (live view), ALL holds on to every frame the
+    queue can fit (recording)
+    """
+
+    LATEST = "latest"
+    ALL = "all"
+
+
 class Resolution(NamedTuple):
     width: int
     height: int
@@ -159,12 +192,145 @@ class Profile:
         )
 
 
+@dataclass(frozen=True)
+class Intrinsics:
+    """
+    Pinhole camera model of a video stream, pixel coordinates to normalized image plane
+    """
+
+    width: int
+    height: int
+    fx: float
+    fy: float
+    ppx: float
+    ppy: float
+    # librealsense distortion model name, e.g. none, brown_conrady, inverse_brown_conrady
+    model: str = "none"
+    coeffs: tuple[float, ...] = (0.0, 0.0, 0.0, 0.0, 0.0)
+
+    @classmethod
+    def from_rs(cls, intrinsics: "rs.intrinsics") -> "Intrinsics":
+        """Convert pyrealsense2 intrinsics to Intrinsics"""
+        return cls(
+            width=intrinsics.width,
+            height=intrinsics.height,
+            fx=intrinsics.fx,
+            fy=intrinsics.fy,
+            ppx=intrinsics.ppx,
+            ppy=intrinsics.ppy,
+            model=intrinsics.model.name,
+            coeffs=tuple(intrinsics.coeffs),
+        )
+
+
+@dataclass(frozen=True)
+class Extrinsics:
+    """
+    Rigid transform from the coordinate system of one stream to another, in meters
+    """
+
+    # column-major 3x3 rotation, as librealsense stores it
+    rotation: tuple[float, ...] = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0)
+    translation: tuple[float, ...] = (0.0, 0.0, 0.0)
+
+    @classmethod
+    def from_rs(cls, extrinsics: "rs.extrinsics") -> "Extrinsics":
+        """Convert pyrealsense2 extrinsics to Extrinsics"""
+        return cls(
+            rotation=tuple(extrinsics.rotation), translation=tuple(extrinsics.translation)
+        )
+
+
+# element type and channels of a single pixel (or motion sample) per stream format
+_FORMAT_LAYOUT: dict[str, tuple[str, int]] = {
+    "z16": ("uint16", 1),
+    "y8": ("uint8", 1),
+    "y16": ("uint16", 1),
+    "raw16": ("uint16", 1),
+    "disparity16": ("uint16", 1),
+    "disparity32": ("float32", 1),
+    "distance": ("float32", 1),
+    "yuyv": ("uint8", 2),
+    "uyvy": ("uint8", 2),
+    "rgb8": ("uint8", 3),
+    "bgr8": ("uint8", 3),
+    "rgba8": ("uint8", 4),
+    "bgra8": ("uint8", 4),
+    "motion_xyz32f": ("float32", 3),
+    "xyz32f": ("float32", 3),
+}
+
+
+def frame_layout(profile: Profile) -> tuple[str, tuple[int, ...]]:
+    """
+    Array dtype and shape of frame payload for PROFILE
+    """
+    dtype, channels = _FORMAT_LAYOUT.get(profile.format.lower(), ("uint8", 0))
+    width, height = profile.resolution
+    if not channels:
+        return dtype, (-1,)
+    if not width or not height:
+        return dtype, (channels,)
+    if channels == 1:
+        return dtype, (height, width)
+    return dtype, (height, width, channels)
+
+
+def frame_array(payload: Any, profile: Profile) -> "np.ndarray":
+    """
+    View PAYLOAD as an array shaped after PROFILE, without copying.
+    PAYLOAD is a pyrealsense2 frame or any object supporting the buffer protocol
+    """
+    import numpy as np
+
+    if hasattr(payload, "get_data"):
+        # BufData holds a reference to the frame, keeping it alive as long as the view
+        payload = payload.get_data()
+    dtype, shape = frame_layout(profile)
+    arr = np.frombuffer(payload, dtype=dtype)
+    if len(shape) > 1 and arr.size != np.prod(shape):
+        # rows padded to a stride wider than the image
+        row = np.prod(shape[1:])
+        arr = arr.reshape(shape[0], -1)[:, :row]
+    return arr.reshape(shape)
+
+
 @dataclass
 class Frame:
     profile: Profile
     timestamp: float
     index: int
     metadata: dict[str, Any]
+    payload: Any = field(default=None, repr=False, compare=False)
+    # host time in ms when the frame was handed to python
+    received: float = field(default=0.0, compare=False)
+    # clock of TIMESTAMP: hardware_clock (device), system_time or global_time (host)
+    timestamp_domain: str = field(default="system_time", compare=False)
+    _data: Optional["np.ndarray"] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def data(self) -> Optional["np.ndarray"]:
+        """
+        Frame payload as array, created on first access as a view over the frame buffer
+        """
+        if self._data is None and self.payload is not None:
+            self._data = frame_array(self.payload, self.profile)
+        return self._data
+
+    def copy(self) -> "Frame":
+        """
+        Copy of the frame owning its payload, safe to keep after the source frame is released
+        """
+        data = self.data
+        return Frame(
+            profile=self.profile,
+            timestamp=self.timestamp,
+            index=self.index,
+            metadata=dict(self.metadata),
+            payload=None if data is None else data.copy(),
+            received=self.received,
+            timestamp_domain=self.timestamp_domain,
+        )
 
 
 FrameSet = dict[Stream, Frame]
@@ -1,4 +1,22 @@
-from realsense_cli.types import Profile, Stream, Sensor
+import json
+import math
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Generic, Optional, TypeVar, TYPE_CHECKING, Union
+
+from loguru import logger
+
+from realsense_cli.types import CliSensor, Profile, Stream, Sensor
+
+if TYPE_CHECKING:
+    from realsense_cli.driver.base import DriverProtocol
+
+T = TypeVar("T")
+
+ProfileKey = tuple[Stream, int, str, int, int, int]
+
+# librealsense default depth units, 1mm
+DEFAULT_DEPTH_UNITS = 0.001
 
 
 def group_profiles(profiles: list[Profile]) -> dict[Profile, list[int]]:
@@ -48,3 +66,156 @@ def find_origin_sensor(sensor_profiles: dict[Sensor, list[Profile]]) -> dict[Str
                 continue
             res[profile.stream] = sensor
     return res
+
+
+def _profile_key(profile: Profile) -> ProfileKey:
+    return (
+        profile.stream,
+        profile.index,
+        profile.format.lower(),
+        profile.fps,
+        profile.resolution.width,
+        profile.resolution.height,
+    )
+
+
+# value of each key field meaning "any", the stream is always required
+_WILDCARDS: ProfileKey = (None, -1, "any", 0, 0, 0)  # type: ignore[assignment]
+
+
+class ProfileIndex(Generic[T]):
+    """
+    Profiles indexed on (stream, index, format, fps, width, height), each mapped to an item
+    such as the matching pyrealsense2 profile.
+    Queries may use wildcards (-1 index, "any" format, 0 fps/width/height), the first
+    profile in insertion order that matches the rest of the fields is returned
+    """
+
+    def __init__(self, entries: Iterable[tuple[Profile, T]]):
+        self._entries: list[tuple[ProfileKey, T]] = []
+        self._profiles: list[Profile] = []
+        self._exact: dict[ProfileKey, T] = {}
+        for profile, item in entries:
+            key = _profile_key(profile)
+            self._entries.append((key, item))
+            self._profiles.append(profile)
+            self._exact.setdefault(key, item)
+
+    @property
+    def profiles(self) -> list[Profile]:
+        return list(self._profiles)
+
+    def find(self, profile: Profile) -> Optional[T]:
+        key = _profile_key(profile)
+        if key in self._exact:
+            return self._exact[key]
+        fields = [i for i, (value, wild) in enumerate(zip(key, _WILDCARDS)) if value != wild]
+        for entry_key, item in self._entries:
+            if all(entry_key[i] == key[i] for i in fields):
+                return item
+        return None
+
+
+def parse_duration(value: Union[str, float]) -> float:
+    """
+    Duration in seconds from '30', '30s', '500ms' or '2m'.
+    Numbers are taken as seconds already, typer passes option defaults through the parser too
+    """
+    value = str(value).strip().lower()
+    for suffix, scale in (("ms", 0.001), ("s", 1), ("m", 60)):
+        if value.endswith(suffix):
+            number, unit = value[: -len(suffix)], scale
+            break
+    else:
+        number, unit = value, 1
+    try:
+        seconds = float(number) * unit
+    except ValueError:
+        raise ValueError(f"Failed to parse duration: '{value}'")
+    if seconds <= 0:
+        raise ValueError(f"Duration must be positive: '{value}'")
+    return seconds
+
+
+# controls that switch modes, changing the value or writability of others, go first
+_CONTROL_PRIORITY: dict[str, int] = {
+    "visual_preset": 0,
+    "enable_auto_exposure": 1,
+    "enable_auto_white_balance": 1,
+    "emitter_enabled": 1,
+    "hdr_enabled": 1,
+}
+
+
+def order_controls(controls: Iterable[str]) -> list[str]:
+    """
+    Order CONTROLS so mode switches such as auto exposure are applied before the
+    controls they affect, e.g. exposure, keeping the given order otherwise
+    """
+    return sorted(controls, key=lambda control: _CONTROL_PRIORITY.get(control, 2))
+
+
+def control_matches(current: float, value: float) -> bool:
+    return math.isclose(current, value, rel_tol=1e-6, abs_tol=1e-9)
+
+
+def _preset_sensor(name: str) -> Sensor:
+    for cli_sensor in CliSensor:
+        if name.lower() == cli_sensor.value:
+            return cli_sensor.rs_enum
+    for sensor in Sensor:
+        if name == sensor.value:
+            return sensor
+    raise ValueError(f"Unknown sensor '{name}' in preset")
+
+
+def load_controls_preset(path: Path) -> dict[Sensor, dict[str, float]]:
+    """
+    Control values per sensor from a JSON or YAML file mapping sensor names
+    (depth, color, motion) to CONTROL: VALUE pairs
+    """
+    text = path.read_text()
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml  # type: ignore
+        except ImportError:
+            raise ValueError("Reading YAML presets requires pyyaml: pip install pyyaml")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Failed to parse preset {path}: {e}")
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Failed to parse preset {path}: {e}")
+    if not isinstance(data, dict):
+        raise ValueError(f"Preset {path} must map sensor names to controls")
+
+    preset: dict[Sensor, dict[str, float]] = {}
+    for name, controls in data.items():
+        if not isinstance(controls, dict):
+            raise ValueError(f"Controls of sensor '{name}' must map names to values")
+        values: dict[str, float] = {}
+        for control, value in controls.items():
+            values[control] = _preset_value(name, control, value)
+        preset.setdefault(_preset_sensor(name), {}).update(values)
+    return preset
+
+
+def _preset_value(sensor: str, control: str, value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for control '{control}' of '{sensor}': {value!r}")
+
+
+def depth_units(driver: "DriverProtocol") -> float:
+    """
+    Meters per depth value of the driver's active device
+    """
+    try:
+        return driver.get_control_values(Sensor.STEREO_MODULE, ["depth_units"])["depth_units"]
+    except (ValueError, RuntimeError, KeyError):
+        logger.debug("depth units not available, using {}", DEFAULT_DEPTH_UNITS)
+        return DEFAULT_DEPTH_UNITS
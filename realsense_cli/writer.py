@@ -0,0 +1,115 @@
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Generic, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+@dataclass
+class WriterStats:
+    queued: int
+    written: int
+    dropped: int
+    bytes_written: int
+    throughput: float  # MB/s since the writer started
+
+
+class ThreadedWriter(ABC, Generic[T]):
+    """
+    Write items on a background thread, so slow storage never blocks the producer.
+    Items wait in a bounded queue, when the writer falls behind and the queue is full
+    new items are dropped and counted.
+    Subclasses implement _write, returning the number of bytes written, and _finish
+    """
+
+    def __init__(self, capacity: int = 64, name: str = "writer"):
+        if capacity < 1:
+            raise ValueError(f"Writer queue capacity must be positive, got {capacity}")
+        self._queue: queue.Queue[Optional[T]] = queue.Queue(maxsize=capacity)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._error: Optional[BaseException] = None
+        self._written = 0
+        self._dropped = 0
+        self._bytes = 0
+        self._started = 0.0
+        self._closed = False
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        self._thread.start()
+
+    def put(self, item: T, copy: bool = False) -> bool:
+        """
+        Queue ITEM for writing without blocking, return False if it was dropped.
+        With COPY the writer gets ITEM.copy(), made only once there is room for it
+        """
+        if self._error is not None:
+            raise RuntimeError(f"Writer failed: {self._error}") from self._error
+        # only the producer adds to the queue, room found here is still there after the copy
+        if self._queue.full():
+            self._dropped += 1
+            return False
+        self._queue.put_nowait(item.copy() if copy else item)  # type: ignore[attr-defined]
+        return True
+
+    def close(self) -> None:
+        """
+        Write everything still queued and release the output
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            # the sentinel must get in even when the queue is full
+            self._queue.put(None)
+            self._thread.join()
+        elif not self._started:
+            self._finish()
+        if self._error is not None:
+            raise RuntimeError(f"Writer failed: {self._error}") from self._error
+
+    def stats(self) -> WriterStats:
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return WriterStats(
+            queued=self._queue.qsize(),
+            written=self._written,
+            dropped=self._dropped,
+            bytes_written=self._bytes,
+            throughput=self._bytes / elapsed / 1e6 if elapsed else 0.0,
+        )
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _run(self) -> None:
+        try:
+            while (item := self._queue.get()) is not None:
+                self._bytes += self._write(item)
+                self._written += 1
+        except Exception as e:
+            logger.exception("writer {} failed", self._thread.name)
+            self._error = e
+            # keep the producer from blocking on close
+            while self._queue.get() is not None:
+                pass
+        finally:
+            try:
+                self._finish()
+            except Exception as e:
+                logger.exception("writer {} failed to finish", self._thread.name)
+                self._error = self._error or e
+
+    @abstractmethod
+    def _write(self, item: T) -> int: ...
+
+    def _finish(self) -> None:
+        pass
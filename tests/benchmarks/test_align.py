@@ -0,0 +1,148 @@
+"""
+Depth to color alignment with DepthAligner against rs.align, on synthetic frames of a
+librealsense software device with D435 like intrinsics and extrinsics.
+
+Run with `pytest -m benchmark`
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+rs = pytest.importorskip("pyrealsense2")
+
+from realsense_cli.align import DepthAligner  # noqa: E402
+from realsense_cli.stats import LatencyHistogram  # noqa: E402
+from realsense_cli.types import Frame, Profile  # noqa: E402
+
+FRAMES = 60
+DEPTH_UNITS = 0.001
+
+
+def _video_stream(stream, width, height, fmt, bpp, uid, hfov):
+    video = rs.video_stream()
+    video.type = stream
+    video.index = 0
+    video.uid = uid
+    video.width = width
+    video.height = height
+    video.fps = 30
+    video.bpp = bpp
+    video.fmt = fmt
+    intrinsics = rs.intrinsics()
+    intrinsics.width = width
+    intrinsics.height = height
+    intrinsics.fx = intrinsics.fy = width / 2 / np.tan(np.radians(hfov / 2))
+    intrinsics.ppx = width / 2
+    intrinsics.ppy = height / 2
+    intrinsics.model = rs.distortion.none
+    intrinsics.coeffs = [0.0] * 5
+    video.intrinsics = intrinsics
+    return video
+
+
+@pytest.fixture
+def software_device(monkeypatch):
+    """
+    Depth and color software sensors started into a syncer, like a D435 at 848x480 depth
+    and 1280x720 color
+    """
+    from tests.utils import SoftwareContext
+
+    dev = rs.software_device()
+    dev.register_info(rs.camera_info.serial_number, "000000000002")
+    depth_sensor = dev.add_sensor("Stereo Module")
+    color_sensor = dev.add_sensor("RGB Camera")
+    depth_profile = depth_sensor.add_video_stream(
+        _video_stream(rs.stream.depth, 848, 480, rs.format.z16, 2, 0, 87)
+    )
+    color_profile = color_sensor.add_video_stream(
+        _video_stream(rs.stream.color, 1280, 720, rs.format.rgb8, 3, 1, 69)
+    )
+    depth_sensor.add_read_only_option(rs.option.depth_units, DEPTH_UNITS)
+    extrinsics = rs.extrinsics()
+    extrinsics.rotation = [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+    extrinsics.translation = [0.015, 0.0, 0.0]
+    depth_profile.register_extrinsics_to(color_profile, extrinsics)
+    dev.create_matcher(rs.matchers.dlr_c)
+
+    ctx = SoftwareContext([dev])
+    monkeypatch.setattr(rs, "context", lambda: ctx)
+    syncer = rs.syncer()
+    depth_sensor.open(depth_profile)
+    color_sensor.open(color_profile)
+    depth_sensor.start(syncer)
+    color_sensor.start(syncer)
+    yield dev, syncer, (depth_sensor, depth_profile), (color_sensor, color_profile)
+    for sensor in (depth_sensor, color_sensor):
+        sensor.stop()
+        sensor.close()
+
+
+def _scene(height: int, width: int) -> np.ndarray:
+    """
+    Slanted wall with a box in front of it, in depth units
+    """
+    v, u = np.mgrid[0:height, 0:width]
+    depth = 1500 + 2000 * u / width + 300 * v / height
+    depth[height // 3 : height // 2, width // 3 : width // 2] = 800
+    return depth.astype(np.uint16)
+
+
+def test_align_against_rs_align(software_device):
+    from realsense_cli.driver.realsense import Realsense
+
+    _, syncer, (depth_sensor, depth_profile), (color_sensor, color_profile) = software_device
+    depth = _scene(480, 848)
+    color = np.zeros((720, 1280, 3), dtype=np.uint8)
+    aligner = DepthAligner(Realsense(), depth_units=DEPTH_UNITS)
+    depth_key = Profile.from_rs(depth_profile)
+    color_key = Profile.from_rs(color_profile)
+    depth_frame = Frame(depth_key, 0, 0, {}, payload=depth)
+    aligner.align(depth_frame, color_key)  # tables are computed once, outside the measurement
+
+    align = rs.align(rs.stream.color)
+    ours, theirs = LatencyHistogram(), LatencyHistogram()
+    for i in range(FRAMES):
+        for sensor, profile, data, bpp in (
+            (depth_sensor, depth_profile, depth, 2),
+            (color_sensor, color_profile, color, 3),
+        ):
+            frame = rs.software_video_frame()
+            frame.pixels = data
+            frame.bpp = bpp
+            frame.stride = data.shape[1] * bpp
+            frame.timestamp = i * 33.3
+            frame.domain = rs.timestamp_domain.hardware_clock
+            frame.frame_number = i
+            frame.profile = profile.as_video_stream_profile()
+            frame.depth_units = DEPTH_UNITS
+            sensor.on_video_frame(frame)
+        frames = syncer.wait_for_frames(1000)
+
+        start = time.perf_counter()
+        reference = align.process(frames).get_depth_frame()
+        theirs.record((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        aligned = aligner.align(depth_frame, color_key)
+        ours.record((time.perf_counter() - start) * 1000)
+
+    reference = np.asanyarray(reference.get_data())
+    result = aligned.data
+    assert result.shape == reference.shape
+    both = (reference > 0) & (result > 0)
+    agree = np.abs(result[both].astype(np.int32) - reference[both]) <= 20
+    coverage = np.count_nonzero(result) / max(np.count_nonzero(reference), 1)
+
+    ours, theirs = ours.summary(), theirs.summary()
+    print(
+        f"\nrs.align p50 {theirs['p50']:.2f}ms, DepthAligner p50 {ours['p50']:.2f}ms "
+        f"({theirs['p50'] / ours['p50']:.1f}x), {agree.mean():.1%} of pixels within 2cm, "
+        f"coverage {coverage:.1%}"
+    )
+    assert agree.mean() > 0.95
+    assert coverage > 0.95
+    assert ours["p50"] < theirs["p50"]
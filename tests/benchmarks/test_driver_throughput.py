@@ -0,0 +1,252 @@
+"""
+Driver hot path benchmarks on a librealsense software device: synthetic frames are injected
+into software sensors at a configurable rate and resolution and drained with
+Realsense.wait_for_frameset, measuring delivered throughput, CPU time per frameset,
+metadata extraction cost and queue drop rate, no camera needed.
+
+Run with `pytest -m benchmark`
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+rs = pytest.importorskip("pyrealsense2")
+
+from realsense_cli.types import (  # noqa: E402
+    DeviceInfo,
+    Profile,
+    QueuePolicy,
+    Resolution,
+    Sensor,
+    Stream,
+)
+from tests.utils import (  # noqa: E402
+    FrameInjector,
+    SoftwareContext,
+    build_software_device_sensors,
+)
+
+DEVICE = DeviceInfo(
+    name="Intel RealSense D435I",
+    serial="000000000001",
+    fw="5.15.0.0",
+    connection="3.2",
+    sensors=["Stereo Module", "RGB Camera", "Motion Module"],
+)
+PROFILES = {
+    Sensor.STEREO_MODULE: [
+        Profile(Stream.DEPTH, Resolution(640, 480), 90, "z16", 0),
+        Profile(Stream.DEPTH, Resolution(1280, 720), 30, "z16", 0),
+    ],
+    Sensor.RGB_CAMERA: [
+        Profile(Stream.COLOR, Resolution(1280, 720), 30, "rgb8", 0),
+    ],
+    Sensor.MOTION_SENSOR: [
+        Profile(Stream.GYRO, Resolution(0, 0), 400, "motion_xyz32f", 0),
+    ],
+}
+SENSORS = {
+    Stream.DEPTH: Sensor.STEREO_MODULE,
+    Stream.COLOR: Sensor.RGB_CAMERA,
+    Stream.GYRO: Sensor.MOTION_SENSOR,
+}
+
+_METADATA = ("frame_counter", "frame_timestamp", "sensor_timestamp", "time_of_arrival")
+
+
+@dataclass
+class DrainResult:
+    injected: int
+    delivered: int
+    elapsed: float
+    cpu_per_frameset: float  # ms
+    dropped: int
+
+    @property
+    def fps(self) -> float:
+        return self.delivered / self.elapsed
+
+    @property
+    def drop_rate(self) -> float:
+        return 1 - self.delivered / self.injected
+
+
+@pytest.fixture
+def software_device(monkeypatch):
+    dev, sensors = build_software_device_sensors(DEVICE, PROFILES, {})
+    ctx = SoftwareContext([dev])
+    monkeypatch.setattr(rs, "context", lambda: ctx)
+    return dev, sensors
+
+
+@pytest.fixture
+def driver(software_device):
+    from realsense_cli.driver.realsense import Realsense
+
+    return Realsense()
+
+
+def _injector(software_device, profile: Profile) -> FrameInjector:
+    dev, sensors = software_device
+    sensor = SENSORS[profile.stream]
+    rs_sensor = next(s for s in dev.query_sensors() if s.name == sensor.value)
+    for rs_profile in rs_sensor.get_stream_profiles():
+        if Profile.from_rs(rs_profile) == profile:
+            return FrameInjector(sensors[sensor], rs_profile)
+    raise LookupError(profile)
+
+
+def _drain(driver, injector: FrameInjector, count: int, fps: float) -> DrainResult:
+    """
+    Inject COUNT frames at FPS (0 - as fast as possible) from a producer thread while the
+    calling thread drains them
+    """
+    metadata = {getattr(rs.frame_metadata_value, name): 0 for name in _METADATA}
+    done = threading.Event()
+    errors: list[Exception] = []
+
+    def produce():
+        start = time.perf_counter()
+        try:
+            for i in range(count):
+                if fps:
+                    delay = start + i / fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                now = time.time() * 1000
+                for md in metadata:
+                    metadata[md] = i if md.name == "frame_counter" else int(now)
+                injector.inject(now, metadata)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    delivered = 0
+    cpu = 0.0
+    calls = 0
+    start = time.perf_counter()
+    producer.start()
+    while True:
+        cpu_start = time.thread_time()
+        frameset = driver.wait_for_frameset(0.2)
+        if frameset is None:
+            if done.is_set():
+                break
+            continue
+        cpu += time.thread_time() - cpu_start
+        calls += 1
+        delivered += len(frameset)
+    elapsed = time.perf_counter() - start - 0.2  # the last wait timed out
+    producer.join()
+    if errors:
+        driver.stop()
+        raise errors[0]
+    dropped = sum(driver.dropped_frames.values())
+    driver.stop()
+    return DrainResult(count, delivered, elapsed, cpu / max(calls, 1) * 1000, dropped)
+
+
+def _report(name: str, result: DrainResult) -> None:
+    print(
+        f"\n{name:<40} {result.fps:9.1f} fps, {result.cpu_per_frameset * 1000:7.1f}us CPU"
+        f"/frameset, drop rate {result.drop_rate:.2%} ({result.dropped} gaps)"
+    )
+
+
+def _play(driver, software_device, profile: Profile, pipeline: bool, **play_args):
+    try:
+        driver.play([profile], pipeline=pipeline, **play_args)
+    except RuntimeError as e:
+        if pipeline:
+            pytest.skip(f"pipeline can't open software device with this librealsense: {e}")
+        raise
+    return _injector(software_device, profile)
+
+
+@pytest.mark.parametrize("pipeline", [False, True], ids=["sensor", "pipe"])
+@pytest.mark.parametrize(
+    "profile, count",
+    [(PROFILES[Sensor.STEREO_MODULE][0], 180), (PROFILES[Sensor.RGB_CAMERA][0], 60)],
+    ids=lambda p: str(p).split(" @")[0] if isinstance(p, Profile) else str(p),
+)
+def test_paced_throughput(driver, software_device, profile, count, pipeline):
+    """At the nominal rate nothing may be dropped when every frame is kept"""
+    injector = _play(driver, software_device, profile, pipeline, queue_policy=QueuePolicy.ALL)
+    result = _drain(driver, injector, count, profile.fps)
+    _report(f"{profile.stream.value} {profile.resolution}@{profile.fps}", result)
+    assert result.delivered == count
+    assert result.dropped == 0
+    assert result.fps == pytest.approx(profile.fps, rel=0.2)
+
+
+def test_motion_throughput(driver, software_device):
+    profile = PROFILES[Sensor.MOTION_SENSOR][0]
+    injector = _play(driver, software_device, profile, False, queue_policy=QueuePolicy.ALL)
+    result = _drain(driver, injector, 400, profile.fps)
+    _report(f"{profile.stream.value}@{profile.fps}", result)
+    assert result.delivered == 400
+    assert result.dropped == 0
+
+
+def test_motion_batched(driver, software_device):
+    """Batched motion samples bypass the frame queue, none is lost even when unpaced"""
+    from realsense_cli.imu import ImuBatcher
+
+    profile = PROFILES[Sensor.MOTION_SENSOR][0]
+    count = 4000
+    batcher = ImuBatcher(size=200, capacity=count)
+    injector = _play(driver, software_device, profile, False, imu=batcher)
+    start = time.perf_counter()
+    for i in range(count):
+        injector.inject(i * 1000 / profile.fps)
+    deadline = time.monotonic() + 5
+    while batcher.samples < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    driver.stop()
+    batches = batcher.flush()
+    print(
+        f"\n{profile.stream.value}@{profile.fps} batched: {count / elapsed:9.1f} samples/s, "
+        f"{len(batches)} batches"
+    )
+    assert sum(len(batch) for batch in batches) == count
+    assert all(batch.stats().gaps == 0 for batch in batches)
+
+
+@pytest.mark.parametrize("pipeline", [False, True], ids=["sensor", "pipe"])
+@pytest.mark.parametrize("policy", list(QueuePolicy), ids=lambda p: p.value)
+def test_unpaced_drop_rate(driver, software_device, policy, pipeline):
+    """Maximum rate the driver sustains, frames the consumer can't keep up with are dropped"""
+    profile = PROFILES[Sensor.STEREO_MODULE][0]
+    injector = _play(driver, software_device, profile, pipeline, queue_policy=policy)
+    result = _drain(driver, injector, 2000, 0)
+    _report(f"unpaced {policy.value} queue", result)
+    assert result.delivered > 0
+
+
+def test_metadata_cost(driver, software_device):
+    """CPU cost of extracting metadata, per frameset"""
+    profile = PROFILES[Sensor.STEREO_MODULE][0]
+    results = {}
+    for name, metadata in (("all metadata", None), ("no metadata", [])):
+        injector = _play(
+            driver,
+            software_device,
+            profile,
+            False,
+            metadata=metadata,
+            queue_policy=QueuePolicy.ALL,
+            queue_capacity=2000,
+        )
+        results[name] = _drain(driver, injector, 1000, 0)
+        _report(name, results[name])
+    cost = results["all metadata"].cpu_per_frameset - results["no metadata"].cpu_per_frameset
+    print(f"metadata extraction: {cost * 1000:.1f}us per frameset")
+    assert cost < 1.0
@@ -0,0 +1,50 @@
+"""
+Deprojection cost of a depth frame into a point cloud, which must fit the frame interval of
+the fastest depth profiles.
+
+Run with `pytest -m benchmark`
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from realsense_cli.driver.mock import MockDriver
+from realsense_cli.pointcloud import PointCloud
+from realsense_cli.stats import LatencyHistogram
+from realsense_cli.types import Frame, Profile, Resolution, Stream
+
+pytestmark = pytest.mark.benchmark
+
+FRAMES = 300
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [
+        Profile(Stream.DEPTH, Resolution(848, 480), 90, "z16"),
+        Profile(Stream.DEPTH, Resolution(1280, 720), 30, "z16"),
+    ],
+    ids=str,
+)
+def test_pointcloud_throughput(profile):
+    cloud = PointCloud(MockDriver())
+    width, height = profile.resolution
+    rng = np.random.default_rng(0)
+    depth = rng.integers(0, 10000, (height, width), dtype=np.uint16)
+    frame = Frame(profile, 0, 0, {}, payload=depth)
+    cloud.points(frame)  # ray table is computed once, outside the measurement
+
+    histogram = LatencyHistogram()
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        cloud.points(frame)
+        histogram.record((time.perf_counter() - start) * 1000)
+    summary = histogram.summary()
+    budget = 1000 / profile.fps
+    print(
+        f"\n{profile}: p50 {summary['p50']:.2f}ms p99 {summary['p99']:.2f}ms, "
+        f"budget {budget:.1f}ms"
+    )
+    assert summary["p99"] < budget
@@ -0,0 +1,107 @@
+"""
+Cold-start time of the `rs` entry point per subcommand, using the mock driver.
+
+Every run is a fresh interpreter. The reported overhead is the best run minus the best run
+of a bare interpreter importing the unavoidable dependencies (typer and loguru, plus the rich
+help formatter typer loads for any help page), and must stay under the command's budget. Budgets can be scaled for slow machines with
+RSCLI_STARTUP_BUDGET_SCALE.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+RUNS = 5
+BUDGET_SCALE = float(os.environ.get("RSCLI_STARTUP_BUDGET_SCALE", 1))
+
+_PROBE = """
+import atexit, json, sys
+atexit.register(lambda: print(json.dumps(sorted(sys.modules)), file=sys.stderr))
+from realsense_cli.cli import app
+app(prog_name="rs")
+"""
+
+_BASELINE = "import typer, loguru"
+# typer renders help pages with rich whatever the app, ~100ms that would drown out our own share
+_HELP_BASELINE = _BASELINE + ", typer.rich_utils"
+
+# modules a subcommand must not load, on top of pyrealsense2 which the mock driver never needs
+_HEAVY = ("rosbags", "numpy", "rich.live")
+
+# name: (arguments, modules that must not be imported, overhead budget in ms)
+COMMANDS = {
+    "help": (["--help"], _HEAVY, 100),
+    "list": (["list"], _HEAVY, 150),
+    "config-list": (["config", "list", "depth"], _HEAVY, 150),
+    "config-get": (["config", "get", "depth", "exposure"], _HEAVY, 150),
+    "config-set": (["config", "set", "depth", "exposure=100"], _HEAVY, 150),
+    "stream-list": (["stream", "list", "depth"], _HEAVY, 150),
+    "reset": (["reset"], _HEAVY, 150),
+    # answered from the bag's index cache after the first run, rosbags stays unloaded
+    "bag-info": (["bag", "info", "{bag}"], _HEAVY, 150),
+}
+
+
+def _run(args: list[str], driver: str = "mock") -> tuple[float, str]:
+    env = dict(os.environ, RSCLI_DRIVER=driver)
+    t0 = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=False
+    )
+    elapsed = time.perf_counter() - t0
+    assert result.returncode == 0, result.stderr
+    return elapsed, result.stderr
+
+
+def _best(args: list[str]) -> tuple[float, str]:
+    runs = [_run(args) for _ in range(RUNS)]
+    return min(t for t, _ in runs), runs[-1][1]
+
+
+@pytest.fixture(scope="module")
+def baselines() -> dict[str, float]:
+    return {code: _best(["-c", code])[0] for code in (_BASELINE, _HELP_BASELINE)}
+
+
+@pytest.fixture(scope="module")
+def bag(tmp_path_factory) -> str:
+    from rosbags.rosbag1 import Writer
+    from rosbags.typesys import Stores, get_typestore
+
+    typestore = get_typestore(Stores.ROS1_NOETIC)
+    path = tmp_path_factory.mktemp("bag") / "startup.bag"
+    with Writer(path) as writer:
+        msgtype = "std_msgs/msg/String"
+        conn = writer.add_connection("/test", msgtype, typestore=typestore)
+        msg = typestore.types[msgtype](data="hello")
+        writer.write(conn, 0, typestore.serialize_ros1(msg, msgtype))
+    return str(path)
+
+
+@pytest.mark.parametrize("command", COMMANDS.keys())
+def test_startup(command, baselines, bag):
+    args, heavy, budget_ms = COMMANDS[command]
+    baseline = baselines[_HELP_BASELINE if "--help" in args else _BASELINE]
+    args = [arg.format(bag=bag) for arg in args]
+    elapsed, stderr = _best(["-c", _PROBE, *args])
+    modules = set(json.loads(stderr.strip().splitlines()[-1]))
+
+    overhead_ms = (elapsed - baseline) * 1000
+    print(f"\n{command:<12} {elapsed * 1000:7.1f}ms (+{overhead_ms:.1f}ms over baseline)")
+
+    for module in ("pyrealsense2", *heavy):
+        assert module not in modules, f"'rs {' '.join(args)}' imports {module}"
+    assert overhead_ms < budget_ms * BUDGET_SCALE
+
+
+def test_bag_without_driver(bag):
+    # bag commands never touch a device, not even with the default realsense driver
+    _, stderr = _run(["-c", _PROBE, "bag", "info", bag], driver="realsense")
+    modules = set(json.loads(stderr.strip().splitlines()[-1]))
+    assert "pyrealsense2" not in modules
@@ -20,6 +20,13 @@ def set_mock_envar():
     os.environ["RSCLI_DRIVER"] = "mock"
 
 
+@pytest.fixture(autouse=True)
+def _cache_dir(tmp_path, monkeypatch):
+    """Keep on-disk caches out of the user's home."""
+    monkeypatch.setenv("RSCLI_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("RSCLI_NO_CACHE", raising=False)
+
+
 @pytest.fixture
 def mock_context(monkeypatch):
     import pyrealsense2 as rs
@@ -62,3 +69,51 @@ def generate_frames(amount: int, profiles: list[Profile]) -> list[FrameSet]:
         result.append(frameset)
 
     return result
+
+
+@pytest.fixture
+def rs_bag(tmp_path):
+    """Small bag laid out like a realsense recording, with 4 trailing bytes per message."""
+    import numpy as np
+    from rosbags.rosbag1 import Writer
+    from rosbags.typesys import Stores, get_typestore
+
+    typestore = get_typestore(Stores.ROS1_NOETIC)
+    types = typestore.types
+    path = tmp_path / "recording.bag"
+    depth_topic = "/device_0/sensor_0/Depth_0/image/data"
+    gyro_topic = "/device_0/sensor_2/Gyro_0/imu/data"
+
+    def header(seq):
+        stamp = types["builtin_interfaces/msg/Time"](sec=1, nanosec=seq * 1000)
+        return types["std_msgs/msg/Header"](seq=seq, stamp=stamp, frame_id="0")
+
+    with Writer(path) as writer:
+        depth = writer.add_connection(depth_topic, "sensor_msgs/msg/Image", typestore=typestore)
+        gyro = writer.add_connection(gyro_topic, "sensor_msgs/msg/Imu", typestore=typestore)
+        for seq in range(3):
+            image = types["sensor_msgs/msg/Image"](
+                header=header(seq),
+                height=2,
+                width=3,
+                encoding="mono16",
+                is_bigendian=0,
+                step=6,
+                data=np.arange(6, dtype=np.uint16).view(np.uint8) + seq,
+            )
+            raw = bytes(typestore.serialize_ros1(image, "sensor_msgs/msg/Image"))
+            writer.write(depth, seq * 1000, raw + b"\0\0\0\0")
+
+            vector = types["geometry_msgs/msg/Vector3"]
+            imu = types["sensor_msgs/msg/Imu"](
+                header=header(seq),
+                orientation=types["geometry_msgs/msg/Quaternion"](x=0, y=0, z=0, w=1),
+                orientation_covariance=np.zeros(9),
+                angular_velocity=vector(x=seq, y=0.5, z=0),
+                angular_velocity_covariance=np.zeros(9),
+                linear_acceleration=vector(x=0, y=0, z=0),
+                linear_acceleration_covariance=np.zeros(9),
+            )
+            raw = bytes(typestore.serialize_ros1(imu, "sensor_msgs/msg/Imu"))
+            writer.write(gyro, seq * 1000, raw + b"\0\0\0\0")
+    return path
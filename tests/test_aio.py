@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from realsense_cli.driver.mock import MockDriver
+from realsense_cli.types import Profile, QueuePolicy, Resolution, Sensor, Stream
+
+PROFILES = [
+    Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16"),
+    Profile(Stream.COLOR, Resolution(640, 480), 30, "rgb8"),
+]
+
+
+async def _collect(driver, count: int, delay: float = 0.0, **kwargs) -> list[int]:
+    indexes = []
+    frames = driver.aframes(**kwargs)
+    async for frameset in frames:
+        assert set(frameset) == {Stream.DEPTH, Stream.COLOR}
+        indexes.append(frameset[Stream.DEPTH].index)
+        if len(indexes) == count:
+            break
+        await asyncio.sleep(delay)
+    await frames.aclose()
+    return indexes
+
+
+def test_aframes_all_keeps_every_frameset():
+    driver = MockDriver()
+    driver.play(PROFILES)
+    indexes = asyncio.run(_collect(driver, 50, policy=QueuePolicy.ALL, capacity=4))
+    driver.stop()
+    assert indexes == list(range(50))
+
+
+def test_aframes_latest_drops_oldest():
+    driver = MockDriver()
+    driver.play(PROFILES)
+    indexes = asyncio.run(_collect(driver, 5, delay=0.01, capacity=2))
+    driver.stop()
+    assert indexes == sorted(indexes)
+    # the unpaced mock outruns a consumer sleeping between framesets
+    assert indexes[-1] - indexes[0] > 4
+
+
+def test_aframes_acquisition_error():
+    class FailingDriver(MockDriver):
+        def wait_for_frameset(self, timeout: float = 3.0):
+            raise RuntimeError("device disconnected")
+
+    driver = FailingDriver()
+    driver.play(PROFILES)
+    with pytest.raises(RuntimeError, match="device disconnected"):
+        asyncio.run(_collect(driver, 1))
+
+
+def test_aframes_realsense(monkeypatch):
+    rs = pytest.importorskip("pyrealsense2")
+    from realsense_cli.driver.realsense import Realsense
+    from tests.utils import (
+        MOCK_DEVICE,
+        MOCK_SENSORS,
+        FrameInjector,
+        SoftwareContext,
+        build_software_device_sensors,
+    )
+
+    dev, sensors = build_software_device_sensors(
+        MOCK_DEVICE, MOCK_SENSORS["profiles"], MOCK_SENSORS["options"]
+    )
+    monkeypatch.setattr(rs, "context", lambda: SoftwareContext([dev]))
+    driver = Realsense()
+    profile = MOCK_SENSORS["profiles"][Sensor.STEREO_MODULE][0]
+    driver.play([profile], pipeline=False, queue_policy=QueuePolicy.ALL)
+    rs_sensor = dev.query_sensors()[0]
+    rs_profile = next(p for p in rs_sensor.get_stream_profiles() if p.fps() == profile.fps)
+    injector = FrameInjector(sensors[Sensor.STEREO_MODULE], rs_profile)
+    for i in range(5):
+        injector.inject(1000.0 + i)
+
+    async def collect():
+        frames = []
+        async for frameset in driver.aframes(policy=QueuePolicy.ALL, timeout=0.1):
+            frames.append(frameset[Stream.DEPTH].index)
+            if len(frames) == 5:
+                return frames
+
+    try:
+        assert asyncio.run(collect()) == list(range(5))
+    finally:
+        driver.stop()
@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import pytest
+
+from realsense_cli.align import DepthAligner, project
+from realsense_cli.driver.mock import MockDriver
+from realsense_cli.types import Frame, Intrinsics, Profile, Resolution, Stream
+
+DEPTH = Profile(Stream.DEPTH, Resolution(64, 48), 30, "z16")
+COLOR = Profile(Stream.COLOR, Resolution(64, 48), 30, "rgb8")
+COEFFS = (0.12, -0.05, 0.001, -0.002, 0.01)
+
+
+def _scene() -> np.ndarray:
+    """
+    Slanted wall with a box in front of it and a hole without depth
+    """
+    v, u = np.mgrid[0:48, 0:64]
+    depth = (1200 + 20 * u + 5 * v).astype(np.uint16)
+    depth[10:30, 20:40] = 400
+    depth[40:, :8] = 0
+    return depth
+
+
+def _naive_align(driver, depth: np.ndarray, target: Profile) -> np.ndarray:
+    """
+    Nearest depth of every target pixel, mapping the depth pixels one by one
+    """
+    di = driver.get_intrinsics(DEPTH)
+    ti = driver.get_intrinsics(target)
+    tx = driver.get_extrinsics(DEPTH, target).translation
+    aligned = np.zeros((ti.height, ti.width), dtype=np.uint16)
+    for v, u in zip(*np.nonzero(depth)):
+        z = depth[v, u] * 0.001
+        x = (u - di.ppx) / di.fx * z + tx[0]
+        y = (v - di.ppy) / di.fy * z + tx[1]
+        tu = math.floor(x / z * ti.fx + ti.ppx + 0.5)
+        tv = math.floor(y / z * ti.fy + ti.ppy + 0.5)
+        if 0 <= tu < ti.width and 0 <= tv < ti.height:
+            if not aligned[tv, tu] or depth[v, u] < aligned[tv, tu]:
+                aligned[tv, tu] = depth[v, u]
+    return aligned
+
+
+def test_align_matches_naive():
+    driver = MockDriver()
+    aligner = DepthAligner(driver, buckets=64, depth_units=0.001, fill_holes=False)
+    depth = _scene()
+
+    aligned = aligner.align(Frame(DEPTH, 0, 0, {}, payload=depth), COLOR)
+    assert aligned.profile == Profile(Stream.DEPTH, Resolution(64, 48), 30, "z16")
+    assert aligned.data.dtype == np.uint16
+    expected = _naive_align(driver, depth, COLOR)
+    # pixels projected right between two target pixels may round the other way
+    assert np.mean(aligned.data == expected) > 0.97
+    # the box hides the wall behind it
+    assert np.count_nonzero(aligned.data == 400) == np.count_nonzero(expected == 400)
+
+
+def test_align_fills_holes():
+    driver = MockDriver()
+    target = Profile(Stream.COLOR, Resolution(128, 96), 30, "rgb8")
+    depth = np.full((48, 64), 1500, dtype=np.uint16)
+    frame = Frame(DEPTH, 0, 0, {}, payload=depth)
+
+    sparse = DepthAligner(driver, depth_units=0.001, fill_holes=False).align(frame, target)
+    assert np.count_nonzero(sparse.data) <= depth.size
+    filled = DepthAligner(driver, depth_units=0.001).align(frame, target)
+    # the color camera sees past the right edge of the depth camera
+    assert np.all(filled.data[2:-2, 2:-4] == 1500)
+
+
+def test_align_mapping_cached():
+    driver = MockDriver()
+    aligner = DepthAligner(driver, depth_units=0.001)
+    frame = Frame(DEPTH, 0, 0, {}, payload=_scene())
+    aligner.align(frame, COLOR)
+    assert aligner.mapping(DEPTH, COLOR) is aligner.mapping(DEPTH, COLOR)
+    assert len(aligner.distances) == 16
+    assert aligner.distances[0] > 0.3
+
+    with pytest.raises(ValueError):
+        aligner.align(Frame(DEPTH, 0, 0, {}, payload=np.zeros((10, 10), np.uint16)), COLOR)
+    with pytest.raises(ValueError):
+        DepthAligner(driver, buckets=0)
+
+
+@pytest.mark.parametrize(
+    "model", ["none", "brown_conrady", "inverse_brown_conrady", "modified_brown_conrady"]
+)
+def test_project_matches_librealsense(model):
+    rs = pytest.importorskip("pyrealsense2")
+    intrinsics = Intrinsics(64, 48, 60.5, 61.0, 31.2, 24.7, model, COEFFS)
+    rs_intrinsics = rs.intrinsics()
+    for name in ("width", "height", "fx", "fy", "ppx", "ppy"):
+        setattr(rs_intrinsics, name, getattr(intrinsics, name))
+    rs_intrinsics.model = getattr(rs.distortion, model)
+    rs_intrinsics.coeffs = list(COEFFS)
+
+    points = np.array([[0.1, -0.2, 1.5], [-0.4, 0.3, 2.0], [0.0, 0.0, 0.8]]).T
+    u, v = project(intrinsics, points)
+    for i, point in enumerate(points.T):
+        expected = rs.rs2_project_point_to_pixel(rs_intrinsics, list(point))
+        assert (u[i], v[i]) == pytest.approx(expected, rel=1e-4)
+
+
+def test_stream_align_to():
+    driver = MockDriver()
+    depth = Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16")
+    color = Profile(Stream.COLOR, Resolution(1280, 720), 30, "rgb8")
+    with driver.stream([depth, color], count=2, align_to=Stream.COLOR) as frames:
+        framesets = list(frames)
+    assert len(framesets) == 2
+    for frameset in framesets:
+        assert frameset[Stream.DEPTH].profile.resolution == color.resolution
+        assert frameset[Stream.DEPTH].data.shape == (720, 1280)
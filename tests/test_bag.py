@@ -0,0 +1,107 @@
+import csv
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from realsense_cli.cli import app
+
+runner = CliRunner()
+
+DEPTH_TOPIC = "/device_0/sensor_0/Depth_0/image/data"
+GYRO_TOPIC = "/device_0/sensor_2/Gyro_0/imu/data"
+
+
+def test_bag_info(rs_bag):
+    result = runner.invoke(app, ["bag", "info", str(rs_bag)])
+    assert result.exit_code == 0
+    assert DEPTH_TOPIC in result.stdout
+    assert GYRO_TOPIC in result.stdout
+
+
+def test_bag_extract_npy(rs_bag, tmp_path):
+    out = tmp_path / "out"
+    result = runner.invoke(app, ["bag", "extract", str(rs_bag), "--out", str(out)])
+    assert result.exit_code == 0, result.stdout
+
+    images = sorted((out / DEPTH_TOPIC.strip("/").replace("/", "_")).iterdir())
+    assert len(images) == 3
+    for seq, image in enumerate(images):
+        expected = (np.arange(6, dtype=np.uint16).view(np.uint8) + seq).view(np.uint16)
+        np.testing.assert_array_equal(np.load(image), expected.reshape(2, 3))
+
+    with open(out / f"{GYRO_TOPIC.strip('/').replace('/', '_')}.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert [float(row["gyro_x"]) for row in rows] == [0, 1, 2]
+
+
+def test_bag_extract_png_topic(rs_bag, tmp_path):
+    out = tmp_path / "out"
+    result = runner.invoke(
+        app,
+        [
+            "bag",
+            "extract",
+            str(rs_bag),
+            "-o",
+            str(out),
+            "--topic",
+            DEPTH_TOPIC,
+            "--format",
+            "png",
+        ],
+    )
+    assert result.exit_code == 0, result.stdout
+    images = list((out / DEPTH_TOPIC.strip("/").replace("/", "_")).glob("*.png"))
+    assert len(images) == 3
+    assert images[0].read_bytes().startswith(b"\x89PNG")
+    assert not list(out.glob("*.csv"))
+
+
+def test_write_png_unsupported(tmp_path):
+    from realsense_cli.export import write_png
+
+    with pytest.raises(ValueError, match="unsupported image shape"):
+        write_png(tmp_path / "raw.png", np.zeros(12, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        write_png(tmp_path / "float.png", np.zeros((2, 3), dtype=np.float32))
+
+
+def test_bag_extract_unknown_topic(rs_bag, tmp_path):
+    result = runner.invoke(
+        app, ["bag", "extract", str(rs_bag), "-o", str(tmp_path), "--topic", "/nope"]
+    )
+    assert result.exit_code == 1
+
+
+def test_bag_index_cached(rs_bag):
+    from realsense_cli.rs_bag_parser import RosParser
+
+    with RosParser(rs_bag) as parser:
+        expected = parser.topics
+    sidecar = rs_bag.with_name(rs_bag.name + ".idx.json")
+    assert sidecar.exists()
+
+    with RosParser(rs_bag) as parser:
+        assert parser._reader is None
+        assert parser.topics == expected
+    depth = expected[DEPTH_TOPIC]
+    assert depth.total_messages == 3
+    assert depth.first_timestamp < depth.last_timestamp
+
+
+def test_bag_index_invalidated(rs_bag):
+    from realsense_cli.rs_bag_parser import RosParser
+
+    with RosParser(rs_bag):
+        pass
+    sidecar = rs_bag.with_name(rs_bag.name + ".idx.json")
+    sidecar.write_text(sidecar.read_text().replace(f'"{DEPTH_TOPIC}"', '"/stale"'))
+    with RosParser(rs_bag) as parser:
+        assert "/stale" in parser.topics
+
+    with open(rs_bag, "ab") as f:
+        f.write(b"\0")
+    with RosParser(rs_bag) as parser:
+        assert parser._reader is not None
+        assert DEPTH_TOPIC in parser.topics
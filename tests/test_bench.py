@@ -0,0 +1,45 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from realsense_cli.cli import app
+from realsense_cli.utils import parse_duration
+
+runner = CliRunner()
+
+
+def test_bench_json():
+    result = runner.invoke(
+        app,
+        ["stream", "bench", "depth-640x480-30-z16", "color", "--duration", "200ms", "--json"],
+    )
+    assert result.exit_code == 0, result.stdout
+    summary = json.loads(result.stdout)
+    assert summary["driver"] == "mock"
+    assert summary["framesets"] > 0
+    assert summary["cpu_per_frameset"]["mean"] > 0
+    streams = {stream["stream"]: stream for stream in summary["streams"]}
+    assert set(streams) == {"Depth", "Color"}
+    assert streams["Depth"]["frames"] == summary["framesets"]
+    assert streams["Depth"]["drop_rate"] == 0
+
+
+def test_bench_table():
+    result = runner.invoke(app, ["stream", "bench", "depth", "--duration", "0.1"])
+    assert result.exit_code == 0, result.stdout
+    assert "CPU per frameset" in result.stdout
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [("30", 30), ("30s", 30), ("500ms", 0.5), ("2m", 120), ("1.5s", 1.5), (10.0, 10)],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", ["", "soon", "-1s", "0"])
+def test_parse_duration_invalid(value):
+    with pytest.raises(ValueError):
+        parse_duration(value)
@@ -0,0 +1,133 @@
+import pytest
+
+from realsense_cli.cache import cache_dir, load_cache, store_cache
+
+
+def test_cache_roundtrip():
+    store_cache("test", {"key": [1, 2, 3]})
+    assert load_cache("test") == {"key": [1, 2, 3]}
+
+
+def test_cache_missing():
+    assert load_cache("missing") == {}
+
+
+def test_cache_corrupt():
+    directory = cache_dir()
+    directory.mkdir(parents=True)
+    (directory / "corrupt.json").write_text("{not json")
+    assert load_cache("corrupt") == {}
+
+
+def test_cache_disabled(monkeypatch):
+    monkeypatch.setenv("RSCLI_NO_CACHE", "1")
+    store_cache("test", {"key": 1})
+    assert load_cache("test") == {}
+
+
+@pytest.fixture
+def software_device(monkeypatch):
+    rs = pytest.importorskip("pyrealsense2")
+    from tests.utils import MOCK_DEVICE, MOCK_SENSORS, SoftwareContext, build_software_device
+
+    dev = build_software_device(MOCK_DEVICE, MOCK_SENSORS["profiles"], MOCK_SENSORS["options"])
+    ctx = SoftwareContext([dev])
+    monkeypatch.setattr(rs, "context", lambda: ctx)
+    return dev
+
+
+@pytest.fixture
+def inventory(software_device):
+    import pyrealsense2 as rs
+
+    from realsense_cli.driver.inventory import DeviceInventory
+
+    return lambda: DeviceInventory(rs.context())
+
+
+def _device_key(fw: str = "", port: str = "") -> str:
+    from tests.utils import MOCK_DEVICE
+
+    serial = MOCK_DEVICE.serial
+    return f"{port or f'/dev/software/{serial}'}|{serial}|{fw or MOCK_DEVICE.fw}"
+
+
+def test_inventory_info_cached(inventory):
+    from tests.utils import MOCK_DEVICE
+
+    assert inventory().serials == [MOCK_DEVICE.serial]
+    info = inventory().info(MOCK_DEVICE.serial)
+    assert info.name == MOCK_DEVICE.name
+    assert info.sensors == MOCK_DEVICE.sensors
+    cache = load_cache("devices")
+    assert cache[_device_key()]["info"]["fw"] == MOCK_DEVICE.fw
+
+    # a known device is served from the cache without querying it
+    cache[_device_key()]["info"]["name"] = "cached"
+    store_cache("devices", cache)
+    fresh = inventory()
+    assert fresh.info(MOCK_DEVICE.serial).name == "cached"
+    assert fresh.model_key(MOCK_DEVICE.serial) == f"0B07|{MOCK_DEVICE.fw}"
+
+    fresh.forget(MOCK_DEVICE.serial)
+    assert _device_key() not in load_cache("devices")
+    assert inventory().info(MOCK_DEVICE.serial).name == MOCK_DEVICE.name
+
+    with pytest.raises(ValueError):
+        inventory().info("no-such-serial")
+
+
+def test_inventory_supported_options_cached(inventory):
+    from realsense_cli.types import Sensor
+    from tests.utils import MOCK_DEVICE
+
+    serial = MOCK_DEVICE.serial
+    options = inventory().supported_options(serial, Sensor.STEREO_MODULE)
+    assert {"exposure", "laser_power"} <= options
+    cache = load_cache("devices")
+    cache[_device_key()]["options"][Sensor.STEREO_MODULE.value] = ["exposure"]
+    store_cache("devices", cache)
+    assert inventory().supported_options(serial, Sensor.STEREO_MODULE) == {"exposure"}
+
+
+@pytest.mark.parametrize(
+    "info, changed", [("firmware_version", "5.16.0.0"), ("physical_port", "/dev/usb2/port")]
+)
+def test_inventory_misses_changed_device(inventory, software_device, info, changed):
+    import pyrealsense2 as rs
+
+    from realsense_cli.types import Sensor
+    from tests.utils import MOCK_DEVICE
+
+    serial = MOCK_DEVICE.serial
+    inventory().info(serial)
+    inventory().supported_options(serial, Sensor.STEREO_MODULE)
+    cache = load_cache("devices")
+    cache[_device_key()]["info"]["name"] = "cached"
+    cache[_device_key()]["options"][Sensor.STEREO_MODULE.value] = ["exposure"]
+    store_cache("devices", cache)
+
+    # re-plugged elsewhere or flashed without rs reset
+    software_device.update_info(getattr(rs.camera_info, info), changed)
+    fresh = inventory()
+    assert fresh.info(serial).name == MOCK_DEVICE.name
+    assert "laser_power" in fresh.supported_options(serial, Sensor.STEREO_MODULE)
+    key = _device_key(**{"fw" if info == "firmware_version" else "port": changed})
+    # the stale entry is replaced, not kept next to the new one
+    assert list(load_cache("devices")) == [key]
+
+
+def test_config_get_uses_cached_options(inventory):
+    from realsense_cli.driver.inventory import reset_inventory
+    from realsense_cli.driver.realsense import Realsense
+    from realsense_cli.types import Sensor
+    from tests.utils import MOCK_DEVICE
+
+    assert Realsense().get_control_values(Sensor.STEREO_MODULE, ["laser_power"])
+    cache = load_cache("devices")
+    cache[_device_key()]["options"][Sensor.STEREO_MODULE.value] = ["exposure"]
+    store_cache("devices", cache)
+    reset_inventory()
+    # controls are resolved from the cached options of the known device
+    with pytest.raises(ValueError, match="laser_power"):
+        Realsense().get_control_values(Sensor.STEREO_MODULE, ["laser_power"])
@@ -1,10 +1,11 @@
+import numpy as np
 from typer.testing import CliRunner
 
 from realsense_cli.cli import app
 
 import pytest
 
-from realsense_cli.types import CliSensor
+from realsense_cli.types import CliSensor, Profile
 
 runner = CliRunner()
 
@@ -109,3 +110,72 @@ def test_stream_list(driver, sensor):
             ):
                 matches += 1
         assert matches == 1
+
+
+@pytest.mark.parametrize(
+    "fields, expected",
+    [
+        (None, {"frame_counter", "frame_timestamp", "sensor_timestamp", "time_of_arrival"}),
+        (["frame_counter"], {"frame_counter"}),
+        ([], set()),
+    ],
+    ids=["all", "some", "none"],
+)
+def test_stream_play_metadata_selection(driver, fields, expected):
+    from realsense_cli.types import Profile, Stream, Resolution
+
+    driver.play([Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16")], metadata=fields)
+    frameset = driver.wait_for_frameset()
+    assert expected <= set(frameset[Stream.DEPTH].metadata)
+    if fields is not None:
+        assert set(frameset[Stream.DEPTH].metadata) == expected
+
+
+def test_stream_play_unknown_metadata(driver):
+    with pytest.raises(ValueError):
+        driver.play(metadata=["no_such_field"])
+
+
+@pytest.mark.parametrize(
+    "profile, shape, dtype",
+    [
+        ("depth-640x480-30-z16", (480, 640), "uint16"),
+        ("infrared-640x480-30-y8", (480, 640), "uint8"),
+        ("color-640x480-30-rgb8", (480, 640, 3), "uint8"),
+    ],
+)
+def test_frame_data(driver, profile, shape, dtype):
+    profile = Profile.from_string(profile)
+    driver.play([profile])
+    frame = driver.wait_for_frameset()[profile.stream]
+    assert frame.data.shape == shape
+    assert frame.data.dtype == dtype
+    assert frame.data is frame.data
+
+
+def test_frame_copy(driver):
+    profile = Profile.from_string("depth-640x480-30-z16")
+    driver.play([profile])
+    frame = driver.wait_for_frameset()[profile.stream]
+    copied = frame.copy()
+    assert copied == frame
+    assert copied.data.flags.writeable
+    assert not np.shares_memory(copied.data, frame.data)
+
+
+def test_stream_play_latency_summary(monkeypatch):
+    from realsense_cli.driver.mock import MockDriver
+
+    wait = MockDriver.wait_for_frameset
+    calls = []
+
+    def wait_for_frameset(self, timeout=3.0):
+        calls.append(timeout)
+        if len(calls) > 5:
+            raise KeyboardInterrupt
+        return wait(self, timeout)
+
+    monkeypatch.setattr(MockDriver, "wait_for_frameset", wait_for_frameset)
+    result = runner.invoke(app, ["stream", "play", "depth", "--latency"])
+    # collected latencies are shown on exit, without --latency-out too
+    assert "Latency (ms)" in result.stdout.split("Stopping all streams")[-1]
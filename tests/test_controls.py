@@ -0,0 +1,156 @@
+import json
+
+import pytest
+import pyrealsense2 as rs
+from typer.testing import CliRunner
+
+from realsense_cli.cli import app
+from realsense_cli.types import ControlChange, DeviceInfo, Option, Sensor
+from realsense_cli.utils import load_controls_preset, order_controls
+from tests.utils import MOCK_DEVICE, MOCK_SENSORS, SoftwareContext, build_software_device
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def software_driver(monkeypatch):
+    from realsense_cli.driver.realsense import Realsense
+
+    dev = build_software_device(MOCK_DEVICE, MOCK_SENSORS["profiles"], MOCK_SENSORS["options"])
+    ctx = SoftwareContext([dev])
+    monkeypatch.setattr(rs, "context", lambda: ctx)
+    return Realsense()
+
+
+def test_order_controls():
+    controls = ["exposure", "laser_power", "enable_auto_exposure", "visual_preset"]
+    assert order_controls(controls) == [
+        "visual_preset",
+        "enable_auto_exposure",
+        "exposure",
+        "laser_power",
+    ]
+
+
+def test_apply_controls_skips_unchanged(software_driver):
+    changes = software_driver.apply_controls(
+        Sensor.STEREO_MODULE, {"exposure": 8500, "laser_power": 200, "enable_auto_exposure": 0}
+    )
+    assert list(changes) == ["exposure", "laser_power", "enable_auto_exposure"]
+    assert changes["exposure"] == ControlChange(8500, 8500, False)
+    assert changes["laser_power"] == ControlChange(120, 200, True)
+    assert changes["enable_auto_exposure"] == ControlChange(1, 0, True)
+
+    again = software_driver.apply_controls(Sensor.STEREO_MODULE, {"laser_power": 200})
+    assert again["laser_power"] == ControlChange(200, 200, False)
+
+
+def test_apply_controls_unsupported(software_driver):
+    with pytest.raises(ValueError, match="no_such_control"):
+        software_driver.apply_controls(
+            Sensor.STEREO_MODULE, {"laser_power": 10, "no_such_control": 1}
+        )
+    # nothing is written when any control is unsupported
+    assert software_driver.get_control_values(Sensor.STEREO_MODULE, ["laser_power"]) == {
+        "laser_power": 120
+    }
+
+
+def test_load_controls_preset(tmp_path):
+    path = tmp_path / "preset.json"
+    path.write_text(json.dumps({"depth": {"exposure": 100, "enable_auto_exposure": False}}))
+    assert load_controls_preset(path) == {
+        Sensor.STEREO_MODULE: {"exposure": 100.0, "enable_auto_exposure": 0.0}
+    }
+
+    path.write_text(json.dumps({"lidar": {"exposure": 100}}))
+    with pytest.raises(ValueError, match="lidar"):
+        load_controls_preset(path)
+
+
+def test_config_apply(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "preset.yaml"
+    path.write_text(
+        "depth:\n  exposure: 8500\n  enable_auto_exposure: 0\ncolor:\n  brightness: 0\n"
+    )
+    result = runner.invoke(app, ["config", "apply", str(path)])
+    assert result.exit_code == 0
+    assert "enable_auto_exposure" in result.stdout
+    assert "unchanged" in result.stdout
+
+    path.write_text("depth:\n  bogus: 1\n")
+    result = runner.invoke(app, ["config", "apply", str(path)])
+    assert result.exit_code == 1
+
+
+def test_config_apply_checks_all_sensors_first(tmp_path, monkeypatch):
+    device = DeviceInfo(
+        name="Intel RealSense D435",
+        serial="000000000004",
+        fw="5.15.0.0",
+        connection="3.2",
+        sensors=["Stereo Module", "RGB Camera"],
+    )
+    options = {
+        **MOCK_SENSORS["options"],
+        Sensor.RGB_CAMERA: [Option("brightness", "", -64.0, 64.0, 1.0, 0.0, int)],
+    }
+    profiles = {**MOCK_SENSORS["profiles"], Sensor.RGB_CAMERA: []}
+    ctx = SoftwareContext([build_software_device(device, profiles, options)])
+    monkeypatch.setattr(rs, "context", lambda: ctx)
+    monkeypatch.setenv("RSCLI_DRIVER", "realsense")
+
+    path = tmp_path / "preset.json"
+    path.write_text(json.dumps({"depth": {"laser_power": 200}, "color": {"bogus": 1}}))
+    result = runner.invoke(app, ["config", "apply", str(path)])
+    assert result.exit_code == 1
+    assert "bogus" in result.stderr
+
+    from realsense_cli.driver import get_driver
+
+    # depth comes first in the preset, but wasn't written
+    assert get_driver().get_control_values(Sensor.STEREO_MODULE, ["laser_power"]) == {
+        "laser_power": 120
+    }
+
+
+def test_list_controls_firmware_update(monkeypatch):
+    from realsense_cli.cache import load_cache, store_cache
+    from realsense_cli.driver.inventory import reset_inventory
+    from realsense_cli.driver.realsense import Realsense
+
+    dev = build_software_device(MOCK_DEVICE, MOCK_SENSORS["profiles"], MOCK_SENSORS["options"])
+    monkeypatch.setattr(rs, "context", lambda: SoftwareContext([dev]))
+    Realsense().list_controls(Sensor.STEREO_MODULE)
+    cache = load_cache("controls")
+    (key,) = cache
+    # product id and firmware read from the device
+    assert key == f"0B07|{MOCK_DEVICE.fw}|{Sensor.STEREO_MODULE.value}"
+    cache[key][0]["description"] = "cached"
+    store_cache("controls", cache)
+
+    # flashed without rs reset, the ranges may have changed with the firmware
+    dev.update_info(rs.camera_info.firmware_version, "5.16.0.0")
+    reset_inventory()
+    controls = Realsense().list_controls(Sensor.STEREO_MODULE)
+    assert controls[0].description != "cached"
+    assert f"0B07|5.16.0.0|{Sensor.STEREO_MODULE.value}" in load_cache("controls")
+
+
+def test_list_controls_cached(software_driver):
+    from realsense_cli.cache import load_cache, store_cache
+    from realsense_cli.driver.realsense import Realsense
+
+    controls = software_driver.list_controls(Sensor.STEREO_MODULE)
+    assert {option.name for option in controls} >= {"exposure", "laser_power"}
+    cache = load_cache("controls")
+    (key,) = cache
+    assert key.endswith(f"|{MOCK_DEVICE.fw}|{Sensor.STEREO_MODULE.value}")
+
+    # served from the cache without querying the device
+    cache[key][0]["description"] = "cached"
+    store_cache("controls", cache)
+    cached = Realsense().list_controls(Sensor.STEREO_MODULE)
+    assert cached[0].description == "cached"
+    assert [option.vtype for option in cached] == [option.vtype for option in controls]
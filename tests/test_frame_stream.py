@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from realsense_cli.driver.mock import MockDriver
+from realsense_cli.types import Profile, Resolution, Stream
+
+PROFILES = [
+    Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16"),
+    Profile(Stream.COLOR, Resolution(640, 480), 30, "rgb8"),
+]
+
+
+def test_stream_count_and_stride():
+    driver = MockDriver()
+    with driver.stream(PROFILES, count=5, stride=3) as frames:
+        indexes = [frameset[Stream.DEPTH].index for frameset in frames]
+        assert frames.delivered == 5
+    assert indexes == [0, 3, 6, 9, 12]
+    # streams are stopped on exit
+    assert driver.wait_for_frameset() is None
+
+
+def test_stream_filter():
+    driver = MockDriver()
+    with driver.stream(PROFILES, count=3, streams=[Stream.COLOR]) as frames:
+        framesets = list(frames)
+    assert len(framesets) == 3
+    assert all(list(frameset) == [Stream.COLOR] for frameset in framesets)
+
+
+def test_stream_duration():
+    driver = MockDriver()
+    start = time.monotonic()
+    with driver.stream(PROFILES, duration=0.1) as frames:
+        for _ in frames:
+            time.sleep(0.01)
+    assert 0.1 <= time.monotonic() - start < 0.5
+    assert 5 <= frames.delivered <= 11
+
+
+def test_stream_stops_on_error():
+    driver = MockDriver()
+    with pytest.raises(KeyError):
+        with driver.stream(PROFILES) as frames:
+            for frameset in frames:
+                frameset[Stream.GYRO]
+    assert driver.wait_for_frameset() is None
+
+
+def test_stream_lifecycle_errors():
+    driver = MockDriver()
+    with pytest.raises(RuntimeError):
+        next(iter(driver.stream(PROFILES)))
+    with pytest.raises(ValueError):
+        driver.stream(PROFILES, stride=0)
+    with pytest.raises(ValueError):
+        driver.stream(PROFILES, count=0)
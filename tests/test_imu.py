@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from realsense_cli.cli import app
+from realsense_cli.driver.mock import MockDriver
+from realsense_cli.imu import ImuBatcher, save_imu
+from realsense_cli.stats import imu_stats
+from realsense_cli.types import Profile, Resolution, Stream
+
+runner = CliRunner()
+
+GYRO = Profile(Stream.GYRO, Resolution(0, 0), 200, "motion_xyz32f")
+ACCEL = Profile(Stream.ACCEL, Resolution(0, 0), 100, "motion_xyz32f")
+
+
+def _feed(batcher, profile, timestamps):
+    for i, timestamp in enumerate(timestamps):
+        batcher.add(profile, timestamp, i, 2 * i, 3 * i)
+
+
+def test_batcher_fixed_size():
+    batcher = ImuBatcher(size=4)
+    _feed(batcher, GYRO, np.arange(10) * 5.0)
+    batches = batcher.pop()
+    assert [len(batch) for batch in batches] == [4, 4]
+    assert batches[1].timestamps.tolist() == [20.0, 25.0, 30.0, 35.0]
+    assert batches[1].samples[0].tolist() == [4.0, 8.0, 12.0]
+    assert batches[1].previous == 15.0
+    assert batcher.pop() == []
+
+    (partial,) = batcher.flush()
+    assert len(partial) == 2
+    assert batcher.samples == 10
+
+
+def test_batcher_time_window():
+    batcher = ImuBatcher(size=None, window=50)
+    _feed(batcher, GYRO, np.arange(25) * 5.0)
+    _feed(batcher, ACCEL, np.arange(10) * 10.0)
+    batches = batcher.flush()
+    gyro = [len(b) for b in batches if b.stream == Stream.GYRO]
+    accel = [len(b) for b in batches if b.stream == Stream.ACCEL]
+    assert gyro == [10, 10, 5]
+    assert accel == [5, 5]
+
+
+def test_batcher_drops_oldest():
+    batcher = ImuBatcher(size=1, capacity=2)
+    _feed(batcher, GYRO, [0.0, 5.0, 10.0])
+    assert batcher.dropped == 1
+    assert [batch.timestamps[0] for batch in batcher.pop()] == [5.0, 10.0]
+
+    with pytest.raises(ValueError):
+        ImuBatcher(size=None, window=None)
+
+
+def test_imu_stats_gaps():
+    timestamps = np.array([0.0, 5.0, 10.0, 25.0, 30.0])
+    stats = imu_stats(timestamps, fps=200)
+    assert stats.samples == 5
+    assert stats.gaps == 1
+    assert stats.missing == 2
+    assert stats.max_interval == 15.0
+    assert stats.rate == pytest.approx(4 / 0.030)
+
+    # the interval from the previous batch counts
+    assert imu_stats(timestamps, fps=200, previous=-20.0).gaps == 2
+    # nominal rate from the median interval
+    assert imu_stats(timestamps).gaps == 1
+
+
+def test_batch_stats():
+    batcher = ImuBatcher(size=5)
+    _feed(batcher, GYRO, [0.0, 5.0, 10.0, 15.0, 20.0, 40.0, 45.0])
+    first, second = batcher.flush()
+    assert first.stats().gaps == 0
+    assert second.stats().gaps == 1
+    assert second.stats().missing == 3
+
+
+def test_save_imu(tmp_path):
+    batcher = ImuBatcher(size=3)
+    _feed(batcher, GYRO, np.arange(5) * 5.0)
+    _feed(batcher, ACCEL, np.arange(2) * 10.0)
+    batches = batcher.flush()
+
+    save_imu(tmp_path / "imu.npz", batches)
+    with np.load(tmp_path / "imu.npz") as arrays:
+        assert arrays["gyro_timestamps"].tolist() == [0.0, 5.0, 10.0, 15.0, 20.0]
+        assert arrays["gyro_samples"].shape == (5, 3)
+        assert arrays["accel_samples"][1].tolist() == [1.0, 2.0, 3.0]
+
+    save_imu(tmp_path / "imu.csv", batches)
+    lines = (tmp_path / "imu.csv").read_text().splitlines()
+    assert lines[0] == "stream,timestamp,x,y,z"
+    assert len(lines) == 8
+    assert lines[2] == "gyro,5.000000,1,2,3"
+
+    with pytest.raises(ValueError, match="txt"):
+        save_imu(tmp_path / "imu.txt", batches)
+
+
+def test_driver_batches_motion():
+    driver = MockDriver()
+    batcher = ImuBatcher(size=2)
+    depth = Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16")
+    with driver.stream([depth, GYRO], count=5, imu=batcher) as frames:
+        framesets = list(frames)
+    assert all(list(frameset) == [Stream.DEPTH] for frameset in framesets)
+    batches = batcher.flush()
+    assert sum(len(batch) for batch in batches) == 5
+    assert all(batch.profile == GYRO for batch in batches)
+
+
+def test_record_imu(tmp_path):
+    out = tmp_path / "recording.bag"
+    imu_out = tmp_path / "imu.npz"
+    result = runner.invoke(
+        app,
+        [
+            "stream",
+            "record",
+            "depth-640x480-30-z16",
+            "gyro-0x0-200-motion_xyz32f",
+            "--out",
+            str(out),
+            "--duration",
+            "0.2",
+            "--imu-out",
+            str(imu_out),
+        ],
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "gyro:" in result.stdout
+    with np.load(imu_out) as arrays:
+        assert len(arrays["gyro_timestamps"]) > 0
+
+    result = runner.invoke(app, ["stream", "record", "--imu-out", str(tmp_path / "imu.txt")])
+    assert result.exit_code == 1
+
+
+def test_record_imu_only(tmp_path, monkeypatch):
+    # with only motion streams every sample goes to the batcher and framesets time out
+    calls = []
+    wait = MockDriver.wait_for_frameset
+
+    def wait_for_frameset(self, timeout=3.0):
+        calls.append(timeout)
+        return wait(self, timeout) or None
+
+    monkeypatch.setattr(MockDriver, "wait_for_frameset", wait_for_frameset)
+    imu_out = tmp_path / "imu.npz"
+    result = runner.invoke(
+        app,
+        [
+            "stream",
+            "record",
+            "gyro-0x0-200-motion_xyz32f",
+            "--out",
+            str(tmp_path / "recording.bag"),
+            "--duration",
+            "0.2",
+            "--imu-out",
+            str(imu_out),
+            "--imu-batch",
+            "1",
+        ],
+    )
+    assert result.exit_code == 0, result.stdout
+    assert len(calls) > 64
+    with np.load(imu_out) as arrays:
+        # a sample per wait, none dropped from the batch queue
+        assert len(arrays["gyro_timestamps"]) == len(calls)
@@ -0,0 +1,48 @@
+import pytest
+
+from realsense_cli.driver.mock import MockDriver
+from realsense_cli.multi_stream import MultiStreamer
+from realsense_cli.types import Profile, Stream, Resolution
+
+
+def _drivers(serials: list[str]) -> dict[str, MockDriver]:
+    drivers = {}
+    for serial in serials:
+        driver = MockDriver()
+        driver.active_device = serial
+        drivers[serial] = driver
+    return drivers
+
+
+def test_multi_stream_merges_devices():
+    serials = ["111", "222", "333"]
+    streamer = MultiStreamer(_drivers(serials))
+    profiles = [
+        Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16"),
+        Profile(Stream.COLOR, Resolution(640, 480), 30, "rgb8"),
+    ]
+    streamer.play(profiles)
+    seen = set()
+    try:
+        while len(seen) < len(serials) * len(profiles):
+            frames = streamer.wait_for_frames(timeout=1)
+            assert frames is not None
+            seen.update(frames.keys())
+    finally:
+        streamer.stop()
+
+    assert seen == {(serial, p.stream) for serial in serials for p in profiles}
+    stats = streamer.stats()
+    assert set(stats) == set(serials)
+    for serial in serials:
+        assert stats[serial].framesets > 0
+        assert stats[serial].dropped == 0
+
+
+def test_multi_stream_play_failure():
+    drivers = _drivers(["111", "222"])
+    streamer = MultiStreamer(drivers)
+    with pytest.raises(ValueError):
+        streamer.play(metadata=["no_such_field"])
+    for driver in drivers.values():
+        assert driver.wait_for_frameset() is None
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from realsense_cli.cli import app
+from realsense_cli.driver.mock import MockDriver
+from realsense_cli.pointcloud import CloudWriter, PointCloud, ray_table
+from realsense_cli.types import CloudFormat, Frame, Intrinsics, Profile, Resolution, Stream
+
+runner = CliRunner()
+
+DEPTH = Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16")
+COEFFS = (0.12, -0.05, 0.001, -0.002, 0.01)
+
+
+@pytest.mark.parametrize("model", ["none", "brown_conrady", "inverse_brown_conrady"])
+def test_ray_table_matches_librealsense(model):
+    rs = pytest.importorskip("pyrealsense2")
+    intrinsics = Intrinsics(64, 48, 60.5, 61.0, 31.2, 24.7, model, COEFFS)
+    rs_intrinsics = rs.intrinsics()
+    for name in ("width", "height", "fx", "fy", "ppx", "ppy"):
+        setattr(rs_intrinsics, name, getattr(intrinsics, name))
+    rs_intrinsics.model = getattr(rs.distortion, model)
+    rs_intrinsics.coeffs = list(COEFFS)
+
+    table = ray_table(intrinsics, 0.001)
+    for u, v in ((0, 0), (63, 47), (31, 24), (10, 40)):
+        expected = rs.rs2_deproject_pixel_to_point(rs_intrinsics, [u, v], 2.5)
+        assert table[:, v * 64 + u] * 2500 == pytest.approx(expected, rel=1e-4, abs=1e-5)
+
+
+def test_pointcloud_points():
+    driver = MockDriver()
+    cloud = PointCloud(driver)
+    depth = np.full((480, 640), 1000, dtype=np.uint16)
+    depth[0, 0] = 0
+    frame = Frame(DEPTH, 0, 0, {}, payload=depth)
+
+    points = cloud.points(frame)
+    assert points.shape == (480 * 640, 3)
+    assert points.dtype == np.float32
+    assert tuple(points[0]) == (0, 0, 0)
+    # depth units of the mock are 1mm
+    assert points[1:, 2] == pytest.approx(1.0)
+    intrinsics = driver.get_intrinsics(DEPTH)
+    center = 240 * 640 + 320
+    assert points[center, :2] == pytest.approx(
+        [(320 - intrinsics.ppx) / intrinsics.fx, (240 - intrinsics.ppy) / intrinsics.fy]
+    )
+    assert cloud.table(DEPTH) is cloud.table(DEPTH)
+
+    with pytest.raises(ValueError):
+        cloud.points(Frame(DEPTH, 0, 0, {}, payload=np.zeros((10, 10), dtype=np.uint16)))
+
+
+@pytest.mark.parametrize("fmt", list(CloudFormat))
+def test_cloud_writer(tmp_path, fmt):
+    points = np.array([[0, 0, 0], [0.1, -0.2, 1.5], [0.3, 0.4, 2.0]], dtype=np.float32)
+    with CloudWriter(tmp_path, fmt) as writer:
+        writer.put((7, points.T.copy().T))
+    path = tmp_path / f"cloud_000007.{fmt.value}"
+    if fmt == CloudFormat.NPY:
+        written = np.load(path)
+    else:
+        data = path.read_bytes()
+        header, body = data.split(b"end_header\n")
+        assert b"element vertex 2" in header
+        written = np.frombuffer(body, dtype="<f4").reshape(-1, 3)
+    np.testing.assert_array_equal(written, points[1:])
+    assert writer.stats().written == 1
+
+
+def test_stream_pointcloud(tmp_path):
+    result = runner.invoke(
+        app,
+        ["stream", "pointcloud", "depth-640x480-30", "--duration", "0.2", "-o", str(tmp_path)],
+    )
+    assert result.exit_code == 0
+    assert "keeps up with 30 fps" in result.stdout
+    assert list(tmp_path.glob("cloud_*.npy"))
+
+    result = runner.invoke(app, ["stream", "pointcloud", "color"])
+    assert result.exit_code == 1
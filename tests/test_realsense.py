@@ -0,0 +1,58 @@
+import pytest
+
+from realsense_cli.types import Profile, QueuePolicy, Sensor, Stream
+
+rs = pytest.importorskip("pyrealsense2")
+
+from tests.utils import (  # noqa: E402
+    MOCK_DEVICE,
+    MOCK_SENSORS,
+    FrameInjector,
+    SoftwareContext,
+    build_software_device_sensors,
+)
+
+DEPTH = MOCK_SENSORS["profiles"][Sensor.STEREO_MODULE][0]
+
+
+@pytest.fixture
+def software_device(monkeypatch):
+    dev, sensors = build_software_device_sensors(
+        MOCK_DEVICE, MOCK_SENSORS["profiles"], MOCK_SENSORS["options"]
+    )
+    monkeypatch.setattr(rs, "context", lambda: SoftwareContext([dev]))
+    rs_profile = next(
+        p for p in dev.query_sensors()[0].get_stream_profiles() if p.fps() == DEPTH.fps
+    )
+    return FrameInjector(sensors[Sensor.STEREO_MODULE], rs_profile)
+
+
+def test_profiles_converted_once_per_session(software_device, monkeypatch):
+    from realsense_cli.driver.realsense import Realsense
+
+    conversions = []
+    from_rs = Profile.from_rs.__func__
+
+    def counting_from_rs(cls, rs_profile):
+        conversions.append(rs_profile.unique_id())
+        return from_rs(cls, rs_profile)
+
+    monkeypatch.setattr(Profile, "from_rs", classmethod(counting_from_rs))
+    driver = Realsense()
+    for session in range(2):
+        driver.play([DEPTH], pipeline=False, queue_capacity=8, queue_policy=QueuePolicy.ALL)
+        conversions.clear()
+        try:
+            for i in range(5):
+                software_device.inject(1000.0 + i)
+            framesets = [driver.wait_for_frameset(1.0) for _ in range(5)]
+        finally:
+            driver.stop()
+
+        # frames share the profile converted when the stream started
+        assert conversions == []
+        profiles = {id(frameset[Stream.DEPTH].profile) for frameset in framesets}
+        assert len(profiles) == 1
+        assert framesets[0][Stream.DEPTH].profile.fps == DEPTH.fps
+        assert driver._profiles == {}
+        assert driver._rs_profiles == {}
@@ -0,0 +1,94 @@
+import threading
+
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from realsense_cli.cli import app
+from realsense_cli.rs_bag_parser import IMAGE_MSGTYPE, RosParser, decode_image
+from realsense_cli.writer import ThreadedWriter
+
+runner = CliRunner()
+
+DEPTH_TOPIC = "/device_0/sensor_0/Depth_0/image/data"
+
+
+class _BlockedWriter(ThreadedWriter[int]):
+    def __init__(self, capacity):
+        super().__init__(capacity)
+        self.release = threading.Event()
+        self.items = []
+
+    def _write(self, item: int) -> int:
+        self.release.wait()
+        self.items.append(item)
+        return 1
+
+
+def test_threaded_writer_drops_when_full():
+    writer = _BlockedWriter(capacity=2)
+    with writer:
+        results = [writer.put(i) for i in range(10)]
+        # the worker holds one item, the queue two more
+        assert not all(results)
+        stats = writer.stats()
+        assert stats.dropped == results.count(False)
+        writer.release.set()
+    assert writer.items == [i for i, queued in enumerate(results) if queued]
+    assert writer.stats().written == len(writer.items)
+
+
+class _Copyable:
+    def __init__(self):
+        self.copies = 0
+
+    def copy(self):
+        self.copies += 1
+        return self
+
+
+def test_threaded_writer_copies_only_queued():
+    writer = _BlockedWriter(capacity=1)
+    item = _Copyable()
+    results = [writer.put(item, copy=True) for _ in range(5)]
+    # not started, the single slot fills up and the rest are dropped before copying
+    assert results == [True, False, False, False, False]
+    assert item.copies == 1
+    assert writer.stats().dropped == 4
+
+    with pytest.raises(TypeError):
+        ThreadedWriter()  # type: ignore[abstract]
+
+
+def test_record(tmp_path):
+    out = tmp_path / "recording.bag"
+    result = runner.invoke(
+        app,
+        ["stream", "record", "depth-640x480-30-z16", "--out", str(out), "--duration", "0.2"],
+    )
+    assert result.exit_code == 0, result.stdout
+
+    with RosParser(out) as parser:
+        assert parser.topics[DEPTH_TOPIC].msg_type == IMAGE_MSGTYPE
+        assert parser.topics[DEPTH_TOPIC].total_messages > 0
+        _, _, rawdata = next(parser.messages([DEPTH_TOPIC]))
+    image = decode_image(rawdata)
+    assert image.encoding == "mono16"
+    assert image.data.shape == (480, 640)
+    assert image.data.dtype == np.uint16
+
+
+def test_record_existing_file(tmp_path):
+    out = tmp_path / "recording.bag"
+    out.write_bytes(b"")
+    result = runner.invoke(app, ["stream", "record", "depth", "--out", str(out)])
+    assert result.exit_code == 1
+
+
+@pytest.mark.parametrize("duration, code", [("200ms", 0), ("0", 2), ("-1s", 2)])
+def test_record_duration(tmp_path, duration, code):
+    out = tmp_path / "recording.bag"
+    result = runner.invoke(
+        app, ["stream", "record", "depth", "--out", str(out), "--duration", duration]
+    )
+    assert result.exit_code == code, result.stdout
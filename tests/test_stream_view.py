@@ -0,0 +1,70 @@
+import numpy as np
+from rich.console import Console
+
+from realsense_cli.stream_view import StreamView
+from realsense_cli.types import Frame, Profile, Resolution, Stream
+
+PROFILE = Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16")
+
+
+def _frame(index: int) -> Frame:
+    return Frame(
+        PROFILE, timestamp=index * 1000 / 30, index=index, metadata={"frame_counter": index}
+    )
+
+
+def _render(view: StreamView) -> str:
+    console = Console(width=120)
+    with console.capture() as capture:
+        console.print(view)
+    return capture.get()
+
+
+def test_stream_view_formats_on_render():
+    view = StreamView([Stream.DEPTH])
+    for index in range(10):
+        view.update({Stream.DEPTH: _frame(index)}, {Stream.DEPTH: 2})
+    assert view.panels[Stream.DEPTH].renderable == "..."
+
+    output = _render(view)
+    assert "Frame #9" in output
+    assert "Dropped 2" in output
+    assert "Frame Counter" in output
+
+    assert "FPS: 30.00" in output
+
+    # repeated frame doesn't count as an interval
+    view.update({Stream.DEPTH: _frame(9)})
+    assert view.stats[Stream.DEPTH].frames == 10
+    view.update({Stream.DEPTH: _frame(12)})
+    output = _render(view)
+    assert "Frame #12" in output
+    assert "max 100.00ms" in output
+
+
+def test_stream_view_dynamic_streams():
+    view = StreamView()
+    view.update({Stream.DEPTH: _frame(1)})
+    assert Stream.DEPTH in view.panels
+    assert "640x480" in _render(view)
+
+
+def test_stream_view_ignores_unknown_streams():
+    view = StreamView([Stream.COLOR])
+    view.update({Stream.DEPTH: _frame(1)})
+    assert Stream.DEPTH not in view.panels
+
+
+def test_stream_view_depth_stats_on_render():
+    view = StreamView([Stream.DEPTH], depth_units=0.001)
+    depth = np.full((480, 640), 1500, dtype=np.uint16)
+    depth[:120] = 0
+    for index in range(5):
+        frame = Frame(PROFILE, timestamp=index, index=index, metadata={}, payload=depth)
+        view.update({Stream.DEPTH: frame})
+    assert view.depth_stats is None
+
+    output = _render(view)
+    assert "Fill  75.0%" in output
+    assert "median 1.50m" in output
+    assert view.depth_stats.fill_rate == 0.75
@@ -0,0 +1,136 @@
+import pytest
+
+from realsense_cli.driver.sync import TimestampSyncer
+from realsense_cli.types import (
+    DeviceInfo,
+    Profile,
+    QueuePolicy,
+    Resolution,
+    Sensor,
+    Stream,
+)
+
+DEPTH = Profile(Stream.DEPTH, Resolution(64, 48), 30, "z16", 0)
+COLOR = Profile(Stream.COLOR, Resolution(64, 48), 30, "rgb8", 0)
+
+
+def _syncer(**kwargs) -> TimestampSyncer:
+    return TimestampSyncer([Stream.DEPTH, Stream.COLOR], tolerance=5, **kwargs)
+
+
+def test_pairs_nearest_timestamps():
+    syncer = _syncer(queue_capacity=8)
+    syncer.push(Stream.DEPTH, 100.0, "d0")
+    syncer.push(Stream.DEPTH, 133.0, "d1")
+    assert syncer.pop(0) is None
+    syncer.push(Stream.COLOR, 102.0, "c0")
+    syncer.push(Stream.COLOR, 131.0, "c1")
+    assert syncer.pop(0) == {Stream.DEPTH: "d0", Stream.COLOR: "c0"}
+    assert syncer.pop(0) == {Stream.DEPTH: "d1", Stream.COLOR: "c1"}
+    assert syncer.stats.matched == 2
+    assert syncer.stats.orphaned == 0
+
+
+def test_orphans_frames_without_partner():
+    syncer = _syncer(queue_capacity=8)
+    # color misses the frame at 100 and depth the one at 166
+    syncer.push(Stream.DEPTH, 100.0, "d0")
+    syncer.push(Stream.DEPTH, 133.0, "d1")
+    syncer.push(Stream.COLOR, 133.5, "c1")
+    syncer.push(Stream.COLOR, 166.0, "c2")
+    syncer.push(Stream.COLOR, 200.0, "c3")
+    syncer.push(Stream.DEPTH, 199.0, "d3")
+    assert syncer.pop(0) == {Stream.DEPTH: "d1", Stream.COLOR: "c1"}
+    assert syncer.pop(0) == {Stream.DEPTH: "d3", Stream.COLOR: "c3"}
+    assert syncer.stats.matched == 2
+    assert syncer.stats.orphaned == 2
+
+
+def test_late_and_overflowing_frames():
+    syncer = _syncer(capacity=2)
+    syncer.push(Stream.DEPTH, 100.0, "d0")
+    syncer.push(Stream.COLOR, 100.0, "c0")
+    # arrives after the frameset at 100 was emitted
+    syncer.push(Stream.COLOR, 90.0, "late")
+    assert syncer.stats.late == 1
+
+    # color stalls, depth frames beyond the buffer capacity can't be paired
+    for i in range(1, 5):
+        syncer.push(Stream.DEPTH, 100.0 + 33 * i, f"d{i}")
+    assert syncer.stats.orphaned == 2
+    syncer.push(Stream.COLOR, 232.0, "c4")
+    assert syncer.stats.matched == 2
+    # the consumer didn't take the first frameset
+    assert syncer.stats.dropped == 1
+    assert syncer.pop(0) == {Stream.DEPTH: "d4", Stream.COLOR: "c4"}
+
+
+def test_other_streams_pass_through():
+    syncer = _syncer(queue_capacity=8)
+    syncer.push(Stream.GYRO, 1.0, "g0")
+    assert syncer.pop(0) == {Stream.GYRO: "g0"}
+    assert syncer.stats.matched == 0
+
+
+def test_motion_does_not_evict_framesets():
+    # 30 fps depth and color with a 200 Hz gyro, the live view takes one frameset per frame
+    syncer = _syncer()
+    framesets = []
+    gyro = 0
+    for i in range(30):
+        t = 1000.0 + 33.3 * i
+        syncer.push(Stream.DEPTH, t, f"d{i}")
+        while 1000.0 + 5 * gyro < t + 33.3:
+            syncer.push(Stream.GYRO, 1000.0 + 5 * gyro, f"g{gyro}")
+            gyro += 1
+        syncer.push(Stream.COLOR, t + 1, f"c{i}")
+        framesets.append(syncer.pop(0))
+    assert framesets == [{Stream.DEPTH: f"d{i}", Stream.COLOR: f"c{i}"} for i in range(30)]
+    assert syncer.stats.dropped == 0
+    # motion frames queue on their own, only the newest is kept
+    assert syncer.pop(0) == {Stream.GYRO: f"g{gyro - 1}"}
+    assert syncer.pop(0) is None
+
+    with pytest.raises(ValueError):
+        _syncer(capacity=0)
+
+
+def test_realsense_sensor_sync(monkeypatch):
+    rs = pytest.importorskip("pyrealsense2")
+    from realsense_cli.driver.realsense import Realsense
+    from tests.utils import FrameInjector, SoftwareContext, build_software_device_sensors
+
+    device = DeviceInfo(
+        name="Intel RealSense D435",
+        serial="000000000003",
+        fw="5.15.0.0",
+        connection="3.2",
+        sensors=["Stereo Module", "RGB Camera"],
+    )
+    dev, sensors = build_software_device_sensors(
+        device, {Sensor.STEREO_MODULE: [DEPTH], Sensor.RGB_CAMERA: [COLOR]}, {}
+    )
+    monkeypatch.setattr(rs, "context", lambda: SoftwareContext([dev]))
+    injectors = {
+        stream: FrameInjector(sensors[sensor], rs_sensor.get_stream_profiles()[0])
+        for stream, sensor, rs_sensor in zip(
+            (Stream.DEPTH, Stream.COLOR), sensors, dev.query_sensors()
+        )
+    }
+    driver = Realsense()
+    driver.play([DEPTH, COLOR], pipeline=False, queue_capacity=16, queue_policy=QueuePolicy.ALL)
+    try:
+        for i in range(5):
+            injectors[Stream.DEPTH].inject(1000.0 + 33.3 * i)
+            if i != 2:
+                injectors[Stream.COLOR].inject(1001.0 + 33.3 * i)
+        framesets = [driver.wait_for_frameset(1.0) for _ in range(4)]
+        assert driver.wait_for_frameset(0.05) is None
+    finally:
+        driver.stop()
+
+    assert all(set(frameset) == {Stream.DEPTH, Stream.COLOR} for frameset in framesets)
+    assert [frameset[Stream.COLOR].index for frameset in framesets] == [0, 1, 2, 3]
+    assert [frameset[Stream.DEPTH].index for frameset in framesets] == [0, 1, 3, 4]
+    stats = driver.sync_stats
+    assert (stats.matched, stats.orphaned, stats.late) == (4, 1, 0)
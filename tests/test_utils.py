@@ -1,7 +1,16 @@
+import numpy as np
 import pytest
 
-from realsense_cli.types import Profile, Stream, Resolution, Sensor
-from realsense_cli.utils import group_profiles, find_origin_sensor
+from realsense_cli.stats import (
+    depth_stats,
+    DropCounter,
+    LatencyHistogram,
+    LatencyStage,
+    LatencyTracker,
+    StreamStats,
+)
+from realsense_cli.types import Frame, Profile, Stream, Resolution, Sensor, frame_array
+from realsense_cli.utils import ProfileIndex, group_profiles, find_origin_sensor
 
 
 def test_group_profiles():
@@ -62,3 +71,148 @@ def test_profile_from_string_error():
 )
 def test_find_origin_sensor(profiles, expected):
     assert expected == find_origin_sensor(profiles)
+
+
+@pytest.mark.parametrize(
+    "profile, payload, expected",
+    [
+        (
+            Profile(Stream.DEPTH, Resolution(3, 2), 30, "z16"),
+            np.arange(6, dtype=np.uint16),
+            np.arange(6, dtype=np.uint16).reshape(2, 3),
+        ),
+        (
+            Profile(Stream.DEPTH, Resolution(3, 2), 30, "z16"),
+            np.arange(8, dtype=np.uint16),
+            np.array([[0, 1, 2], [4, 5, 6]], dtype=np.uint16),
+        ),
+        (
+            Profile(Stream.GYRO, Resolution(0, 0), 200, "motion_xyz32f"),
+            np.array([0.5, 1.5, 2.5], dtype=np.float32),
+            np.array([0.5, 1.5, 2.5], dtype=np.float32),
+        ),
+    ],
+    ids=["z16", "padded-stride", "motion"],
+)
+def test_frame_array(profile, payload, expected):
+    result = frame_array(payload, profile)
+    np.testing.assert_array_equal(result, expected)
+    assert np.shares_memory(result, payload)
+
+
+def test_drop_counter():
+    counter = DropCounter()
+    for index in (0, 1, 2, 5, 6, 10):
+        counter.update(Stream.DEPTH, index)
+    for index in (7, 8):
+        counter.update(Stream.COLOR, index)
+    assert counter.dropped == {Stream.DEPTH: 5, Stream.COLOR: 0}
+
+
+def test_drop_counter_restart():
+    counter = DropCounter()
+    for index in (10, 11, 0, 1, 3):
+        counter.update(Stream.DEPTH, index)
+    assert counter.dropped == {Stream.DEPTH: 1}
+
+
+_INDEXED = [
+    Profile(Stream.DEPTH, Resolution(640, 480), 15, "Z16", 0),
+    Profile(Stream.DEPTH, Resolution(640, 480), 30, "Z16", 0),
+    Profile(Stream.DEPTH, Resolution(1280, 720), 30, "Z16", 0),
+    Profile(Stream.INFRARED, Resolution(640, 480), 30, "Y8", 1),
+    Profile(Stream.INFRARED2, Resolution(640, 480), 30, "Y8", 2),
+]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (Profile(Stream.DEPTH, Resolution(640, 480), 30, "z16", 0), 1),
+        (Profile(Stream.DEPTH), 0),
+        (Profile(Stream.DEPTH, Resolution(0, 0), 30), 1),
+        (Profile(Stream.DEPTH, Resolution(1280, 0)), 2),
+        (Profile(Stream.INFRARED2, fps=30, format="y8"), 4),
+        (Profile(Stream.INFRARED, Resolution(640, 480), 15), None),
+        (Profile(Stream.COLOR), None),
+    ],
+)
+def test_profile_index(query, expected):
+    index = ProfileIndex((profile, i) for i, profile in enumerate(_INDEXED))
+    assert index.find(query) == expected
+    assert index.profiles == _INDEXED
+
+
+def test_stream_stats():
+    stats = StreamStats(window=4)
+    for timestamp in (0, 10, 20, 30, 40):
+        stats.update(timestamp)
+    assert stats.fps == pytest.approx(100)
+    assert stats.interval_mean == pytest.approx(10)
+    assert stats.interval_std == pytest.approx(0)
+
+    # a late frame, then the window slides past it
+    stats.update(80)
+    assert stats.max_gap == 40
+    assert stats.percentile(99) == 40
+    assert stats.interval_mean == pytest.approx(17.5)
+    for timestamp in (90, 100, 110, 120):
+        stats.update(timestamp)
+    summary = stats.summary()
+    assert summary.frames == 10
+    assert summary.fps == pytest.approx(100)
+    assert summary.interval_p99 == 10
+    assert summary.max_gap == 40
+    assert 25 < summary.ewma_fps < 100
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for latency in range(1, 1001):
+        histogram.record(latency / 10)  # 0.1ms - 100ms
+    histogram.record(-1)
+    assert histogram.count == 1001
+    assert histogram.negative == 1
+    assert histogram.min == -1
+    assert histogram.max == 100
+    for q in (50, 90, 99):
+        assert histogram.percentile(q) == pytest.approx(q / 100 * 100, rel=0.04)
+    assert histogram.percentile(100) == 100
+
+
+def test_latency_tracker():
+    tracker = LatencyTracker()
+    metadata = {"time_of_arrival": 1003, "backend_timestamp": 1002}
+    profile = Profile(Stream.DEPTH)
+    tracker.update(
+        {
+            Stream.DEPTH: Frame(profile, 1000.0, 0, metadata, received=1010.0),
+            # device clock, sensor stages can't be measured
+            Stream.COLOR: Frame(
+                Profile(Stream.COLOR), 5.0, 0, metadata, timestamp_domain="hardware_clock"
+            ),
+        }
+    )
+    histograms = tracker.histograms
+    assert histograms[(Stream.DEPTH, LatencyStage.SENSOR_TO_ARRIVAL)].max == 3
+    assert histograms[(Stream.DEPTH, LatencyStage.SENSOR_TO_BACKEND)].max == 2
+    assert histograms[(Stream.DEPTH, LatencyStage.BACKEND_TO_ARRIVAL)].max == 1
+    assert histograms[(Stream.DEPTH, LatencyStage.ARRIVAL_TO_PYTHON)].max == 7
+    assert (Stream.COLOR, LatencyStage.SENSOR_TO_ARRIVAL) not in histograms
+    assert list(tracker.summary()["Color"]) == [LatencyStage.BACKEND_TO_ARRIVAL.value]
+
+
+def test_depth_stats():
+    depth = np.zeros((48, 64), dtype=np.uint16)
+    depth[:24] = 500
+    depth[24:36] = 2000
+    depth[36:, :32] = 12000
+    stats = depth_stats(depth, 0.001, decimation=2, bins=4, max_range=8.0)
+    assert stats.fill_rate == pytest.approx(0.875)
+    assert (stats.min, stats.median, stats.max) == pytest.approx((0.5, 0.5, 12.0))
+    # farther than max_range lands in the last bin
+    assert stats.histogram == [12 * 32, 6 * 32, 0, 6 * 16]
+
+    empty = depth_stats(np.zeros((4, 4), dtype=np.uint16), 0.001, bins=3)
+    assert empty.fill_rate == 0.0
+    assert empty.histogram == [0, 0, 0]
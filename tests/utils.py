@@ -1,11 +1,20 @@
 import time
 from contextlib import contextmanager
 from itertools import count
+from typing import Optional
 
+import numpy as np
 import pyrealsense2 as rs
 
-from realsense_cli.types import DeviceInfo, Sensor, Profile, Stream, Resolution, Option
-
+from realsense_cli.types import (
+    DeviceInfo,
+    Sensor,
+    Profile,
+    Stream,
+    Resolution,
+    Option,
+    frame_layout,
+)
 
 MOCK_DEVICE: DeviceInfo = DeviceInfo(
     name="Intel RealSense D435",
@@ -36,17 +45,45 @@ MOCK_SENSORS: dict = {
 }
 
 
+_RS_STREAMS = {
+    Stream.DEPTH: rs.stream.depth,
+    Stream.INFRARED: rs.stream.infrared,
+    Stream.INFRARED2: rs.stream.infrared,
+    Stream.COLOR: rs.stream.color,
+    Stream.GYRO: rs.stream.gyro,
+    Stream.ACCEL: rs.stream.accel,
+}
+
+
 def build_software_device(
     device: DeviceInfo,
     profiles: dict[Sensor, list[Profile]],
     options: dict[Sensor, list[Option]],
 ):
+    return build_software_device_sensors(device, profiles, options)[0]
+
+
+def build_software_device_sensors(
+    device: DeviceInfo,
+    profiles: dict[Sensor, list[Profile]],
+    options: dict[Sensor, list[Option]],
+) -> tuple[rs.software_device, dict[Sensor, rs.software_sensor]]:
+    """
+    Software device along with its software sensors, needed to inject frames
+    """
     soft_dev = rs.software_device()
-    # using `update_info` because already registered, register again would append
-    soft_dev.update_info(rs.camera_info.name, device.name)
+    try:
+        # using `update_info` because already registered, register again would append
+        soft_dev.update_info(rs.camera_info.name, device.name)
+    except RuntimeError:
+        # newer librealsense doesn't register a name for software devices
+        soft_dev.register_info(rs.camera_info.name, device.name)
     soft_dev.register_info(rs.camera_info.serial_number, device.serial)
     soft_dev.register_info(rs.camera_info.usb_type_descriptor, device.connection)
     soft_dev.register_info(rs.camera_info.firmware_version, device.fw)
+    soft_dev.register_info(rs.camera_info.physical_port, f"/dev/software/{device.serial}")
+    # USB product id of a D435
+    soft_dev.register_info(rs.camera_info.product_id, "0B07")
 
     _sensors: dict[Sensor, rs.sensor] = {}
     stream_idx = count()
@@ -57,17 +94,23 @@ def build_software_device(
     for sensor, profiles in profiles.items():
         soft_sensor = _sensors[sensor]
         for profile in profiles:
-            stream = rs.video_stream()
-            if profile.stream == Stream.DEPTH:
-                stream.type = rs.stream.depth
-                stream.bpp = 2
-            stream.width = profile.resolution.width
-            stream.height = profile.resolution.height
+            if profile.stream in (Stream.GYRO, Stream.ACCEL):
+                stream = rs.motion_stream()
+            else:
+                stream = rs.video_stream()
+                dtype, shape = frame_layout(profile)
+                stream.width = profile.resolution.width
+                stream.height = profile.resolution.height
+                stream.bpp = np.dtype(dtype).itemsize * (shape[2] if len(shape) > 2 else 1)
+            stream.type = _RS_STREAMS[profile.stream]
             stream.fmt = getattr(rs.format, profile.format.lower())
             stream.fps = profile.fps
-            stream.index = profile.index
+            stream.index = max(profile.index, 0)
             stream.uid = next(stream_idx)
-            soft_sensor.add_video_stream(stream)
+            if profile.stream in (Stream.GYRO, Stream.ACCEL):
+                soft_sensor.add_motion_stream(stream)
+            else:
+                soft_sensor.add_video_stream(stream)
 
     for sensor, options in options.items():
         soft_sensor = _sensors[sensor]
@@ -78,7 +121,67 @@ def build_software_device(
             rng.step = option.step
             rng.default = option.default_value
             soft_sensor.add_option(getattr(rs.option, option.name), rng)
-    return soft_dev
+    return soft_dev, _sensors
+
+
+class SoftwareContext(rs.context):
+    """
+    Context listing the given software devices, for librealsense versions that don't
+    enumerate devices added with software_device.add_to
+    """
+
+    def __init__(self, devices: list[rs.software_device]):
+        super().__init__()
+        self._software_devices = devices
+        for dev in devices:
+            dev.add_to(self)
+
+    @property
+    def devices(self):
+        return self._software_devices
+
+
+class FrameInjector:
+    """
+    Feed synthetic frames of a software sensor's profile, the frame content is a fixed
+    pattern so injection cost stays out of measurements
+    """
+
+    def __init__(self, sensor: rs.software_sensor, profile: rs.stream_profile):
+        self.sensor = sensor
+        self.frame_number = 0
+        self._motion = profile.is_motion_stream_profile()
+        if self._motion:
+            self.profile = profile.as_motion_stream_profile()
+            self._data = rs.vector()
+            self._data.x, self._data.y, self._data.z = 0.1, 0.2, 9.8
+        else:
+            self.profile = profile.as_video_stream_profile()
+            dtype, shape = frame_layout(Profile.from_rs(profile))
+            self._pixels = np.zeros(shape, dtype=dtype)
+            self._bpp = self._pixels.itemsize * (shape[2] if len(shape) > 2 else 1)
+            self._stride = shape[1] * self._bpp
+
+    def inject(self, timestamp: float, metadata: Optional[dict] = None) -> None:
+        for md, value in (metadata or {}).items():
+            self.sensor.set_metadata(md, value)
+        if self._motion:
+            frame = rs.software_motion_frame()
+            frame.data = self._data
+        else:
+            frame = rs.software_video_frame()
+            frame.pixels = self._pixels
+            frame.bpp = self._bpp
+            frame.stride = self._stride
+        frame.timestamp = timestamp
+        frame.domain = rs.timestamp_domain.system_time
+        frame.frame_number = self.frame_number
+        frame.profile = self.profile
+        if self._motion:
+            self.sensor.on_motion_frame(frame)
+        else:
+            self.sensor.on_video_frame(frame)
+        self.frame_number += 1
 
 
 @contextmanager